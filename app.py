@@ -1,11 +1,16 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
+import glob
 import os
 from pyvis.network import Network
 import networkx as nx
 import numpy as np
-from data_viz import create_directed_network
+from data_viz import draw_directed_network
+from out_of_core import CountAccumulator, read_csv_chunks
+from parquet_store import DEFAULT_PARQUET_DIR, parquet_dataset_exists, iter_parquet_batches
+from result_cache import files_fingerprint
+from sql_analytics import DEFAULT_DB_PATH, TRANSITIONS_TABLE, database_exists, has_table, transition_links
+from translation import Translator
 import openai
 import os
 
@@ -19,18 +24,67 @@ client = get_openai_client()
 prompt_path = "context.txt"
 
 filename = "data/data_css_challenge.csv"
+csv_pattern = "data/data_css_challenge_*.csv"
+app_columns = [
+    "patient_id", "age", "reason_for_treatment",
+    "healthcare_provider_id", "client_id",
+    "healthcare_provider_type", "client_type",
+]
+# Rows per link and per source node of the two networks below
+link_groupings = {
+    "provider_ids": ["healthcare_provider_id"],
+    "id_links": ["healthcare_provider_id", "client_id"],
+    "provider_types": ["healthcare_provider_type"],
+    "type_links": ["healthcare_provider_type", "client_type"],
+}
+# Nodes drawn in the ID network: thousands of IDs are summarized down to this many
+id_network_max_nodes = 150
+# German columns of the raw CSV files, translated like the converter does for the Parquet dataset
+translated_columns = ["age", "reason_for_treatment", "healthcare_provider_type", "client_type"]
+csv_translator = Translator(partial_match="words")
+
+def translate_chunk(chunk):
+    """Raw CSV chunk with the translated_columns in English"""
+    for col in translated_columns:
+        chunk[col] = csv_translator.translate_series(chunk[col])
+    return chunk
+
+@st.cache_data
+def load_counts(filename):
+    """
+    Counts behind every chart, over the whole dataset. The data is streamed
+    chunk by chunk (Parquet dataset, else every CSV file) and only the
+    partial counts are kept, so it never has to fit in memory.
+    """
+    if parquet_dataset_exists(DEFAULT_PARQUET_DIR):
+        # Only the columns used below are read
+        chunks = iter_parquet_batches(DEFAULT_PARQUET_DIR, columns=app_columns)
+    else:
+        paths = sorted(glob.glob(csv_pattern)) or [filename]
+        chunks = read_csv_chunks(paths, columns=app_columns, categorical=app_columns, prepare=translate_chunk)
+    
+    age_reason = CountAccumulator({"age_reason": ["age", "reason_for_treatment"]}, count_column="patient_id")
+    links = CountAccumulator(link_groupings)
+    for chunk in chunks:
+        age_reason.add(chunk)
+        links.add(chunk)
+    
+    counts = {name: links.counts(name) for name in link_groupings}
+    counts["age_reason"] = age_reason.counts("age_reason")
+    return counts
+
 @st.cache_data
-def load_data(filename):
-    return pd.read_csv(filename)
+def load_transition_links(db_path, fingerprint):
+    """Provider type transition counts of the database, recounted when the file changes"""
+    return transition_links(db_path)
 
-df = load_data(filename)
+all_counts = load_counts(filename)
 st.title("Patient Treatment Analysis")
 
 ###################################################################################################
 
 # Aggregate counts by age and reason_for_treatment
-counts = df.groupby(["age", "reason_for_treatment"])["patient_id"].count().reset_index()
-counts.rename(columns={"patient_id": "count"}, inplace=True)
+counts = all_counts["age_reason"]
 
 
 st.subheader("Patient Counts by Age and Reason for Treatment")
@@ -51,25 +105,29 @@ st.altair_chart(chart, use_container_width=True)
 
 title = "Healthcare Provider ID → Client Network ID"
 output_file = "id_links_network.html"
-create_directed_network(
-    df, 
+# The page is rebuilt (and the file rewritten) only when the counts change
+html = draw_directed_network(
+    all_counts["id_links"].rename(columns={"count": "counts"}),
+    all_counts["provider_ids"].set_index("healthcare_provider_id")["count"],
     feature1='healthcare_provider_id', 
     feature2='client_id', 
     title=title, 
-    min_count=1000, 
-    output_file=output_file
+    min_count=1, 
+    output_file=output_file,
+    max_nodes=id_network_max_nodes
 )
 
 st.subheader(title)
-st.components.v1.html(open(output_file, "r", encoding="utf-8").read(), height=750)
+st.components.v1.html(html, height=750)
 
 
 ###################################################################################################
 
 title = "Healthcare Provider Type → Client Type Network"
 output_file = "type_links_network.html"
-create_directed_network(
-    df, 
+html = draw_directed_network(
+    all_counts["type_links"].rename(columns={"count": "counts"}),
+    all_counts["provider_types"].set_index("healthcare_provider_type")["count"],
     feature1='healthcare_provider_type', 
     feature2='client_type', 
     title=title, 
@@ -79,7 +137,20 @@ create_directed_network(
 )
 
 st.subheader(title)
-st.components.v1.html(open(output_file, "r", encoding="utf-8").read(), height=750)
+st.components.v1.html(html, height=750)
+
+###################################################################################################
+
+# Patient journeys: pairs of consecutive visits, materialized by csv_to_sql_converter.py
+if database_exists(DEFAULT_DB_PATH) and has_table(DEFAULT_DB_PATH, TRANSITIONS_TABLE):
+    title = "Healthcare Provider Type → Next Provider Type (Patient Transitions)"
+    output_file = "transition_network.html"
+    links, from_counts = load_transition_links(DEFAULT_DB_PATH, files_fingerprint([DEFAULT_DB_PATH]))
+    html = draw_directed_network(links, from_counts, 'from', 'to', title, min_count=1000,
+                                 output_file=output_file, length=1000)
+
+    st.subheader(title)
+    st.components.v1.html(html, height=750)
 
 ###################################################################################################
 
@@ -0,0 +1,1099 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the data pipeline, run on synthetic claims data so they
+do not need the challenge CSVs.
+
+Usage:
+    python benchmarks.py insert --rows 500000
+    python benchmarks.py schema --rows 500000
+    python benchmarks.py clean --rows 1000000 10000000
+    python benchmarks.py transitions --rows 200000 10000000
+    python benchmarks.py network --rows 200000 10000000 --provider-types 150
+    python benchmarks.py filters --rows 200000 2000000
+    python benchmarks.py memory --rows 1000000
+    python benchmarks.py outofcore --rows 2000000 --partitions 4
+    python benchmarks.py sampling --rows 1000000 --sizes 50000 200000
+    python benchmarks.py sqlmode --rows 1000000
+    python benchmarks.py layout --nodes 100 1000 3000
+    python benchmarks.py render --edges 100 1000 10000
+    python benchmarks.py summary --ids 1000 10000 --budget 150
+    python benchmarks.py graph --edges 200000 5000000
+    python benchmarks.py pathways --rows 200000 2000000 10000000
+    python benchmarks.py providers --rows 200000 2000000
+"""
+
+import argparse
+import logging
+import os
+import resource
+import sqlite3
+import tempfile
+import time
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from claims_layout import compact_claims, concat_claims, map_categories, memory_per_million_rows, month_labels
+from csv_to_sql_converter import HealthcareDataConverter
+from flow_analytics import (FlowCube, ProviderProfiles, aggregate_edges, build_transitions, node_statistics,
+                            pair_consecutive_visits)
+from out_of_core import DEFAULT_CHUNKSIZE, DatasetAggregates, read_csv_chunks
+from graph_layout import LARGE_GRAPH_NODES, LayoutCache
+from flow_graph import FlowGraph
+from graph_summary import summarize_network
+from network_figure import network_figure
+from pathway_index import STEP_COLUMNS, PathwayIndex
+from sampling import sample_patients
+from sql_analytics import SqlAggregates
+
+
+def make_synthetic_claims(n_rows: int, n_patients: int = None, seed: int = 42,
+                          n_provider_types: int = None) -> pd.DataFrame:
+    """
+    Generate raw (German, uncleaned) claims shaped like data_css_challenge_*.csv.
+    `n_provider_types` adds numbered practice types to the ten real ones.
+    """
+    rng = np.random.default_rng(seed)
+    n_patients = n_patients or max(1, n_rows // 20)
+
+    ages = ['0-10 Jahre', '10-20 Jahre', '20-30 Jahre', '30-40 Jahre', '40-50 Jahre',
+            '50-60 Jahre', '60-70 Jahre', '70-80 Jahre', '80-90 Jahre', '90+ Jahre']
+    reasons = ['Krankheit', 'Unfall', 'Mutterschaft']
+    provider_types = ['Zentrumsversorgung, Niveau 1', 'Grundversorgung, Niveau 3', 'Radiologie',
+                      'Allgemeine Innere Medizin', 'Privatlaboratorien', 'Apotheken, Spezialfälle',
+                      'Organisationen der Physiotherapie', 'Kinder- und Jugendmedizin',
+                      'Psychiatrische Kliniken, Niveau 1', 'Gynäkologie und Geburtshilfe']
+    provider_types += [f'Praxis {i}' for i in range(len(provider_types), n_provider_types or 0)]
+    main_groups = ['Spitäler', 'Ärzte und Ärztinnen', 'Laboratorien', 'Apotheken', 'Physiotherapie']
+    tariffs = np.array(['312.0', '99', '1', '5.0', '590', '1234', None], dtype=object)
+
+    patient_codes = rng.integers(0, n_patients, n_rows)
+    type_codes = rng.integers(0, len(provider_types), n_rows)
+    client_codes = rng.integers(0, len(provider_types), n_rows)
+    start = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, n_rows), unit='D')
+    end = start + pd.to_timedelta(rng.integers(0, 3, n_rows), unit='D')
+
+    return pd.DataFrame({
+        'patient_id': pd.Series(patient_codes).map('{:012x}'.format),
+        'age': np.array(ages, dtype=object)[rng.integers(0, len(ages), n_rows)],
+        'gender': np.array(['M', 'F'], dtype=object)[rng.integers(0, 2, n_rows)],
+        'reason_for_treatment': np.array(reasons, dtype=object)[rng.integers(0, len(reasons), n_rows)],
+        'healthcare_provider_id': pd.Series(rng.integers(0, 5000, n_rows)).map('P{:05d}'.format),
+        'healthcare_provider_type': np.array(provider_types, dtype=object)[type_codes],
+        'healthcare_provider_main_group': np.array(main_groups, dtype=object)[type_codes % len(main_groups)],
+        'client_id': pd.Series(rng.integers(0, 3000, n_rows)).map('C{:05d}'.format),
+        'client_type': np.array(provider_types, dtype=object)[client_codes],
+        'client_main_group': np.array(main_groups, dtype=object)[client_codes % len(main_groups)],
+        'start_date': start.strftime('%Y-%m-%d'),
+        'end_date': end.strftime('%Y-%m-%d'),
+        'tariff': tariffs[rng.integers(0, len(tariffs), n_rows)],
+        'tariff_position': pd.Series(rng.integers(0, 900, n_rows)).map('{:05d}'.format),
+        'quantity': rng.integers(1, 5, n_rows).astype(float),
+        'source_file': 'synthetic.csv',
+    })
+
+
+def report(name: str, rows: int, seconds: float, baseline: float = None):
+    speedup = f"  ({baseline / seconds:5.1f}x)" if baseline else ""
+    print(f"  {name:42} {seconds:8.3f}s  {rows / seconds:12,.0f} rows/s{speedup}")
+
+
+def bench_insert(rows: int):
+    """Compare DataFrame.to_sql with indexes up front against the bulk-load path"""
+    converter = HealthcareDataConverter()
+    df = converter.clean_data(make_synthetic_claims(rows), verbose=False)
+    print(f"SQLite insert of {len(df):,} cleaned rows")
+
+    results = {}
+    for name, bulk in [("to_sql multi, indexes first", False), ("executemany bulk load, indexes after", True)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            converter.conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+            converter.create_database_schema(create_indexes=not bulk)
+
+            start = time.perf_counter()
+            if bulk:
+                with converter.bulk_load():
+                    converter.insert_data_to_db(df, method='executemany')
+                    converter.create_indexes()
+            else:
+                converter.insert_data_to_db(df, method='to_sql')
+            results[name] = time.perf_counter() - start
+
+            converter.conn.close()
+
+    baseline = results["to_sql multi, indexes first"]
+    for name, seconds in results.items():
+        report(name, len(df), seconds, baseline)
+
+
+def time_query(conn: sqlite3.Connection, query: str, repeat: int = 3) -> float:
+    """Best-of-N wall time of a query, fetching all rows"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query).fetchall()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def legacy_clean_tariff_codes(tariff_series: pd.Series) -> pd.Series:
+    """Row-wise tariff cleaning as clean_data did it before vectorization (reference)"""
+    def clean_single_tariff(value):
+        if pd.isna(value):
+            return None
+        str_value = str(value).strip()
+        if str_value.endswith('.0'):
+            str_value = str_value[:-2]
+        if str_value.lower() == 'nan':
+            return None
+        return str_value.zfill(3) if str_value.isdigit() else str_value
+
+    return tariff_series.apply(clean_single_tariff)
+
+
+def time_call(func, *args) -> tuple:
+    """Wall time of a single call, with its result"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_clean(rows: int):
+    """Compare each vectorized clean_data step against the code it replaced"""
+    converter = HealthcareDataConverter()
+    print(f"clean_data steps on {rows:,} rows")
+
+    raw = make_synthetic_claims(rows)
+    for col in raw.columns.drop('quantity'):
+        raw[col] = raw[col].astype('string')
+
+    steps = [
+        ("tariff: row-wise apply", legacy_clean_tariff_codes, "tariff: str accessor on distinct codes",
+         converter.clean_tariff_codes, raw['tariff']),
+        ("dates: to_datetime, no format", lambda s: pd.to_datetime(s, errors='coerce'),
+         "dates: explicit format on distinct dates", converter.parse_dates, raw['start_date']),
+    ]
+    for old_name, old_func, new_name, new_func, series in steps:
+        old_seconds, expected = time_call(old_func, series)
+        new_seconds, result = time_call(new_func, series)
+        assert result.equals(expected), new_name
+        report(old_name, rows, old_seconds)
+        report(new_name, rows, new_seconds, old_seconds)
+
+    # clean_data deduplicates the cleaned frame; repeat a small share of rows
+    cleaned = converter.clean_data(raw, verbose=False)
+    del raw, steps
+    frame = pd.concat([cleaned, cleaned.iloc[:rows // 100]], ignore_index=True)
+    del cleaned
+    old_seconds, expected = time_call(pd.DataFrame.drop_duplicates, frame)
+    new_seconds, result = time_call(converter.drop_duplicate_rows, frame)
+    assert result.index.equals(expected.index), "dedup"
+    report("dedup: drop_duplicates", len(frame), old_seconds)
+    report("dedup: 64-bit row fingerprints", len(frame), new_seconds, old_seconds)
+
+
+def legacy_build_transitions(data: pd.DataFrame) -> pd.DataFrame:
+    """Per-patient loop the network dashboard used before vectorization (reference)"""
+    transitions = []
+    for patient_id, group in data.groupby('patient_id'):
+        if len(group) > 1:
+            group_sorted = group.sort_values('start_date')
+            providers = group_sorted['healthcare_provider_type'].tolist()
+            ages = group_sorted['age'].tolist()
+            genders = group_sorted['gender'].tolist()
+            reasons = group_sorted['reason_for_treatment'].tolist()
+            dates = group_sorted['start_date'].tolist()
+            for i in range(len(providers) - 1):
+                transitions.append({
+                    'from': providers[i], 'to': providers[i + 1], 'patient_id': patient_id,
+                    'age': ages[i], 'gender': genders[i], 'reason': reasons[i],
+                    'from_date': dates[i], 'to_date': dates[i + 1],
+                })
+    return pd.DataFrame(transitions)
+
+
+def same_transitions(result: pd.DataFrame, expected: pd.DataFrame, data: pd.DataFrame) -> bool:
+    """
+    Whether build_transitions() and legacy_build_transitions() agree, in any
+    row order. The legacy loop sorted each patient with the default unstable
+    sort, so the order of same-day visits (and the transitions they take
+    part in) was undefined; build_transitions() keeps the file order. Both
+    must have the same (patient, from_date, to_date) pairs, and the same
+    transitions for every patient without same-day visits.
+    """
+    def rows(transitions, columns):
+        table = transitions[columns].astype(object)
+        return table.sort_values(columns, ignore_index=True)
+
+    dates = ['patient_id', 'from_date', 'to_date']
+    if not rows(result, dates).equals(rows(expected, dates)):
+        return False
+    tied = data.loc[data.duplicated(['patient_id', 'start_date'], keep=False), 'patient_id'].unique()
+    columns = list(expected.columns)
+    return rows(result[~result['patient_id'].isin(tied)], columns).equals(
+        rows(expected[~expected['patient_id'].isin(tied)], columns))
+
+
+def make_dashboard_data(rows: int, n_provider_types: int = None) -> pd.DataFrame:
+    """
+    Synthetic visits as the dashboard holds them when read from Parquet:
+    English categorical values and parsed dates
+    """
+    categorical = ['age', 'gender', 'reason_for_treatment', 'healthcare_provider_type',
+                   'healthcare_provider_main_group']
+    data = make_synthetic_claims(rows, n_provider_types=n_provider_types)[['patient_id', 'start_date'] + categorical]
+    data['start_date'] = pd.to_datetime(data['start_date'], format='%Y-%m-%d')
+    translator = HealthcareDataConverter().translator
+    for col in categorical:
+        data[col] = translator.translate_series(data[col].astype('category'))
+    return data
+
+
+def bench_transitions(rows: int, legacy_limit: int = 1_000_000):
+    """Compare the per-patient transition loop with the sort-and-shift builder"""
+    data = make_dashboard_data(rows)
+    print(f"Patient transitions from {rows:,} visits")
+
+    new_seconds, result = time_call(build_transitions, data)
+    if rows <= legacy_limit:
+        old_seconds, expected = time_call(legacy_build_transitions, data)
+        assert same_transitions(result, expected, data), "transitions"
+        report("groupby loop + dicts", rows, old_seconds)
+        report("sort once + shift", rows, new_seconds, old_seconds)
+    else:
+        report("sort once + shift", rows, new_seconds)
+    print(f"  {len(result):,} transitions")
+
+
+def legacy_network_stats(data: pd.DataFrame, transitions: pd.DataFrame) -> tuple:
+    """Edge and node statistics with per-group mode() lambdas and one scan per provider (reference)"""
+    def mode(x):
+        return x.mode().iloc[0] if not x.mode().empty else 'Unknown'
+
+    edges = transitions.groupby(['from', 'to'], observed=True).agg(
+        {'patient_id': 'count', 'age': mode, 'gender': mode, 'reason': mode}).reset_index()
+    edges.columns = ['from', 'to', 'weight', 'common_age', 'common_gender', 'common_reason']
+
+    nodes = []
+    for provider in sorted(set(edges['from']) | set(edges['to'])):
+        provider_data = data[data['healthcare_provider_type'] == provider]
+        nodes.append({
+            'provider': provider,
+            'unique_patients': provider_data['patient_id'].nunique(),
+            'total_visits': len(provider_data),
+            'avg_age': mode(provider_data['age']),
+            'common_reason': mode(provider_data['reason_for_treatment']),
+            'provider_group': mode(provider_data['healthcare_provider_main_group']),
+        })
+    return edges, pd.DataFrame(nodes)
+
+
+def network_stats(data: pd.DataFrame, transitions: pd.DataFrame) -> tuple:
+    edges = aggregate_edges(transitions)
+    return edges, node_statistics(data, set(edges['from']) | set(edges['to']))
+
+
+def bench_network(rows: int, provider_types: int, legacy_limit: int = 1_000_000):
+    """Compare mode() lambdas and per-provider scans with count-based group modes"""
+    data = make_dashboard_data(rows, n_provider_types=provider_types)
+    transitions = build_transitions(data)
+    print(f"Edge and node statistics for {rows:,} visits, {provider_types} provider types "
+          f"({len(transitions):,} transitions)")
+
+    new_seconds, result = time_call(network_stats, data, transitions)
+    if rows <= legacy_limit:
+        old_seconds, expected = time_call(legacy_network_stats, data, transitions)
+        for got, want in zip(result, expected):
+            assert got.astype(object).equals(want.astype(object)), "network stats"
+        report("mode() lambdas + provider scans", rows, old_seconds)
+        report("group modes from value counts", rows, new_seconds, old_seconds)
+    else:
+        report("group modes from value counts", rows, new_seconds)
+
+
+def bench_filters(rows: int, provider_types: int, min_transitions: int = 3):
+    """Compare rebuilding the network per filter change with slicing the FlowCube"""
+    data = make_dashboard_data(rows, n_provider_types=provider_types)
+    print(f"Network per filter change, {rows:,} visits, {provider_types} provider types")
+
+    # Each filter column (and one pair) with two values: the first selection
+    # builds the cube rollup for that column, the second only slices it
+    columns = [['age'], ['gender'], ['reason_for_treatment'], ['healthcare_provider_main_group'], ['age', 'gender']]
+    first_filters, next_filters = [{}], [{}]
+    for group in columns:
+        values = [data[column].dropna().unique()[:2] for column in group]
+        first_filters.append({column: value[0] for column, value in zip(group, values)})
+        next_filters.append({column: value[-1] for column, value in zip(group, values)})
+
+    def rebuild(filters):
+        filtered = data.copy()
+        for column, value in filters.items():
+            filtered = filtered[filtered[column] == value]
+        edges = aggregate_edges(build_transitions(filtered))
+        edges = edges[edges['weight'] >= min_transitions]
+        return edges, node_statistics(filtered, set(edges['from']) | set(edges['to']))
+
+    def slice_cube(filters):
+        edges = cube.edges(filters, min_transitions)
+        return edges, cube.node_stats(set(edges['from']) | set(edges['to']), filters), cube.visit_summary(filters)
+
+    def mean_ms(func, filter_sets):
+        return 1000 * sum(time_call(func, filters)[0] for filters in filter_sets) / len(filter_sets)
+
+    build_seconds, cube = time_call(FlowCube, data)
+    print(f"  cube build (once per load) {build_seconds:8.3f}s  "
+          f"{len(cube.transitions):,} transition cells, {len(cube.nodes):,} node cells")
+
+    old_ms = mean_ms(rebuild, next_filters)
+    first_ms = mean_ms(slice_cube, first_filters)
+    next_ms = mean_ms(slice_cube, next_filters)
+    print(f"  {'copy + filter + rebuild':42} {old_ms:8.1f} ms per filter change")
+    print(f"  {'cube, first use of a filter column':42} {first_ms:8.1f} ms")
+    print(f"  {'cube, later filter changes':42} {next_ms:8.1f} ms per filter change  ({old_ms / next_ms:5.1f}x)")
+
+
+# Columns the dashboard keeps in memory
+DASHBOARD_COLUMNS = ['patient_id', 'age', 'gender', 'reason_for_treatment', 'healthcare_provider_type',
+                     'healthcare_provider_main_group', 'client_type', 'client_main_group', 'start_date', 'end_date']
+TRANSLATED_COLUMNS = ['age', 'reason_for_treatment', 'healthcare_provider_type',
+                      'healthcare_provider_main_group', 'client_type', 'client_main_group']
+
+
+def truncate_label(text) -> str:
+    return text[:30] + '...' if len(str(text)) > 30 else str(text)
+
+
+def legacy_dashboard_layout(path: str, translator, infer_string: bool) -> pd.DataFrame:
+    """Dashboard CSV load before the compact layout: every column, per-row derived labels"""
+    with pd.option_context('future.infer_string', infer_string):
+        data = pd.read_csv(path, low_memory=False)
+        data['start_date'] = pd.to_datetime(data['start_date'], errors='coerce')
+        data['end_date'] = pd.to_datetime(data['end_date'], errors='coerce')
+        for col in TRANSLATED_COLUMNS:
+            data[col] = translator.translate_series(data[col])
+        data['treatment_duration_days'] = (data['end_date'] - data['start_date']).dt.days
+        data['year_month'] = data['start_date'].dt.to_period('M').astype(str)
+        data['provider_clean'] = data['healthcare_provider_type'].apply(truncate_label)
+    return data
+
+
+def compact_dashboard_layout(path: str, translator) -> pd.DataFrame:
+    """Dashboard CSV load with the compact layout of claims_layout"""
+    data = concat_claims([pd.read_csv(
+        path, low_memory=False, usecols=DASHBOARD_COLUMNS,
+        dtype={col: 'category' for col in DASHBOARD_COLUMNS if col not in ['start_date', 'end_date']}
+    )])
+    for col in TRANSLATED_COLUMNS:
+        data[col] = translator.translate_series(data[col])
+    compact_claims(data)
+    data['treatment_duration_days'] = (data['end_date'] - data['start_date']).dt.days.astype('Int32')
+    data['year_month'] = month_labels(data['start_date'])
+    data['provider_clean'] = map_categories(data['healthcare_provider_type'], truncate_label)
+    return data
+
+
+def bench_memory(rows: int):
+    """Compare the dashboard's in-memory footprint per million rows before and after the compact layout"""
+    translator = HealthcareDataConverter().translator
+    print(f"Dashboard data layout, {rows:,} CSV rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "claims.csv")
+        make_synthetic_claims(rows).to_csv(path, index=False)
+
+        layouts = [
+            ("all columns, object strings", lambda: legacy_dashboard_layout(path, translator, False)),
+            ("all columns, default string dtype", lambda: legacy_dashboard_layout(path, translator, True)),
+            ("compact (categorical + integer codes)", lambda: compact_dashboard_layout(path, translator)),
+        ]
+        baseline = None
+        for name, load in layouts:
+            seconds, data = time_call(load)
+            per_million = memory_per_million_rows(data)
+            baseline = baseline or per_million
+            print(f"  {name:42} {per_million:8.1f} MB per million rows  ({baseline / per_million:4.1f}x)  "
+                  f"load {seconds:6.2f}s")
+            del data
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def write_claims_csvs(directory: str, rows: int, files: int) -> list:
+    """
+    Write `rows` synthetic claims split over `files` CSV files that share one
+    patient population. Written in small pieces so generating them does not
+    raise the peak RSS.
+    """
+    paths = []
+    for number in range(files):
+        path = os.path.join(directory, f"claims_{number}.csv")
+        for piece in range(0, rows // files, 100_000):
+            claims = make_synthetic_claims(min(100_000, rows // files - piece), n_patients=max(1, rows // 20),
+                                           seed=number * 1000 + piece // 100_000)
+            claims.to_csv(path, index=False, mode='a', header=piece == 0)
+        paths.append(path)
+    return paths
+
+
+def dashboard_csv_chunks(paths: list, translator, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Stream CSV files as the dashboard reads them: used columns, categoricals, dates, translated"""
+    def prepare(chunk):
+        chunk['start_date'] = pd.to_datetime(chunk['start_date'], errors='coerce')
+        chunk['end_date'] = pd.to_datetime(chunk['end_date'], errors='coerce')
+        for col in TRANSLATED_COLUMNS:
+            chunk[col] = translator.translate_series(chunk[col])
+        return chunk
+
+    return read_csv_chunks(paths, chunksize=chunksize, columns=DASHBOARD_COLUMNS,
+                           categorical=[col for col in DASHBOARD_COLUMNS if col not in ['start_date', 'end_date']],
+                           prepare=prepare)
+
+
+def bench_outofcore(rows: int, partitions: int, files: int = 3, chunksize: int = DEFAULT_CHUNKSIZE):
+    """
+    Aggregate CSV files out of core (streamed chunks, patient-hash spill partitions)
+    and compare time, peak RSS growth and results with loading every row at once
+    """
+    translator = HealthcareDataConverter().translator
+    groupings = {'provider_clients': ['healthcare_provider_type', 'client_type']}
+
+    print(f"Full-dataset aggregates, {rows:,} rows in {files} CSV files")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_claims_csvs(tmp, rows, files)
+
+        def chunks(size):
+            return dashboard_csv_chunks(paths, translator, size)
+
+        # Out of core first: the process peak RSS only ever grows
+        start_rss = peak_rss_mb()
+        seconds, streamed = time_call(lambda: DatasetAggregates.from_chunks(chunks(chunksize), groupings, partitions))
+        print(f"  {f'out of core, {partitions} partitions':42} {seconds:8.3f}s  peak RSS +{peak_rss_mb() - start_rss:7.1f} MB")
+
+        start_rss = peak_rss_mb()
+        seconds, loaded = time_call(lambda: DatasetAggregates.from_frame(
+            concat_claims(list(chunks(rows))), groupings))
+        print(f"  {'all rows in memory':42} {seconds:8.3f}s  peak RSS +{peak_rss_mb() - start_rss:7.1f} MB")
+
+    same = (streamed.records == loaded.records
+            and streamed.cube.visit_summary() == loaded.cube.visit_summary()
+            and streamed.cube.transition_count() == loaded.cube.transition_count())
+    print(f"  same records, patients and transitions: {same}")
+
+
+def bench_sampling(rows: int, sizes: list, files: int = 3):
+    """
+    Compare the dashboard's head-of-file sample with the streaming patient
+    samples: load time, sample memory, and how complete the sampled journeys are
+    """
+    translator = HealthcareDataConverter().translator
+    strata = ['age', 'reason_for_treatment']
+
+    def journeys(sample):
+        visits = sample['patient_id'].astype(object).value_counts()
+        complete = (population.reindex(visits.index) == visits).mean()
+        smallest = sample.groupby(strata, observed=True).size().min()
+        return (f"{len(sample):9,} rows {len(visits):8,} patients  {visits.mean():5.2f} visits/patient  "
+                f"{complete:6.1%} complete  smallest stratum {smallest:7,} rows  "
+                f"{memory_per_million_rows(sample) * len(sample) / 1e6:6.1f} MB")
+
+    print(f"Dashboard samples of {rows:,} rows in {files} CSV files")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_claims_csvs(tmp, rows, files)
+        population = pd.concat([chunk['patient_id'].astype(object) for chunk in dashboard_csv_chunks(paths, translator)])
+        population = population.value_counts()
+        print(f"  population: {len(population):,} patients, {population.mean():.2f} visits/patient")
+
+        for size in sizes:
+            print(f"  sample size {size:,}")
+            methods = [
+                ("first rows of each file", lambda: concat_claims(
+                    [next(dashboard_csv_chunks([path], translator, size // files)) for path in paths])),
+                ("random patients (reservoir)", lambda: sample_patients(
+                    dashboard_csv_chunks(paths, translator), max_rows=size)),
+                ("patients stratified by age x reason", lambda: sample_patients(
+                    dashboard_csv_chunks(paths, translator), max_rows=size, strata=strata)),
+            ]
+            for name, load in methods:
+                seconds, sample = time_call(load)
+                print(f"    {name:36} {seconds:7.2f}s  {journeys(sample)}")
+
+
+def bench_schema(rows: int):
+    """Compare DB size and aggregate latency of the wide and normalized schemas"""
+    df = HealthcareDataConverter().clean_data(make_synthetic_claims(rows), verbose=False)
+    print(f"Wide vs normalized schema for {len(df):,} rows")
+
+    group_by_view = """
+        SELECT healthcare_provider_type, reason_for_treatment, COUNT(*)
+        FROM healthcare_records
+        GROUP BY healthcare_provider_type, reason_for_treatment
+    """
+    group_by_keys = """
+        SELECT p.value, r.value, t.n
+        FROM (
+            SELECT healthcare_provider_type_id, reason_for_treatment_id, COUNT(*) AS n
+            FROM healthcare_facts
+            GROUP BY healthcare_provider_type_id, reason_for_treatment_id
+        ) t
+        LEFT JOIN dim_healthcare_provider_type p ON p.id = t.healthcare_provider_type_id
+        LEFT JOIN dim_reason_for_treatment r ON r.id = t.reason_for_treatment_id
+    """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for schema in ("wide", "normalized"):
+            db_path = os.path.join(tmp, f"{schema}.db")
+            converter = HealthcareDataConverter(db_path, schema=schema)
+            converter.conn = sqlite3.connect(db_path)
+            converter.create_database_schema(create_indexes=False)
+            with converter.bulk_load():
+                converter.insert_data_to_db(df, method='executemany')
+                converter.create_indexes()
+            converter.conn.execute("VACUUM")
+
+            size_mb = os.path.getsize(db_path) / 1e6
+            print(f"  {schema:10} size {size_mb:8.1f} MB")
+            print(f"  {'':10} GROUP BY on healthcare_records     {time_query(converter.conn, group_by_view):8.3f}s")
+            if schema == "normalized":
+                print(f"  {'':10} GROUP BY on integer keys + lookup  {time_query(converter.conn, group_by_keys):8.3f}s")
+            converter.conn.close()
+
+
+def bench_sqlmode(rows: int):
+    """
+    Compare the dashboard's SQLite query mode, with transitions derived per
+    startup or read from the converter's patient_transitions table, with
+    loading the database rows into pandas: startup time, peak RSS growth and
+    one filter change
+    """
+    groupings = {'provider_clients': ['healthcare_provider_type', 'client_type']}
+    filters = {'age': '30-40 Years', 'gender': 'Female'}
+    print(f"SQLite query mode vs rows in pandas, {rows:,} rows")
+
+    def filter_change(aggregates):
+        edges = aggregates.cube.edges(filters, 3)
+        providers = set(edges['from']) | set(edges['to'])
+        return edges, aggregates.cube.node_stats(providers, filters), aggregates.cube.visit_summary(filters)
+
+    def load_rows(db_path):
+        with sqlite3.connect(db_path) as conn:
+            data = pd.read_sql_query(
+                f"SELECT {', '.join(DASHBOARD_COLUMNS)} FROM healthcare_records ORDER BY source_file, source_row", conn)
+        return compact_claims(data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wide.db")
+        converter = HealthcareDataConverter(db_path)
+        converter.conn = sqlite3.connect(db_path)
+        converter.create_database_schema(create_indexes=False)
+        # Loaded in small pieces so generating them does not raise the peak RSS
+        with converter.bulk_load():
+            for piece in range(0, rows, 100_000):
+                claims = make_synthetic_claims(min(100_000, rows - piece), n_patients=max(1, rows // 20),
+                                               seed=piece // 100_000)
+                converter.insert_data_to_db(converter.clean_data(claims, verbose=False), method='executemany')
+            converter.create_indexes()
+
+        def materialize():
+            converter.build_transitions_table()
+            converter.conn.commit()
+            converter.conn.close()
+
+        # SQL first: the process peak RSS only ever grows
+        results = []
+        for name, load in [
+            ("SQLite, derived transitions", lambda: SqlAggregates(db_path, groupings)),
+            ("SQLite, patient_transitions", lambda: SqlAggregates(db_path, groupings)),
+            ("rows loaded into pandas", lambda: DatasetAggregates.from_frame(load_rows(db_path), groupings)),
+        ]:
+            if name == "SQLite, patient_transitions":
+                seconds, _ = time_call(materialize)
+                print(f"  {'patient_transitions at ingest':28} built   {seconds:7.2f}s")
+            start_rss = peak_rss_mb()
+            seconds, aggregates = time_call(load)
+            print(f"  {name:28} startup {seconds:7.2f}s  peak RSS +{peak_rss_mb() - start_rss:7.1f} MB", end="")
+            seconds, result = time_call(filter_change, aggregates)
+            print(f"  filter change {seconds:6.3f}s")
+            results.append(result)
+
+    (edges_pd, nodes_pd, summary_pd) = results[-1]
+    same = all(edges.equals(edges_pd) and summary == summary_pd
+               and nodes.drop(columns='total_visits').equals(nodes_pd.drop(columns='total_visits'))
+               for edges, nodes, summary in results[:-1])
+    print(f"  same edges, node statistics and summary: {same}")
+
+
+def make_transition_graph(nodes: int, edges_per_node: int = 4, seed: int = 42) -> nx.DiGraph:
+    """Random directed provider network with skewed transition counts as weights"""
+    rng = np.random.default_rng(seed)
+    G = nx.gnm_random_graph(nodes, nodes * edges_per_node, seed=seed, directed=True)
+    for u, v in G.edges:
+        G.edges[u, v]['weight'] = int(rng.zipf(2.0))
+    return G
+
+
+def mean_displacement(pos_a: dict, pos_b: dict) -> float:
+    """Mean distance a node moves between two layouts (both scaled to [-1, 1])"""
+    nodes = [node for node in pos_a if node in pos_b]
+    return float(np.mean([np.linalg.norm(pos_a[node] - pos_b[node]) for node in nodes]))
+
+
+def bench_layout(nodes: int, legacy_limit: int = 2000):
+    """
+    Per-render layout cost of the Plotly network: the old unseeded spring
+    layout against LayoutCache (first render, unchanged rerender, and a
+    warm start after 5% of the edges change), with how far nodes move
+    """
+    G = make_transition_graph(nodes)
+    print(f"Network layout, {nodes:,} nodes, {G.number_of_edges():,} edges"
+          f"{' (spectral)' if nodes >= LARGE_GRAPH_NODES else ''}")
+    if nodes <= legacy_limit:
+        seconds, legacy = time_call(lambda: nx.spring_layout(G, k=1.5, iterations=50))
+        _, legacy_again = time_call(lambda: nx.spring_layout(G, k=1.5, iterations=50))
+        print(f"  {'unseeded spring layout':28} {seconds:8.3f}s  nodes move {mean_displacement(legacy, legacy_again):.3f}"
+              f" between reruns")
+    else:
+        print(f"  {'unseeded spring layout':28} skipped above {legacy_limit:,} nodes")
+
+    cache = LayoutCache()
+    seconds, first = time_call(cache.layout, G)
+    print(f"  {'LayoutCache, first render':28} {seconds:8.3f}s")
+    seconds, again = time_call(cache.layout, G.copy())
+    print(f"  {'LayoutCache, rerender':28} {seconds:8.3f}s  nodes move {mean_displacement(first, again):.3f}")
+
+    changed = G.copy()
+    rng = np.random.default_rng(1)
+    edges = list(changed.edges)
+    dropped = rng.choice(len(edges), len(edges) // 20, replace=False)
+    changed.remove_edges_from([edges[i] for i in dropped])
+    seconds, warm = time_call(cache.layout, changed)
+    print(f"  {'LayoutCache, 5% edges dropped':28} {seconds:8.3f}s  nodes move {mean_displacement(first, warm):.3f}")
+    print(f"  {cache.stats()}")
+
+
+def legacy_plotly_network(G: nx.DiGraph, pos: dict, node_attrs: dict) -> go.Figure:
+    """The former create_plotly_network figure: one arrow annotation per edge, every node labelled"""
+    # Create edge traces with arrows for directed graph
+    edge_x = []
+    edge_y = []
+    edge_info = []
+    annotations = []  # For arrows
+
+    for edge in G.edges(data=True):
+        x0, y0 = pos[edge[0]]
+        x1, y1 = pos[edge[1]]
+
+        # Calculate arrow position (75% along the edge)
+        arrow_x = x0 + 0.75 * (x1 - x0)
+        arrow_y = y0 + 0.75 * (y1 - y0)
+
+        # Calculate arrow direction
+        dx = x1 - x0
+        dy = y1 - y0
+        length = np.sqrt(dx*dx + dy*dy)
+
+        if length > 0:
+            # Normalize direction vector
+            dx_norm = dx / length
+            dy_norm = dy / length
+
+            # Add arrow annotation
+            annotations.append(
+                dict(
+                    x=arrow_x,
+                    y=arrow_y,
+                    ax=arrow_x - 0.02 * dx_norm,
+                    ay=arrow_y - 0.02 * dy_norm,
+                    xref='x', yref='y',
+                    axref='x', ayref='y',
+                    showarrow=True,
+                    arrowhead=2,
+                    arrowsize=1.5,
+                    arrowwidth=min(3, max(1, edge[2]['weight'] / 10)),
+                    arrowcolor='#666666',
+                    standoff=0
+                )
+            )
+
+        edge_x.extend([x0, x1, None])
+        edge_y.extend([y0, y1, None])
+        edge_info.append(f"From: {edge[0]}<br>To: {edge[1]}<br>Transitions: {edge[2]['weight']}")
+
+    # Create edge trace (lines without arrows, arrows added via annotations)
+    edge_trace = go.Scatter(
+        x=edge_x, y=edge_y,
+        line=dict(width=1, color='#888'),
+        hoverinfo='none',
+        mode='lines',
+        showlegend=False
+    )
+
+    # Create node traces
+    node_x = []
+    node_y = []
+    node_info = []
+    node_colors = []
+    node_sizes = []
+
+    color_map = {
+        'Hospitals': '#FF6B6B',
+        'Doctors': '#4ECDC4',
+        'Laboratories': '#45B7D1',
+        'Nursing Homes': '#96CEB4',
+        'Unknown': '#FFEAA7'
+    }
+
+    for node in G.nodes():
+        x, y = pos[node]
+        node_x.append(x)
+        node_y.append(y)
+
+        node_data = node_attrs.get(node, {})
+        node_info.append(
+            f"Provider: {node}<br>"
+            f"Unique Patients: {node_data.get('unique_patients', 'N/A')}<br>"
+            f"Total Visits: {node_data.get('total_visits', 'N/A')}<br>"
+            f"Provider Group: {node_data.get('provider_group', 'Unknown')}"
+        )
+
+        provider_group = node_data.get('provider_group', 'Unknown')
+        node_colors.append(color_map.get(provider_group, '#DDA0DD'))
+        node_sizes.append(min(30, max(8, node_data.get('unique_patients', 10) / 5)))
+
+    node_trace = go.Scatter(
+        x=node_x, y=node_y,
+        mode='markers+text',
+        hoverinfo='text',
+        text=[node[:15] + '...' if len(node) > 15 else node for node in G.nodes()],
+        textposition="middle center",
+        textfont=dict(size=8),
+        hovertext=node_info,
+        marker=dict(
+            size=node_sizes,
+            color=node_colors,
+            line=dict(width=2, color='white'),
+            opacity=0.8
+        ),
+        showlegend=False
+    )
+
+    # Create the figure with arrows
+    fig = go.Figure(
+        data=[edge_trace, node_trace],
+        layout=go.Layout(
+            title='Healthcare Provider Network (Directed)',
+            showlegend=False,
+            hovermode='closest',
+            margin=dict(b=20,l=5,r=5,t=40),
+            annotations=annotations + [dict(
+                text="Arrows show direction of patient flow between providers",
+                showarrow=False,
+                xref="paper", yref="paper",
+                x=0.005, y=-0.002,
+                xanchor='left', yanchor='bottom',
+                font=dict(color="gray", size=10)
+            )],
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            plot_bgcolor='white'
+        )
+    )
+
+    return fig
+
+
+def client_render_seconds(fig: go.Figure):
+    """
+    Time to draw the figure in headless Chromium through kaleido (the closest
+    to a browser render this script can get), or None when kaleido is not
+    installed or cannot start a browser (kaleido >= 1 needs a Chrome install)
+    """
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        return None
+    try:
+        seconds, _ = time_call(lambda: fig.to_image(format='png', width=1200, height=750))
+    except Exception as e:
+        print(f"  (no client render time: {e.__class__.__name__}: {str(e).splitlines()[0] if str(e) else ''})")
+        return None
+    return seconds
+
+
+def bench_render(edges: int, edges_per_node: int = 4):
+    """
+    Plotly network figure with one annotation per edge arrow vs the batched
+    traces of network_figure(): build time, serialized size and, with
+    kaleido installed, render time
+    """
+    G = make_transition_graph(max(2, edges // edges_per_node), edges_per_node)
+    G = nx.relabel_nodes(G, lambda node: f"Provider type {node}")
+    pos = LayoutCache().layout(G)
+    node_attrs = {node: {'unique_patients': int(G.degree(node, weight='weight')), 'total_visits': 0,
+                         'provider_group': 'Doctors'} for node in G}
+    print(f"Plotly network figure, {G.number_of_edges():,} edges, {len(G):,} nodes")
+    for name, build in [("annotation per edge", legacy_plotly_network), ("batched traces", network_figure)]:
+        seconds, fig = time_call(build, G, pos, node_attrs)
+        json_seconds, payload = time_call(fig.to_json)
+        render = client_render_seconds(fig)
+        print(f"  {name:22} build {seconds:6.3f}s  to_json {json_seconds:6.3f}s  "
+              f"payload {len(payload) / 2**10:9.1f} KB  {len(fig.data)} traces, "
+              f"{len(fig.layout.annotations):,} annotations  "
+              f"render {'n/a (needs kaleido and Chrome)' if render is None else f'{render:.2f}s'}")
+
+
+def make_id_links(ids: int, rows: int, seed: int = 42) -> tuple:
+    """
+    Provider ID -> client ID counts with heavy-tailed volumes and mostly
+    local referrals (ID neighbourhoods act as communities), plus the rows
+    per provider ID
+    """
+    rng = np.random.default_rng(seed)
+    providers = rng.zipf(1.5, rows) % ids
+    local = (providers + rng.integers(-20, 20, rows)) % ids
+    clients = np.where(rng.random(rows) < 0.7, local, rng.zipf(1.3, rows) % ids)
+    claims = pd.DataFrame({'healthcare_provider_id': providers.astype(str), 'client_id': clients.astype(str)})
+    links = claims.groupby(['healthcare_provider_id', 'client_id']).size().reset_index(name='counts')
+    return links, claims['healthcare_provider_id'].value_counts()
+
+
+def bench_summary(ids: int, budget: int, rows_per_id: int = 200, min_count: int = 1000):
+    """
+    Nodes and edges drawn for a provider ID network: the fixed min_count cut
+    against summarize_network() with a node budget
+    """
+    links, provider_counts = make_id_links(ids, ids * rows_per_id)
+    total = links['counts'].sum()
+    print(f"Provider ID network, {ids:,} IDs, {len(links):,} links")
+
+    def drawn(kept):
+        kept = kept[kept['healthcare_provider_id'] != kept['client_id']]
+        nodes = len(set(kept['healthcare_provider_id']) | set(kept['client_id']))
+        return f"{nodes:6,} nodes {len(kept):7,} edges  {kept['counts'].sum() / total:6.1%} of the flow"
+
+    for cut in [min_count, 1]:
+        print(f"  {f'min_count={cut}':30} {drawn(links[links['counts'] >= cut])}")
+    seconds, (summary, _) = time_call(lambda: summarize_network(
+        links, provider_counts, 'healthcare_provider_id', 'client_id', 'counts', max_nodes=budget))
+    print(f"  {f'summary, budget {budget} nodes':30} {drawn(summary)}  in {seconds:.2f}s")
+
+
+def bench_graph(edges: int, nx_limit: int = 500_000):
+    """
+    Sparse FlowGraph queries on a provider-ID-sized graph, against NetworkX
+    (dict of dicts) up to `nx_limit` edges
+    """
+    ids = max(10, edges // 50)
+    rng = np.random.default_rng(42)
+    sources = pd.Series(rng.integers(0, ids, edges)).map('P{}'.format)
+    targets = pd.Series(rng.zipf(1.3, edges) % ids).map('P{}'.format)
+    weights = rng.zipf(2.0, edges)
+    print(f"Provider flow graph, {ids:,} IDs, {edges:,} edge rows")
+
+    seconds, graph = time_call(FlowGraph.from_edges, sources, targets, weights)
+    node = graph.out_degree().idxmax()
+    queries = [
+        ("weighted out/in degree", lambda: (graph.out_degree(), graph.in_degree())),
+        ("PageRank", graph.pagerank),
+        ("top 5 neighbours", lambda: graph.top_neighbours(node, 5)),
+        ("2-hop reachability", lambda: graph.reachable([node], 2)),
+    ]
+    graph.transpose  # built once, on the first query that needs it
+    print(f"  {'FlowGraph build':32} {seconds:8.3f}s  {graph.n_edges:,} edges, "
+          f"{graph.memory_bytes() / 2**20:.1f} MB with its transpose")
+    for name, query in queries:
+        seconds, _ = time_call(query)
+        print(f"  {name:32} {seconds * 1000:8.1f} ms")
+
+    if edges > nx_limit:
+        print(f"  NetworkX skipped above {nx_limit:,} edges")
+        return
+    seconds, G = time_call(lambda: nx.from_pandas_edgelist(
+        graph.edges(), source='from', target='to', edge_attr='weight', create_using=nx.DiGraph()))
+    print(f"  {'NetworkX build':32} {seconds:8.3f}s")
+    for name, query in [
+        ("weighted out/in degree", lambda: (dict(G.out_degree(weight='weight')), dict(G.in_degree(weight='weight')))),
+        ("PageRank", lambda: nx.pagerank(G, weight='weight')),
+        ("top 5 neighbours", lambda: sorted(G[node].items(), key=lambda item: -item[1]['weight'])[:5]),
+        ("2-hop reachability", lambda: nx.single_source_shortest_path_length(G, node, cutoff=2)),
+    ]:
+        seconds, _ = time_call(query)
+        print(f"  {'NetworkX ' + name:32} {seconds * 1000:8.1f} ms")
+
+
+def scan_top_pathways(data: pd.DataFrame, start: str, length: int, k: int) -> pd.DataFrame:
+    """Top pathways from `start` recomputed from the visits, as a query without the index would"""
+    visits, _, _ = pair_consecutive_visits(data, ['healthcare_provider_type'])
+    patients = pd.factorize(visits['patient_id'])[0]
+    providers = visits['healthcare_provider_type'].astype(object).to_numpy()
+    n = len(visits) - length + 1
+    valid = (patients[:n] == patients[length - 1:]) & (providers[:n] == start)
+    steps = {column: providers[step:step + n][valid] for step, column in enumerate(STEP_COLUMNS[:length])}
+    counts = pd.DataFrame(steps).groupby(STEP_COLUMNS[:length]).size().reset_index(name='count')
+    return counts.sort_values('count', ascending=False, kind='stable').head(k).reset_index(drop=True)
+
+
+def bench_pathways(rows: int, scan_limit: int = 2_000_000):
+    """
+    PathwayIndex build time and size, and the latency of its queries against
+    recomputing the pathways from the visits for each query
+    """
+    data = make_dashboard_data(rows)
+    print(f"Patient pathways from {rows:,} visits")
+    seconds, index = time_call(PathwayIndex.from_frame, data)
+    print(f"  {'index build':34} {seconds:8.3f}s  {sum(index.n_pathways().values()):,} pathways, "
+          f"{index.memory_bytes() / 2**10:,.0f} KB")
+
+    start = index.providers[0]
+    pathway = index.top_pathways(start, 4, k=1).iloc[0, :4].tolist()
+    for name, query in [
+        ("top 10 3-visit pathways", lambda: index.top_pathways(start, 3, k=10)),
+        ("Sankey links, 4 visits", lambda: index.pathway_links(start, 4, k=20)),
+        ("count of one 4-visit pathway", lambda: index.count(pathway)),
+    ]:
+        seconds, _ = time_call(query)
+        print(f"  {'index: ' + name:34} {seconds * 1000:8.2f} ms")
+
+    if rows <= scan_limit:
+        seconds, expected = time_call(scan_top_pathways, data, start, 3, 10)
+        result = index.top_pathways(start, 3, k=10)
+        assert result['count'].tolist() == expected['count'].tolist(), "pathway counts"
+        print(f"  {'scan: top 10 3-visit pathways':34} {seconds * 1000:8.2f} ms")
+
+
+def legacy_provider_panel(aggregates: DatasetAggregates, provider: str) -> tuple:
+    """The provider panel as the dashboard computed it per selected provider: scans of the cube and counts"""
+    patients, visits = aggregates.cube.provider_patients(provider)
+    flows = aggregates.counts('provider_clients')
+    flows = flows[(flows['healthcare_provider_type'] == provider) & flows['client_type'].notna()]
+    return patients, visits, flows.set_index('client_type')['count'].sort_values(ascending=False)
+
+
+def bench_providers(rows: int):
+    """Provider panel per provider switch: scans of the aggregates vs ProviderProfiles lookups"""
+    data = make_dashboard_data(rows)
+    rng = np.random.default_rng(42)
+    data['client_type'] = data['healthcare_provider_type'].to_numpy()[rng.permutation(len(data))]
+    aggregates = DatasetAggregates.from_frame(data, {'provider_clients': ['healthcare_provider_type', 'client_type']})
+    providers = aggregates.cube.values('healthcare_provider_type')
+    print(f"Provider panel, {rows:,} visits, {len(providers)} providers")
+
+    seconds, profiles = time_call(ProviderProfiles.from_aggregates, aggregates, 'provider_clients')
+    print(f"  {'profiles build (once per load)':34} {seconds * 1000:8.1f} ms")
+    old_seconds, expected = time_call(lambda: [legacy_provider_panel(aggregates, p) for p in providers])
+    new_seconds, result = time_call(lambda: [(*profiles.patients(p), profiles.client_flows(p)) for p in providers])
+    assert all(a[:2] == b[:2] and dict(a[2]) == dict(b[2]) for a, b in zip(expected, result)), "provider panel"
+    print(f"  {'scans per switch':34} {old_seconds / len(providers) * 1000:8.3f} ms")
+    print(f"  {'profile lookups per switch':34} {new_seconds / len(providers) * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline micro-benchmarks on synthetic data")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    insert_parser = subparsers.add_parser("insert", help="SQLite insert throughput")
+    insert_parser.add_argument("--rows", type=int, default=500_000)
+
+    schema_parser = subparsers.add_parser("schema", help="Wide vs normalized DB size and GROUP BY latency")
+    schema_parser.add_argument("--rows", type=int, default=500_000)
+
+    clean_parser = subparsers.add_parser("clean", help="Vectorized clean_data steps vs the row-wise versions")
+    clean_parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+
+    transitions_parser = subparsers.add_parser("transitions", help="Patient transition extraction")
+    transitions_parser.add_argument("--rows", type=int, nargs="+", default=[200_000, 10_000_000])
+
+    network_parser = subparsers.add_parser("network", help="Edge and node statistics of the provider network")
+    network_parser.add_argument("--rows", type=int, nargs="+", default=[200_000, 10_000_000])
+    network_parser.add_argument("--provider-types", type=int, default=150)
+
+    filters_parser = subparsers.add_parser("filters", help="Network rebuild vs FlowCube slice per filter change")
+    filters_parser.add_argument("--rows", type=int, nargs="+", default=[200_000, 2_000_000])
+    filters_parser.add_argument("--provider-types", type=int, default=150)
+
+    memory_parser = subparsers.add_parser("memory", help="Dashboard in-memory footprint per million rows")
+    memory_parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+
+    outofcore_parser = subparsers.add_parser("outofcore", help="Out-of-core full-dataset aggregates vs loading every row")
+    outofcore_parser.add_argument("--rows", type=int, nargs="+", default=[2_000_000])
+    outofcore_parser.add_argument("--partitions", type=int, default=4)
+
+    sqlmode_parser = subparsers.add_parser("sqlmode", help="SQLite query mode vs loading the database rows")
+    sqlmode_parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+
+    layout_parser = subparsers.add_parser("layout", help="Network layout per render, uncached vs LayoutCache")
+    layout_parser.add_argument("--nodes", type=int, nargs="+", default=[100, 1000, 3000])
+
+    render_parser = subparsers.add_parser("render", help="Plotly network: per-edge annotations vs batched traces")
+    render_parser.add_argument("--edges", type=int, nargs="+", default=[100, 1000, 10_000])
+
+    summary_parser = subparsers.add_parser("summary", help="Provider ID network: min_count cut vs budgeted summary")
+    summary_parser.add_argument("--ids", type=int, nargs="+", default=[1000, 10_000])
+    summary_parser.add_argument("--budget", type=int, default=150)
+
+    graph_parser = subparsers.add_parser("graph", help="Sparse FlowGraph queries vs NetworkX")
+    graph_parser.add_argument("--edges", type=int, nargs="+", default=[200_000, 5_000_000])
+
+    pathways_parser = subparsers.add_parser("pathways", help="Pathway index queries vs a scan of the visits")
+    pathways_parser.add_argument("--rows", type=int, nargs="+", default=[200_000, 2_000_000])
+
+    providers_parser = subparsers.add_parser("providers", help="Provider panel: per-switch scans vs ProviderProfiles")
+    providers_parser.add_argument("--rows", type=int, nargs="+", default=[200_000, 2_000_000])
+
+    sampling_parser = subparsers.add_parser("sampling", help="Head-of-file sample vs streaming patient samples")
+    sampling_parser.add_argument("--rows", type=int, default=1_000_000)
+    sampling_parser.add_argument("--sizes", type=int, nargs="+", default=[50_000, 200_000])
+
+    args = parser.parse_args()
+
+    # Keep the converter's per-batch logging out of the timings output
+    logging.getLogger("csv_to_sql_converter").setLevel(logging.WARNING)
+
+    if args.benchmark == "insert":
+        bench_insert(args.rows)
+    elif args.benchmark == "schema":
+        bench_schema(args.rows)
+    elif args.benchmark == "clean":
+        for rows in args.rows:
+            bench_clean(rows)
+    elif args.benchmark == "transitions":
+        for rows in args.rows:
+            bench_transitions(rows)
+    elif args.benchmark == "network":
+        for rows in args.rows:
+            bench_network(rows, args.provider_types)
+    elif args.benchmark == "filters":
+        for rows in args.rows:
+            bench_filters(rows, args.provider_types)
+    elif args.benchmark == "outofcore":
+        for rows in args.rows:
+            bench_outofcore(rows, args.partitions)
+    elif args.benchmark == "sqlmode":
+        for rows in args.rows:
+            bench_sqlmode(rows)
+    elif args.benchmark == "layout":
+        for nodes in args.nodes:
+            bench_layout(nodes)
+    elif args.benchmark == "render":
+        for edges in args.edges:
+            bench_render(edges)
+    elif args.benchmark == "summary":
+        for ids in args.ids:
+            bench_summary(ids, args.budget)
+    elif args.benchmark == "graph":
+        for edges in args.edges:
+            bench_graph(edges)
+    elif args.benchmark == "pathways":
+        for rows in args.rows:
+            bench_pathways(rows)
+    elif args.benchmark == "providers":
+        for rows in args.rows:
+            bench_providers(rows)
+    elif args.benchmark == "sampling":
+        bench_sampling(args.rows, args.sizes)
+    elif args.benchmark == "memory":
+        for rows in args.rows:
+            bench_memory(rows)
@@ -0,0 +1,92 @@
+"""
+Compact in-memory layout of the cleaned claims held by the dashboards.
+
+Low-cardinality text columns are categoricals (an integer code per row plus
+one copy of each distinct value), identifiers are dense integer codes and
+dates are datetime64. Display labels derived from a categorical column are
+computed once per category rather than once per row.
+"""
+
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from parquet_store import CATEGORICAL_COLUMNS
+
+# Identifiers that are only compared and counted, never displayed
+ID_COLUMNS = ['patient_id', 'healthcare_provider_id', 'client_id']
+
+DATE_COLUMNS = ['start_date', 'end_date']
+
+
+def map_categories(series: pd.Series, func: Callable) -> pd.Series:
+    """
+    Apply `func` to each category of a categorical series instead of each row.
+    Categories mapped to the same label are merged; missing values stay missing.
+    """
+    labels = pd.Index([func(value) for value in series.cat.categories], dtype=object)
+    codes_by_category, categories = pd.factorize(labels)
+    # Missing values have code -1, which picks the trailing -1
+    lookup = np.append(codes_by_category, -1)
+    return pd.Series(
+        pd.Categorical.from_codes(lookup[series.cat.codes.to_numpy()], categories=categories),
+        index=series.index,
+        name=series.name
+    )
+
+
+def integer_codes(series: pd.Series) -> pd.Series:
+    """Dense Int32 codes of an identifier column, in sorted order (missing stays <NA>)"""
+    codes, _ = pd.factorize(series, sort=True)
+    return pd.Series(
+        pd.arrays.IntegerArray(codes.astype(np.int32), codes < 0),
+        index=series.index,
+        name=series.name
+    )
+
+
+def month_labels(dates: pd.Series) -> pd.Series:
+    """'YYYY-MM' of each date as a categorical, formatted once per distinct month"""
+    months = dates.to_numpy().astype('datetime64[M]')
+    codes, uniques = pd.factorize(months, sort=True)
+    categories = np.datetime_as_string(np.asarray(uniques, dtype='datetime64[M]'), unit='M')
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=dates.index, name=dates.name)
+
+
+def concat_claims(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate frames read separately. Columns that are categorical in every
+    frame get the union of their categories first, so they stay categorical
+    instead of falling back to object. The input frames are left unchanged.
+    """
+    frames = [frame.copy(deep=False) for frame in frames]
+    for col in frames[0].columns:
+        if all(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames if col in frame):
+            categories = pd.Index(pd.unique(np.concatenate(
+                [frame[col].cat.categories.to_numpy(dtype=object) for frame in frames if col in frame])))
+            for frame in frames:
+                if col in frame:
+                    frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def compact_claims(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the claims in `df` to the compact layout, in place; returns df"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            df[col] = integer_codes(df[col])
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def memory_per_million_rows(df: pd.DataFrame) -> float:
+    """Memory held by `df` (values, strings included) in MB per million rows"""
+    if len(df) == 0:
+        return 0.0
+    return df.memory_usage(deep=True).sum() / 2**20 * 1e6 / len(df)
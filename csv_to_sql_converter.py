@@ -9,282 +9,48 @@ import sqlite3
 import numpy as np
 from pathlib import Path
 import logging
-from typing import Dict, Any
+import argparse
+import hashlib
+import shutil
+import time
+from contextlib import contextmanager, nullcontext
+from collections import deque
+from itertools import compress
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List
 import warnings
 
+from translation import GERMAN_TO_ENGLISH, Translator
+from parquet_store import DEFAULT_PARQUET_DIR, delete_parquet_source, parquet_dataset_exists, write_parquet_chunk
+
 # Configurazione logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class HealthcareDataConverter:
-    def __init__(self, db_path: str = "healthcare_data_english.db"):
+    def __init__(self, db_path: str = "healthcare_data_english.db", schema: str = "wide"):
         """
         Inizializza il convertitore con percorso del database
         
         Args:
             db_path: Percorso del file database SQLite
+            schema: 'wide' (una tabella healthcare_records con tutte le stringhe) oppure
+                'normalized' (tabelle di lookup + tabella dei fatti con chiavi intere,
+                esposte dalla vista healthcare_records)
         """
+        if schema not in ('wide', 'normalized'):
+            raise ValueError(f"Schema non supportato: {schema}")
+        
         self.db_path = db_path
+        self.schema = schema
         self.conn = None
         
-        # Dizionario traduzioni dal tedesco all'inglese
-        self.translations = {
-            # Age groups
-            '0-10 Jahre': '0-10 Years',
-            '10-20 Jahre': '10-20 Years', 
-            '20-30 Jahre': '20-30 Years',
-            '30-40 Jahre': '30-40 Years',
-            '40-50 Jahre': '40-50 Years',
-            '50-60 Jahre': '50-60 Years',
-            '60-70 Jahre': '60-70 Years',
-            '70-80 Jahre': '70-80 Years',
-            '80-90 Jahre': '80-90 Years',
-            '90+ Jahre': '90+ Years',
-            
-            # Reasons for treatment
-            'Krankheit': 'Illness',
-            'Unfall': 'Accident',
-            'Mutterschaft': 'Maternity',
-            'Prävention': 'Prevention',
-            'Vorsorge': 'Preventive Care',
-            'Nachsorge': 'Follow-up Care',
-            
-            # Healthcare provider main groups
-            'Spitäler': 'Hospitals',
-            'SpitÃ¤ler': 'Hospitals',  # Handle encoding issues
-            'Ärzte und Ärztinnen': 'Doctors',
-            'Ã„rzte und Ã„rztinnen': 'Doctors',  # Handle encoding issues
-            'Laboratorien': 'Laboratories',
-            'Pflegeheime': 'Nursing Homes',
-            'Apotheken': 'Pharmacies',
-            'Physiotherapie': 'Physiotherapy',
-            'Ergotherapie': 'Occupational Therapy',
-            'Psychologie': 'Psychology',
-            'Zahnärzte': 'Dentists',
-            'Optiker': 'Opticians',
-            'Abgabestellen Mittel und Gegenstände': 'Medical Device Dispensing Points',
-            'Chiropraktoren und Chiropraktorinnen': 'Chiropractors',
-            'Ergotherapeuten und Ergotherapeutinnen': 'Occupational Therapists',
-            'Ernährungsberater und Ernährungsberaterinnen': 'Nutritional Counselors',
-            'Fitness': 'Fitness',
-            'Hebammen': 'Midwives',
-            'Komplementärtherapeuten und -therapeutinnen': 'Complementary Therapists',
-            'Logopäden und Logopädinnen': 'Speech Therapists',
-            'Neuropsychologen und Neuropsychologinnen': 'Neuropsychologists',
-            'Organisationen der Krankenpflege & Hilfe zu Hause': 'Nursing & Home Care Organizations',
-            'Pflegefachmänner und Pflegefachfrauen': 'Professional Nurses',
-            'Physiotherapeuten und Physiotherapeutinnen': 'Physiotherapists',
-            'Podologen und Podologinnen': 'Podologists',
-            'Psych. Psychotherapeuten und Psychotherapeutinnen': 'Psychological Psychotherapists',
-            'Transport-/Rettungsunternehmen': 'Transport/Rescue Companies',
-            'Übrige Rechnungssteller': 'Other Billing Entities',
-            
-            # Healthcare provider types (extended)
-            'Zentrumsversorgung, Niveau 1': 'Central Care, Level 1',
-            'Zentrumsversorgung, Niveau 2': 'Central Care, Level 2',
-            'Zentrumsversorgung, Niveau 3': 'Central Care, Level 3',
-            'Zentrumsversorgung, Niveau 4': 'Central Care, Level 4',
-            'Zentrumsversorgung, Niveau 5': 'Central Care, Level 5',
-            'Zentrumsversorgung': 'Central Care',
-            'Grundversorgung': 'Basic Care',
-            'Spezialisierte Psychiatrie': 'Specialized Psychiatry',
-            'Psychiatrische Kliniken': 'Psychiatric Clinics',
-            'Rehabilitation': 'Rehabilitation',
-            'Gruppenpraxen': 'Group Practices',
-            'Einzelpraxen': 'Individual Practices',
-            'Gemeinschaftspraxen': 'Community Practices',
-            'Polikliniken': 'Polyclinics',
-            'Tageskliniken': 'Day Clinics',
-            'Ambulatorien': 'Outpatient Clinics',
-            'Notfallzentren': 'Emergency Centers',
-            'Universitätsspitäler': 'University Hospitals',
-            'Regionalspitäler': 'Regional Hospitals',
-            'Kantonsspitäler': 'Cantonal Hospitals',
-            'Privatspitäler': 'Private Hospitals',
-            'Spezialkliniken': 'Specialty Clinics',
-            'Spezialkliniken Chirurgie': 'Surgical Specialty Clinics',
-            'Pflegeheime': 'Nursing Homes',
-            'Privatlaboratorien': 'Private Laboratories',
-            'Mikrobiologie/Genetik-Laboratorien': 'Microbiology/Genetics Laboratories',
-            'Mikrobiologie-Laboratorien': 'Microbiology Laboratories',
-            'Organisationen der Apotheker und Apothekerinnen': 'Pharmacy Organizations',
-            'Organisationen der Krankenpflege & Hilfe zu Hause': 'Nursing & Home Care Organizations',
-            'Physiotherapeuten und Physiotherapeutinnen': 'Physiotherapists',
-            'Chiropraktoren und Chiropraktorinnen': 'Chiropractors',
-            'Psych. Psychotherapeuten und Psychotherapeutinnen': 'Psychological Psychotherapists',
-            'praktischer Arzt / Ärztin': 'General Practitioner',
-            'Ärzte, Spezialfälle': 'Doctors, Special Cases',
-            'Übrige Rechnungssteller': 'Other Billing Entities',
-            'Übrige Rechnungssteller, Spezialfälle': 'Other Billing Entities, Special Cases',
-            'Abgabestellen Mittel und Gegenstände': 'Medical Device Dispensing Points',
-            'Akut- und Übergangspflege': 'Acute and Transitional Care',
-            'Alters- und Pflegeheime': 'Elderly and Nursing Homes',
-            'Apotheken, Spezialfälle': 'Pharmacies, Special Cases',
-            'Blutspendezentren': 'Blood Donation Centers',
-            'Diverse Spezialkliniken': 'Various Specialty Clinics',
-            'Ergotherapeuten und Ergotherapeutinnen': 'Occupational Therapists',
-            'Ergotherapiezentren': 'Occupational Therapy Centers',
-            'Ernährungsberater und Ernährungsberaterinnen': 'Nutritional Counselors',
-            'Ernährungsberatung, Organisation': 'Nutritional Counseling, Organization',
-            'Fitness': 'Fitness',
-            'Geburtshäuser': 'Birth Centers',
-            'Gemeinsame Einrichtung KVG': 'Joint Health Insurance Institution',
-            'Genetik-Laboratorien': 'Genetics Laboratories',
-            'Grundversorgung, Niveau 3': 'Basic Care, Level 3',
-            'Grundversorgung, Niveau 4': 'Basic Care, Level 4',
-            'Grundversorgung, Niveau 5': 'Basic Care, Level 5',
-            'Hebammen': 'Midwives',
-            'Heime für Behinderte': 'Homes for Disabled',
-            'Komplementärtherapeuten und -therapeutinnen': 'Complementary Therapists',
-            'Logopäden und Logopädinnen': 'Speech Therapists',
-            'Neuropsychologen und Neuropsychologinnen': 'Neuropsychologists',
-            'Organisationen der Chiropraktik': 'Chiropractic Organizations',
-            'Organisationen der Hebammen': 'Midwife Organizations',
-            'Organisationen der Krankenpflege & Hilfe zu Hause AÜP': 'Nursing & Home Care Organizations AÜP',
-            'Organisationen der Krankenpflege & Hilfe zu Hause TON': 'Nursing & Home Care Organizations TON',
-            'Organisationen der Logopädie': 'Speech Therapy Organizations',
-            'Organisationen der Neuropsychologie': 'Neuropsychology Organizations',
-            'Organisationen der Physiotherapie': 'Physiotherapy Organizations',
-            'Organisationen der Podologie': 'Podology Organizations',
-            'Organisationen der psychologischen Psychotherapie': 'Psychological Psychotherapy Organizations',
-            'Pflegefachmänner und Pflegefachfrauen': 'Professional Nurses',
-            'Pflegeheime, Spezialfälle (ohne BUR-Zurodnung)': 'Nursing Homes, Special Cases (without BUR assignment)',
-            'Podologen und Podologinnen': 'Podologists',
-            'Prävention und Gesundheitswesen': 'Prevention and Public Health',
-            'Psychiatrische Kliniken, Niveau 1': 'Psychiatric Clinics, Level 1',
-            'Psychiatrische Kliniken, Niveau 2': 'Psychiatric Clinics, Level 2',
-            'Rehabilitationskliniken': 'Rehabilitation Clinics',
-            'Spezialkliniken Geriatrie': 'Geriatric Specialty Clinics',
-            'Spezialkliniken Pädiatrie': 'Pediatric Specialty Clinics',
-            'Spitäler, Spezialfälle (ohne BUR-Zuordnung)': 'Hospitals, Special Cases (without BUR assignment)',
-            'Tages- oder Nachtstrukturen TON': 'Day or Night Structures TON',
-            'Transport-/Rettungsunternehmen, Spezialfälle': 'Transport/Rescue Companies, Special Cases',
-            'Zentrumsversorgung, Niveau 1 (Universitätsspitäler)': 'Central Care, Level 1 (University Hospitals)',
-            'Diabetesgesellschaften': 'Diabetes Societies',
-            
-            # Medical specialties (extended)
-            'Kinder- und Jugendmedizin': 'Pediatrics',
-            'Kinder- und Jugendpsychiatrie und -psychotherapie': 'Child and Adolescent Psychiatry and Psychotherapy',
-            'Gynäkologie und Geburtshilfe': 'Gynecology and Obstetrics',
-            'GynÃ¤kologie und Geburtshilfe': 'Gynecology and Obstetrics',  # Handle encoding issues
-            'Psychiatrie und Psychotherapie': 'Psychiatry and Psychotherapy',
-            'Chirurgie': 'Surgery',
-            'Innere Medizin': 'Internal Medicine',
-            'Allgemeine Innere Medizin': 'General Internal Medicine',
-            'Radiologie': 'Radiology',
-            'Anästhesiologie': 'Anesthesiology',
-            'Dermatologie': 'Dermatology',
-            'Dermatologie und Venerologie': 'Dermatology and Venereology',
-            'Ophthalmologie': 'Ophthalmology',
-            'Orthopädie': 'Orthopedics',
-            'Neurologie': 'Neurology',
-            'Urologie': 'Urology',
-            'HNO': 'ENT (Ear, Nose, Throat)',
-            'Oto-Rhino-Laryngologie': 'Otorhinolaryngology (ENT)',
-            'Kardiologie': 'Cardiology',
-            'Onkologie': 'Oncology',
-            'Endokrinologie': 'Endocrinology',
-            'Rheumatologie': 'Rheumatology',
-            'Nephrologie': 'Nephrology',
-            'Pneumologie': 'Pneumology',
-            'Gastroenterologie': 'Gastroenterology',
-            'Hämatologie': 'Hematology',
-            'Infektiologie': 'Infectious Diseases',
-            'Notfallmedizin': 'Emergency Medicine',
-            'Allgemeinmedizin': 'General Medicine',
-            'Hausarztmedizin': 'Family Medicine',
-            'Tropenmedizin': 'Tropical Medicine',
-            'Arbeitsmedizin': 'Occupational Medicine',
-            'Sportmedizin': 'Sports Medicine',
-            'Geriatrie': 'Geriatrics',
-            'Palliativmedizin': 'Palliative Medicine',
-            'Intensivmedizin': 'Intensive Care Medicine',
-            'Nuklearmedizin': 'Nuclear Medicine',
-            'Pathologie': 'Pathology',
-            'Rechtsmedizin': 'Forensic Medicine',
-            'Labormedizin': 'Laboratory Medicine',
-            'Mikrobiologie': 'Microbiology',
-            'Immunologie': 'Immunology',
-            'Genetik': 'Genetics',
-            'Toxikologie': 'Toxicology',
-            'Pharmakologie': 'Pharmacology',
-            'Hygiene': 'Hygiene',
-            'Epidemiologie': 'Epidemiology',
-            'Biostatistik': 'Biostatistics',
-            'Physikalische Medizin und Rehabilitation': 'Physical Medicine and Rehabilitation',
-            'Allergologie und klinische Immunologie': 'Allergology and Clinical Immunology',
-            'Angiologie': 'Angiology',
-            'Arbeitsmedizin': 'Occupational Medicine',
-            'Gefässchirurgie': 'Vascular Surgery',
-            'Handchirurgie': 'Hand Surgery',
-            'Herz- und thorakale Gefässchirurgie': 'Cardiac and Thoracic Vascular Surgery',
-            'Infektiologie': 'Infectious Diseases',
-            'Intensivmedizin': 'Intensive Care Medicine',
-            'Kiefer- und Gesichtschirurgie': 'Oral and Maxillofacial Surgery',
-            'Kinderchirurgie': 'Pediatric Surgery',
-            'Klinische Pharmakologie und Toxikologie': 'Clinical Pharmacology and Toxicology',
-            'Medizinische Genetik': 'Medical Genetics',
-            'Medizinische Onkologie': 'Medical Oncology',
-            'Neurochirurgie': 'Neurosurgery',
-            'Orthopädische Chirurgie und Traumatologie des Bewegungsapparates': 'Orthopedic Surgery and Traumatology of the Locomotor System',
-            'Plastische, Rekonstruktive und Ästhetische Chirurgie': 'Plastic, Reconstructive and Aesthetic Surgery',
-            'Radio-Onkologie und Strahlentherapie': 'Radio-Oncology and Radiation Therapy',
-            'Tropen- und Reisemedizin': 'Tropical and Travel Medicine',
-            
-            # Other healthcare services
-            'Spitex': 'Home Care',
-            'Ambulante Pflege': 'Outpatient Care',
-            'Stationäre Pflege': 'Inpatient Care',
-            'Langzeitpflege': 'Long-term Care',
-            'Kurzzeitpflege': 'Short-term Care',
-            'Tagespflege': 'Day Care',
-            'Nachtpflege': 'Night Care',
-            'Palliativpflege': 'Palliative Care',
-            'Hospiz': 'Hospice',
-            'Diabetesberatung': 'Diabetes Counseling',
-            'Ernährungsberatung': 'Nutritional Counseling',
-            'Sozialberatung': 'Social Counseling',
-            'Psychologische Beratung': 'Psychological Counseling',
-            'Seelsorge': 'Pastoral Care',
-            'Logopädie': 'Speech Therapy',
-            'Podologie': 'Podology',
-            'Osteopathie': 'Osteopathy',
-            'Chiropraktik': 'Chiropractic',
-            'Homöopathie': 'Homeopathy',
-            'Naturheilkunde': 'Naturopathy',
-            'Akupunktur': 'Acupuncture',
-            'Massage': 'Massage',
-            'Fitness': 'Fitness',
-            'Wellness': 'Wellness',
-            
-            # Gender terms
-            'M': 'Male',
-            'F': 'Female',
-            'W': 'Female',
-            'männlich': 'Male',
-            'weiblich': 'Female',
-            
-            # Common German words that might appear
-            'und': 'and',
-            'oder': 'or',
-            'mit': 'with',
-            'ohne': 'without',
-            'für': 'for',
-            'von': 'from',
-            'zu': 'to',
-            'in': 'in',
-            'an': 'at',
-            'auf': 'on',
-            'bei': 'at',
-            'nach': 'after',
-            'vor': 'before',
-            'über': 'about',
-            'unter': 'under',
-            'durch': 'through',
-            'um': 'around',
-            'gegen': 'against',
-            'zwischen': 'between',
-        }
+        # Cartella del dataset Parquet da generare insieme al database (opzionale)
+        self.parquet_dir = None
+        
+        # Dizionario traduzioni dal tedesco all'inglese (condiviso con la dashboard)
+        self.translations = GERMAN_TO_ENGLISH
+        self.translator = Translator(self.translations, partial_match='words')
         
         # Definizione tipi di dati corretti per ogni colonna
         self.dtype_mapping = {
@@ -302,7 +68,9 @@ class HealthcareDataConverter:
             'end_date': 'DATE',
             'tariff': 'VARCHAR(3)',  # Sempre 3 caratteri dopo pulizia
             'tariff_position': 'VARCHAR(50)',
-            'quantity': 'REAL'
+            'quantity': 'REAL',
+            'source_file': 'VARCHAR(100)',  # File CSV di origine (per l'ingest incrementale)
+            'source_row': 'INTEGER'  # Posizione della riga pulita nel suo file
         }
         
         # Tipi pandas per caricamento CSV
@@ -324,6 +92,98 @@ class HealthcareDataConverter:
             'quantity': 'float64'
         }
         
+        # Formato delle date nei CSV (es. "2023-05-23")
+        self.date_format = '%Y-%m-%d'
+        
+        # Colonne usate per l'impronta delle righe nella rimozione dei duplicati
+        self.fingerprint_columns = [
+            'patient_id',
+            'healthcare_provider_id',
+            'start_date',
+            'tariff_position',
+            'quantity'
+        ]
+        
+        # Indici creati sulla tabella healthcare_records
+        self.indices = [
+            "CREATE INDEX IF NOT EXISTS idx_patient_id ON healthcare_records(patient_id)",
+            "CREATE INDEX IF NOT EXISTS idx_start_date ON healthcare_records(start_date)", 
+            "CREATE INDEX IF NOT EXISTS idx_tariff ON healthcare_records(tariff)",
+            "CREATE INDEX IF NOT EXISTS idx_provider ON healthcare_records(healthcare_provider_id)",
+            "CREATE INDEX IF NOT EXISTS idx_provider_type ON healthcare_records(healthcare_provider_type)",
+            "CREATE INDEX IF NOT EXISTS idx_reason ON healthcare_records(reason_for_treatment)",
+            "CREATE INDEX IF NOT EXISTS idx_source_file ON healthcare_records(source_file)"
+        ]
+        
+        # Colonne categoriche salvate come chiavi intere nello schema normalizzato
+        self.lookup_columns = [
+            'age',
+            'gender',
+            'reason_for_treatment',
+            'healthcare_provider_type',
+            'healthcare_provider_main_group',
+            'client_type',
+            'client_main_group'
+        ]
+        
+        # Indici sulla tabella dei fatti (schema normalizzato)
+        self.normalized_indices = [
+            "CREATE INDEX IF NOT EXISTS idx_facts_patient_id ON healthcare_facts(patient_id)",
+            "CREATE INDEX IF NOT EXISTS idx_facts_start_date ON healthcare_facts(start_date)",
+            "CREATE INDEX IF NOT EXISTS idx_facts_tariff ON healthcare_facts(tariff)",
+            "CREATE INDEX IF NOT EXISTS idx_facts_provider ON healthcare_facts(healthcare_provider_id)",
+            "CREATE INDEX IF NOT EXISTS idx_facts_provider_type ON healthcare_facts(healthcare_provider_type_id)",
+            "CREATE INDEX IF NOT EXISTS idx_facts_reason ON healthcare_facts(reason_for_treatment_id)",
+            "CREATE INDEX IF NOT EXISTS idx_facts_source_file ON healthcare_facts(source_file)",
+            # Indice coprente (solo interi, molto compatto) per i GROUP BY sulle dimensioni principali
+            "CREATE INDEX IF NOT EXISTS idx_facts_dimensions ON healthcare_facts("
+            "healthcare_provider_type_id, reason_for_treatment_id, age_id, gender_id, healthcare_provider_main_group_id)"
+        ]
+        
+        # Tabella delle transizioni tra visite consecutive di un paziente,
+        # materializzata durante la conversione (letta dalle dashboard)
+        self.transitions_table = 'patient_transitions'
+        self.transition_columns = {
+            'from_type': 'TEXT',
+            'to_type': 'TEXT',
+            'patient_id': 'VARCHAR(50)',
+            'age': 'VARCHAR(20)',
+            'gender': 'VARCHAR(10)',
+            'reason': 'VARCHAR(100)',
+            'from_group': 'VARCHAR(100)',  # Gruppo del provider della prima visita
+            'to_group': 'VARCHAR(100)',    # Gruppo del provider della seconda visita
+            'from_date': 'DATE',
+            'to_date': 'DATE'
+        }
+        
+        # Indici coprenti su patient_transitions: conteggi per filtri demografici,
+        # archi (con i pazienti distinti) e percorso di un singolo paziente
+        self.transition_indices = [
+            "CREATE INDEX IF NOT EXISTS idx_transitions_filters ON patient_transitions("
+            "age, gender, reason, from_group, to_group, from_type, to_type)",
+            "CREATE INDEX IF NOT EXISTS idx_transitions_edges ON patient_transitions(from_type, to_type, patient_id)",
+            "CREATE INDEX IF NOT EXISTS idx_transitions_patient ON patient_transitions(patient_id, from_date)"
+        ]
+        
+        # Ordine delle visite di un paziente: a parità di data vale la posizione
+        # nel file di origine, che non cambia quando un file viene ricaricato
+        # (l'id autoincrementale sì, quindi un ingest incrementale cambierebbe
+        # l'ordine delle visite dello stesso giorno)
+        self.visit_order = "start_date IS NULL, start_date, source_file, source_row"
+        
+        # Prossima posizione source_row di ogni file (continua tra i blocchi)
+        self.next_source_row = {}
+        
+        # Cache valore -> id delle tabelle di lookup (schema normalizzato)
+        self.lookup_ids = {}
+        
+        # PRAGMA usati durante il caricamento massivo (bulk load)
+        self.bulk_load_pragmas = {
+            'journal_mode': 'MEMORY',
+            'synchronous': 'OFF',
+            'cache_size': -262144  # 256 MB (valori negativi = KiB)
+        }
+        
         # Colonne da tradurre
         self.columns_to_translate = [
             'age',
@@ -339,38 +199,25 @@ class HealthcareDataConverter:
         """
         Traduce un testo dal tedesco all'inglese usando il dizionario
         """
-        if pd.isna(text) or text is None:
-            return text
-            
-        text_str = str(text).strip()
-        
-        # Cerca traduzione diretta
-        if text_str in self.translations:
-            return self.translations[text_str]
-        
-        # Cerca traduzioni parziali (per testi composti)
-        translated_parts = []
-        for part in text_str.split():
-            if part in self.translations:
-                translated_parts.append(self.translations[part])
-            else:
-                translated_parts.append(part)
-        
-        return ' '.join(translated_parts) if translated_parts else text_str
+        return self.translator.translate_text(text)
 
-    def translate_column(self, series: pd.Series, column_name: str) -> pd.Series:
+    def translate_column(self, series: pd.Series, column_name: str, verbose: bool = True) -> pd.Series:
         """
-        Traduce un'intera colonna pandas dal tedesco all'inglese
+        Traduce un'intera colonna pandas dal tedesco all'inglese.
+        Ogni valore distinto viene tradotto una sola volta.
         """
+        translated_series = self.translator.translate_series(series)
+        
+        if not verbose:
+            return translated_series
+        
         logger.info(f"Traduzione colonna '{column_name}' in corso...")
         
-        # Prima mostra alcuni esempi di traduzioni
+        # Mostra alcuni esempi di traduzioni
         unique_values = series.dropna().unique()[:10]
         logger.info(f"Esempi traduzioni per '{column_name}':")
         
-        translated_series = series.apply(self.translate_text)
-        
-        for orig, trans in zip(unique_values, translated_series[series.isin(unique_values)].unique()[:10]):
+        for orig, trans in self.translator.translate_values(unique_values).items():
             if orig != trans:
                 logger.info(f"  '{orig}' -> '{trans}'")
         
@@ -381,37 +228,83 @@ class HealthcareDataConverter:
         Pulisce i codici tariff per assicurarsi che siano tutti stringhe a 3 cifre:
         - Rimuove .0 dai float (es. "312.0" -> "312")  
         - Aggiunge padding di zeri a sinistra per codici corti (es. "99" -> "099", "1" -> "001")
+        
+        Le operazioni sulle stringhe vengono eseguite una sola volta per ogni
+        codice distinto e poi riportate su tutte le righe.
         """
-        def clean_single_tariff(value):
-            if pd.isna(value):
-                return None
-                
-            # Converti a stringa
-            str_value = str(value).strip()
-            
-            # Rimuovi .0 se presente
-            if str_value.endswith('.0'):
-                str_value = str_value[:-2]
-            
-            # Gestisci caso 'nan'
-            if str_value.lower() == 'nan':
-                return None
-                
-            # Assicurati che sia numerico dopo la pulizia
-            if str_value.isdigit():
-                # Aggiungi padding di zeri a sinistra per raggiungere 3 cifre
-                return str_value.zfill(3)
-            else:
-                # Se non è numerico, restituisci come stringa (gestisce casi edge)
-                return str_value
+        codes, uniques = pd.factorize(tariff_series)
+        
+        values = pd.Series(uniques, dtype='string').str.strip().str.removesuffix('.0')
+        
+        # Gestisci caso 'nan'
+        values = values.mask(values.str.lower() == 'nan')
+        
+        # Padding di zeri a sinistra solo per i codici numerici (gli altri restano invariati)
+        values = values.where(~values.str.isdigit().fillna(False), values.str.zfill(3))
+        
+        # I valori mancanti (codice -1) diventano None
+        cleaned = np.append(values.to_numpy(dtype=object, na_value=None), None)
+        return pd.Series(cleaned.take(codes), index=tariff_series.index, name=tariff_series.name)
+
+    def parse_dates(self, date_series: pd.Series) -> pd.Series:
+        """
+        Converte una colonna di date testuali in datetime.
+        
+        Ogni data distinta viene convertita una sola volta con il formato
+        esplicito self.date_format. Se nessuna data lo rispetta si torna al
+        riconoscimento automatico del formato di pandas.
+        """
+        codes, uniques = pd.factorize(date_series)
         
-        return tariff_series.apply(clean_single_tariff)
+        uniques = pd.Index(uniques, dtype=object)
+        parsed = pd.to_datetime(uniques, format=self.date_format, errors='coerce')
+        if len(uniques) and parsed.isna().all():
+            parsed = pd.to_datetime(uniques, errors='coerce')
+        
+        # I valori mancanti (codice -1) diventano NaT
+        values = parsed.append(pd.DatetimeIndex([pd.NaT], dtype=parsed.dtype))
+        return pd.Series(values.take(codes), index=date_series.index, name=date_series.name)
+
+    def row_fingerprints(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Impronta a 64 bit di ogni riga, calcolata colonna per colonna
+        """
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
 
-    def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def drop_duplicate_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Equivalente a df.drop_duplicates(), ma più veloce.
+        
+        Ogni riga riceve un'impronta a 64 bit calcolata dai codici interi
+        delle sole colonne di self.fingerprint_columns (quelle con più
+        valori distinti). Due righe uguali hanno per forza la stessa
+        impronta, quindi il confronto completo di tutte le colonne viene
+        fatto solo sulle poche righe con impronta ripetuta.
+        """
+        codes = pd.DataFrame({
+            col: pd.factorize(df[col])[0]
+            for col in self.fingerprint_columns if col in df.columns
+        })
+        fingerprints = pd.util.hash_pandas_object(codes, index=False)
+        candidates = fingerprints.duplicated(keep=False).to_numpy()
+        
+        if not candidates.any():
+            return df
+        
+        keep = np.ones(len(df), dtype=bool)
+        keep[candidates] = ~df[candidates].duplicated().to_numpy()
+        return df[keep]
+
+    def clean_data(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
         """
         Pulisce e prepara i dati per l'inserimento nel database, inclusa la traduzione
+        
+        Args:
+            df: DataFrame grezzo letto dai CSV
+            verbose: Se False non registra gli esempi di traduzione (utile per i blocchi)
         """
-        logger.info("Pulizia e traduzione dati in corso...")
+        if verbose:
+            logger.info("Pulizia e traduzione dati in corso...")
         
         # Crea una copia per evitare SettingWithCopyWarning
         df = df.copy()
@@ -422,11 +315,11 @@ class HealthcareDataConverter:
         # 2. Traduci le colonne testuali
         for column in self.columns_to_translate:
             if column in df.columns:
-                df[column] = self.translate_column(df[column], column)
+                df[column] = self.translate_column(df[column], column, verbose=verbose)
         
         # 3. Converti date
-        df['start_date'] = pd.to_datetime(df['start_date'], errors='coerce')
-        df['end_date'] = pd.to_datetime(df['end_date'], errors='coerce')
+        df['start_date'] = self.parse_dates(df['start_date'])
+        df['end_date'] = self.parse_dates(df['end_date'])
         
         # 4. Riempi end_date mancanti con start_date
         mask = df['end_date'].isna()
@@ -442,61 +335,454 @@ class HealthcareDataConverter:
         df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce')
         
         # 7. Rimuovi eventuali duplicati
-        df = df.drop_duplicates()
+        df = self.drop_duplicate_rows(df)
         
-        logger.info(f"Dati puliti e tradotti: {len(df):,} record")
+        if verbose:
+            logger.info(f"Dati puliti e tradotti: {len(df):,} record")
         return df
 
-    def create_database_schema(self):
+    def create_database_schema(self, create_indexes: bool = True):
         """
         Crea lo schema del database con i tipi corretti
+        
+        Args:
+            create_indexes: Se False gli indici vanno creati dopo il caricamento
+                con create_indexes() (più veloce per grandi volumi)
         """
-        logger.info("Creazione schema database (versione inglese)...")
+        logger.info(f"Creazione schema database (versione inglese, schema {self.schema})...")
+        
+        self.drop_existing_schema()
+        
+        if self.schema == 'normalized':
+            self.create_normalized_schema()
+        else:
+            # Crea la tabella healthcare_records
+            columns_sql = []
+            for col, sql_type in self.dtype_mapping.items():
+                columns_sql.append(f"{col} {sql_type}")
+            
+            create_table_sql = f"""
+            CREATE TABLE IF NOT EXISTS healthcare_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {', '.join(columns_sql)},
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+            
+            self.conn.execute(create_table_sql)
+        
+        self.create_manifest_table()
+        
+        # Crea indici per performance
+        if create_indexes:
+            self.create_indexes()
+            
+        self.conn.commit()
+        logger.info("Schema database creato con successo")
+
+    def drop_existing_schema(self):
+        """
+        Elimina tabelle e viste di una conversione precedente (di entrambi gli schemi)
+        """
+        existing = dict(self.conn.execute(
+            "SELECT name, type FROM sqlite_master WHERE name = 'healthcare_records'"
+        ).fetchall())
+        
+        if existing.get('healthcare_records') == 'view':
+            self.conn.execute("DROP VIEW healthcare_records")
+        else:
+            self.conn.execute("DROP TABLE IF EXISTS healthcare_records")
+        
+        self.conn.execute("DROP TABLE IF EXISTS healthcare_facts")
+        for col in self.lookup_columns:
+            self.conn.execute(f"DROP TABLE IF EXISTS dim_{col}")
+        self.conn.execute("DROP TABLE IF EXISTS ingest_manifest")
+        self.conn.execute(f"DROP TABLE IF EXISTS {self.transitions_table}")
+        
+        self.lookup_ids = {}
+
+    def create_normalized_schema(self):
+        """
+        Crea lo schema normalizzato: una tabella di lookup dim_<colonna> per
+        ogni colonna categorica, la tabella dei fatti healthcare_facts con
+        chiavi intere e la vista healthcare_records con la stessa forma della
+        tabella dello schema 'wide', così le query esistenti continuano a funzionare.
+        """
+        fact_columns_sql = []
+        view_columns_sql = []
+        view_joins_sql = []
         
-        # Crea la tabella healthcare_records
-        columns_sql = []
         for col, sql_type in self.dtype_mapping.items():
-            columns_sql.append(f"{col} {sql_type}")
+            if col in self.lookup_columns:
+                self.conn.execute(f"""
+                CREATE TABLE dim_{col} (
+                    id INTEGER PRIMARY KEY,
+                    value {sql_type} NOT NULL UNIQUE
+                )
+                """)
+                fact_columns_sql.append(f"{col}_id INTEGER REFERENCES dim_{col}(id)")
+                view_columns_sql.append(f"dim_{col}.value AS {col}")
+                view_joins_sql.append(f"LEFT JOIN dim_{col} ON dim_{col}.id = f.{col}_id")
+            else:
+                fact_columns_sql.append(f"{col} {sql_type}")
+                view_columns_sql.append(f"f.{col}")
         
-        create_table_sql = f"""
-        CREATE TABLE IF NOT EXISTS healthcare_records (
+        self.conn.execute(f"""
+        CREATE TABLE healthcare_facts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            {', '.join(columns_sql)},
+            {', '.join(fact_columns_sql)},
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
+        """)
+        
+        self.conn.execute(f"""
+        CREATE VIEW healthcare_records AS
+        SELECT f.id, {', '.join(view_columns_sql)}, f.created_at
+        FROM healthcare_facts f
+        {' '.join(view_joins_sql)}
+        """)
+
+    def create_manifest_table(self):
+        """
+        Crea la tabella ingest_manifest: un record per ogni file CSV caricato,
+        con dimensione, mtime e hash del contenuto (per riconoscere i file
+        modificati) e l'intervallo di id delle righe inserite
+        """
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_manifest (
+            source_file VARCHAR(100) PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            content_hash VARCHAR(64) NOT NULL,
+            first_id INTEGER,
+            last_id INTEGER,
+            row_count INTEGER NOT NULL,
+            ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+
+    def build_transitions_table(self, changed_patients: str = None):
         """
+        Materializza patient_transitions: una riga per ogni coppia di visite
+        consecutive dello stesso paziente (ordinate per start_date, a parità
+        di data per file e posizione nel file), calcolata da SQLite con LAG()
+        senza portare le righe in pandas. Età, genere e motivo sono quelli
+        della visita di partenza, come in flow_analytics.build_transitions().
         
-        self.conn.execute("DROP TABLE IF EXISTS healthcare_records")
-        self.conn.execute(create_table_sql)
+        Args:
+            changed_patients: Tabella (temporanea) con la colonna patient_id dei
+                soli pazienti da ricalcolare (ingest incrementale); None = tutti
+        """
+        start = time.perf_counter()
+        table = self.transitions_table
         
-        # Crea indici per performance
-        indices = [
-            "CREATE INDEX IF NOT EXISTS idx_patient_id ON healthcare_records(patient_id)",
-            "CREATE INDEX IF NOT EXISTS idx_start_date ON healthcare_records(start_date)", 
-            "CREATE INDEX IF NOT EXISTS idx_tariff ON healthcare_records(tariff)",
-            "CREATE INDEX IF NOT EXISTS idx_provider ON healthcare_records(healthcare_provider_id)",
-            "CREATE INDEX IF NOT EXISTS idx_provider_type ON healthcare_records(healthcare_provider_type)",
-            "CREATE INDEX IF NOT EXISTS idx_reason ON healthcare_records(reason_for_treatment)"
-        ]
+        if changed_patients is None:
+            self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            columns_sql = ', '.join(f"{col} {sql_type}" for col, sql_type in self.transition_columns.items())
+            self.conn.execute(f"CREATE TABLE {table} ({columns_sql})")
+            # Il + evita che SQLite scorra idx_patient_id leggendo ogni riga a salti
+            patients_sql = "+patient_id IS NOT NULL"
+        else:
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE patient_id IN (SELECT patient_id FROM {changed_patients})"
+            )
+            patients_sql = f"patient_id IN (SELECT patient_id FROM {changed_patients})"
+        
+        inserted = self.conn.execute(f"""
+        INSERT INTO {table} ({', '.join(self.transition_columns)})
+        SELECT {', '.join(self.transition_columns)}
+        FROM (
+            SELECT ROW_NUMBER() OVER patient_visits > 1 AS has_previous,
+                   LAG(healthcare_provider_type) OVER patient_visits AS from_type,
+                   healthcare_provider_type AS to_type,
+                   patient_id,
+                   LAG(age) OVER patient_visits AS age,
+                   LAG(gender) OVER patient_visits AS gender,
+                   LAG(reason_for_treatment) OVER patient_visits AS reason,
+                   LAG(healthcare_provider_main_group) OVER patient_visits AS from_group,
+                   healthcare_provider_main_group AS to_group,
+                   LAG(start_date) OVER patient_visits AS from_date,
+                   start_date AS to_date
+            FROM healthcare_records
+            WHERE {patients_sql}
+            WINDOW patient_visits AS (PARTITION BY +patient_id ORDER BY {self.visit_order})
+        )
+        WHERE has_previous
+        """).rowcount
+        
+        if changed_patients is None:
+            for idx_sql in self.transition_indices:
+                self.conn.execute(idx_sql)
+        
+        logger.info(f"Transizioni materializzate in {table}: {inserted:,} righe "
+                    f"in {time.perf_counter() - start:.1f}s")
+
+    def collect_changed_patients(self, source_files: List[str], table: str = 'changed_patients'):
+        """
+        Aggiunge alla tabella temporanea `table` i pazienti con righe nei file
+        indicati: le loro transizioni vanno ricalcolate dopo l'ingest
+        """
+        self.conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} (patient_id VARCHAR(50) PRIMARY KEY)")
+        for source_file in source_files:
+            self.conn.execute(
+                f"INSERT OR IGNORE INTO {table} "
+                f"SELECT DISTINCT patient_id FROM {self.fact_table} "
+                f"WHERE source_file = ? AND patient_id IS NOT NULL",
+                (source_file,)
+            )
+        return table
+
+    @property
+    def fact_table(self) -> str:
+        """
+        Tabella in cui vengono inserite le righe (healthcare_records è una
+        vista nello schema normalizzato)
+        """
+        return 'healthcare_facts' if self.schema == 'normalized' else 'healthcare_records'
+
+    def load_lookup_ids(self):
+        """
+        Ricarica la cache valore -> id dalle tabelle di lookup esistenti
+        (schema normalizzato, ingest incrementale)
+        """
+        self.lookup_ids = {
+            col: {value: value_id for value_id, value in self.conn.execute(f"SELECT id, value FROM dim_{col}")}
+            for col in self.lookup_columns
+        }
+
+    def encode_lookup_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Sostituisce le colonne categoriche con gli id delle tabelle di lookup,
+        inserendo nelle tabelle i valori non ancora visti.
+        Ogni valore distinto viene cercato una sola volta per blocco.
+        """
+        df_encoded = df.copy()
+        
+        for col in self.lookup_columns:
+            ids = self.lookup_ids.setdefault(col, {})
+            codes, uniques = pd.factorize(df_encoded[col])
+            
+            new_values = [value for value in uniques if value not in ids]
+            if new_values:
+                # Dopo prune_lookup_tables gli id possono avere buchi
+                next_id = max(ids.values(), default=0) + 1
+                new_ids = {value: next_id + i for i, value in enumerate(new_values)}
+                self.conn.executemany(
+                    f"INSERT INTO dim_{col} (id, value) VALUES (?, ?)",
+                    [(value_id, value) for value, value_id in new_ids.items()]
+                )
+                ids.update(new_ids)
+            
+            # I valori mancanti (codice -1) diventano NULL
+            id_values = np.array([ids[value] for value in uniques] + [None], dtype=object)
+            df_encoded[f"{col}_id"] = id_values.take(codes)
+            df_encoded = df_encoded.drop(columns=col)
+        
+        return df_encoded
+
+    def prune_lookup_tables(self):
+        """
+        Elimina dalle tabelle di lookup i valori che nessuna riga usa più
+        (schema normalizzato, dopo aver eliminato le righe di file modificati
+        o rimossi nell'ingest incrementale)
+        """
+        for col in self.lookup_columns:
+            pruned = self.conn.execute(
+                f"DELETE FROM dim_{col} WHERE id NOT IN "
+                f"(SELECT {col}_id FROM healthcare_facts WHERE {col}_id IS NOT NULL)"
+            ).rowcount
+            if pruned:
+                logger.info(f"Eliminati {pruned:,} valori non più usati da dim_{col}")
+        self.load_lookup_ids()
+
+    def create_indexes(self):
+        """
+        Crea gli indici sulla tabella healthcare_records
+        """
+        start = time.perf_counter()
+        indices = self.normalized_indices if self.schema == 'normalized' else self.indices
         
         for idx_sql in indices:
             self.conn.execute(idx_sql)
-            
-        self.conn.commit()
-        logger.info("Schema database creato con successo")
+        
+        logger.info(f"Creati {len(indices)} indici in {time.perf_counter() - start:.1f}s")
 
-    def load_csv_files(self, data_dir: str = "data", max_files: int = None) -> pd.DataFrame:
+    @contextmanager
+    def bulk_load(self):
         """
-        Carica tutti i file CSV con i tipi corretti
+        Configura SQLite per il caricamento massivo: imposta i PRAGMA di
+        self.bulk_load_pragmas, esegue tutto in un'unica transazione e
+        ripristina i valori originali alla fine.
         """
-        logger.info("Caricamento file CSV...")
+        self.conn.commit()
+        previous = {
+            pragma: self.conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in self.bulk_load_pragmas
+        }
+        for pragma, value in self.bulk_load_pragmas.items():
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
         
+        try:
+            yield
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            for pragma, value in previous.items():
+                self.conn.execute(f"PRAGMA {pragma} = {value}")
+
+    def find_csv_files(self, data_dir: str = "data", max_files: int = None) -> List[Path]:
+        """
+        Restituisce la lista ordinata dei file CSV da convertire
+        """
         data_path = Path(data_dir)
         csv_files = sorted(data_path.glob("data_css_challenge_*.csv"))
         
         if max_files:
             csv_files = csv_files[:max_files]
         
+        return csv_files
+
+    def compute_file_hash(self, csv_file: Path) -> str:
+        """
+        Hash SHA-256 del contenuto di un file, letto a blocchi da 1 MB
+        """
+        digest = hashlib.sha256()
+        with open(csv_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def can_ingest_incrementally(self) -> bool:
+        """
+        True se il database contiene già una conversione con manifest e con
+        lo stesso schema, e il dataset Parquet richiesto esiste già
+        """
+        tables = {name for (name,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        
+        if 'ingest_manifest' not in tables:
+            return False
+        if ('healthcare_facts' in tables) != (self.schema == 'normalized'):
+            return False
+        if self.parquet_dir and not parquet_dataset_exists(self.parquet_dir):
+            return False
+        # Conversioni precedenti a source_row: l'ordine delle visite va ricostruito da zero
+        columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({self.fact_table})")}
+        if 'source_row' not in columns:
+            return False
+        return True
+
+    def plan_incremental_ingest(self, csv_files: List[Path], remove_missing: bool = True):
+        """
+        Confronta i file con ingest_manifest.
+        
+        Un file con stessa dimensione e mtime è considerato invariato senza
+        leggerlo; se cambia solo l'mtime si confronta l'hash del contenuto.
+        
+        Args:
+            csv_files: File trovati nella cartella dei dati
+            remove_missing: Se True anche i file nel manifest ma non più
+                presenti vengono eliminati dal database
+        
+        Returns:
+            Tupla (file da inserire, nomi dei file le cui righe vanno eliminate,
+            hash già calcolati per nome del file, da passare a record_ingested_files)
+        """
+        manifest = {
+            name: (size, mtime, content_hash)
+            for name, size, mtime, content_hash in self.conn.execute(
+                "SELECT source_file, size, mtime, content_hash FROM ingest_manifest"
+            )
+        }
+        
+        files_to_ingest, file_hashes = [], {}
+        for csv_file in csv_files:
+            entry = manifest.get(csv_file.name)
+            stat = csv_file.stat()
+            
+            if entry is not None:
+                size, mtime, content_hash = entry
+                if stat.st_size == size and stat.st_mtime == mtime:
+                    continue
+                if stat.st_size == size:
+                    file_hashes[csv_file.name] = self.compute_file_hash(csv_file)
+                if file_hashes.get(csv_file.name) == content_hash:
+                    # File solo "toccato": aggiorna l'mtime senza ricaricarlo
+                    self.conn.execute(
+                        "UPDATE ingest_manifest SET mtime = ? WHERE source_file = ?",
+                        (stat.st_mtime, csv_file.name)
+                    )
+                    continue
+            
+            files_to_ingest.append(csv_file)
+        
+        # Le righe dei file da (re)inserire vengono sempre eliminate prima: così
+        # anche un caricamento interrotto a metà (file non ancora nel manifest)
+        # non lascia duplicati
+        files_to_delete = [csv_file.name for csv_file in files_to_ingest]
+        if remove_missing:
+            present = {csv_file.name for csv_file in csv_files}
+            files_to_delete += [name for name in manifest if name not in present]
+        
+        logger.info(f"Ingest incrementale: {len(files_to_ingest)} file nuovi o modificati, "
+                    f"{len(csv_files) - len(files_to_ingest)} invariati, "
+                    f"{len(files_to_delete) - len(files_to_ingest)} rimossi")
+        
+        return files_to_ingest, files_to_delete, file_hashes
+
+    def delete_source_files(self, source_files: List[str]):
+        """
+        Elimina dal database (e dal dataset Parquet) le righe provenienti dai
+        file indicati, insieme alle loro voci nel manifest
+        """
+        for source_file in source_files:
+            deleted = self.conn.execute(
+                f"DELETE FROM {self.fact_table} WHERE source_file = ?", (source_file,)
+            ).rowcount
+            self.conn.execute("DELETE FROM ingest_manifest WHERE source_file = ?", (source_file,))
+            
+            if self.parquet_dir:
+                delete_parquet_source(self.parquet_dir, source_file)
+            
+            if deleted:
+                logger.info(f"Eliminati {deleted:,} record di {source_file}")
+
+    def record_ingested_files(self, csv_files: List[Path], file_hashes: Dict[str, str] = None):
+        """
+        Registra nel manifest i file appena caricati, con l'intervallo di id
+        e il numero delle loro righe. L'hash viene calcolato solo per i file
+        che non sono già in file_hashes (vedi plan_incremental_ingest).
+        """
+        file_hashes = file_hashes or {}
+        for csv_file in csv_files:
+            stat = csv_file.stat()
+            first_id, last_id, row_count = self.conn.execute(
+                f"SELECT MIN(id), MAX(id), COUNT(*) FROM {self.fact_table} WHERE source_file = ?",
+                (csv_file.name,)
+            ).fetchone()
+            
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO ingest_manifest
+                    (source_file, size, mtime, content_hash, first_id, last_id, row_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (csv_file.name, stat.st_size, stat.st_mtime,
+                 file_hashes.get(csv_file.name) or self.compute_file_hash(csv_file),
+                 first_id, last_id, row_count)
+            )
+
+    def load_csv_files(self, data_dir: str = "data", max_files: int = None,
+                       csv_files: List[Path] = None) -> pd.DataFrame:
+        """
+        Carica tutti i file CSV con i tipi corretti (oppure solo `csv_files`, se indicati)
+        """
+        logger.info("Caricamento file CSV...")
+        
+        if csv_files is None:
+            csv_files = self.find_csv_files(data_dir, max_files)
+        
         dataframes = []
         
         for i, csv_file in enumerate(csv_files):
@@ -518,13 +804,70 @@ class HealthcareDataConverter:
         
         return combined_df
 
-    def insert_data_to_db(self, df: pd.DataFrame, batch_size: int = 10000):
+    def iter_csv_chunks(self, csv_file: Path, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Legge un file CSV a blocchi di dimensione limitata (modalità streaming)
+        """
+        reader = pd.read_csv(
+            csv_file,
+            dtype=self.pandas_dtypes,
+            low_memory=False,
+            chunksize=chunksize
+        )
+        
+        for chunk in reader:
+            chunk['source_file'] = csv_file.name
+            yield chunk
+
+    def drop_seen_duplicates(self, df: pd.DataFrame, seen_hashes: set) -> pd.DataFrame:
+        """
+        Rimuove i duplicati già visti nei blocchi precedenti dello stesso file
+        e aggiunge a seen_hashes le righe rimaste.
+        
+        Ogni riga è rappresentata da un hash a 64 bit in un set, quindi ogni
+        blocco costa un lookup per riga (senza riordinare gli hash già visti)
+        e la memoria cresce di circa 70 byte per riga unica invece che con
+        l'intero DataFrame.
+        """
+        row_hashes = self.row_fingerprints(df).tolist()
+        keep = np.fromiter((row_hash not in seen_hashes for row_hash in row_hashes), dtype=bool,
+                           count=len(row_hashes))
+        seen_hashes.update(compress(row_hashes, keep))
+        
+        return df[keep]
+
+    def number_source_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggiunge source_row: la posizione di ogni riga pulita nel suo file,
+        continuando dal blocco precedente dello stesso file. Dipende solo dal
+        contenuto del file, quindi è la stessa in ogni modalità di conversione
+        e dopo un ingest incrementale.
+        """
+        positions = df.groupby('source_file', sort=False, observed=True).cumcount().to_numpy()
+        offsets = df['source_file'].map(self.next_source_row).fillna(0).to_numpy(dtype=np.int64)
+        df = df.assign(source_row=positions + offsets)
+        
+        last_rows = df.groupby('source_file', sort=False, observed=True)['source_row'].max()
+        self.next_source_row.update({name: int(row) + 1 for name, row in last_rows.items()})
+        return df
+
+    def insert_data_to_db(self, df: pd.DataFrame, batch_size: int = 10000, method: str = 'to_sql'):
         """
         Inserisce i dati nel database a batch
+        
+        Args:
+            df: DataFrame pulito da inserire
+            batch_size: Righe per batch
+            method: 'to_sql' usa DataFrame.to_sql con commit a ogni batch;
+                'executemany' usa uno statement preparato senza commit, da
+                usare dentro bulk_load() (un'unica transazione)
         """
         logger.info("Inserimento dati tradotti nel database...")
+        start = time.perf_counter()
         
         # Prepara i dati per l'inserimento
+        if 'source_row' not in df.columns:
+            df = self.number_source_rows(df)
         columns = list(self.dtype_mapping.keys())
         df_insert = df[columns].copy()
         
@@ -533,44 +876,234 @@ class HealthcareDataConverter:
             if col in df_insert.columns:
                 df_insert[col] = df_insert[col].dt.strftime('%Y-%m-%d')
         
+        # Nello schema normalizzato si inseriscono gli id delle tabelle di lookup
+        table = self.fact_table
+        if self.schema == 'normalized':
+            df_insert = self.encode_lookup_columns(df_insert)
+            columns = list(df_insert.columns)
+        
         # Inserisci a batch per performance migliori
         total_rows = len(df_insert)
-        for i in range(0, total_rows, batch_size):
-            batch = df_insert.iloc[i:i+batch_size]
-            batch.to_sql('healthcare_records', self.conn, if_exists='append', index=False, method='multi')
+        if method == 'executemany':
+            insert_sql = (
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})"
+            )
+            for i in range(0, total_rows, batch_size):
+                batch = df_insert.iloc[i:i+batch_size]
+                # Colonne come array di oggetti Python con None al posto dei mancanti
+                column_values = [batch[col].to_numpy(dtype=object, na_value=None) for col in columns]
+                self.conn.executemany(insert_sql, zip(*column_values))
+        elif method == 'to_sql':
+            for i in range(0, total_rows, batch_size):
+                batch = df_insert.iloc[i:i+batch_size]
+                batch.to_sql(table, self.conn, if_exists='append', index=False, method='multi')
+                
+                logger.info(f"Inseriti {min(i+batch_size, total_rows):,}/{total_rows:,} record")
             
-            logger.info(f"Inseriti {min(i+batch_size, total_rows):,}/{total_rows:,} record")
+            self.conn.commit()
+        else:
+            raise ValueError(f"Metodo di inserimento non supportato: {method}")
         
-        self.conn.commit()
-        logger.info("Inserimento completato!")
+        elapsed = time.perf_counter() - start
+        logger.info(f"Inserimento completato! {total_rows:,} record in {elapsed:.1f}s "
+                    f"({total_rows / max(elapsed, 1e-9):,.0f} righe/s)")
+
+    def store_cleaned_data(self, df: pd.DataFrame, insert_method: str = 'to_sql'):
+        """
+        Salva un blocco di dati puliti: inserimento nel database e, se
+        richiesto, aggiunta al dataset Parquet partizionato
+        """
+        df = self.number_source_rows(df)
+        self.insert_data_to_db(df, method=insert_method)
+        
+        if self.parquet_dir:
+            write_parquet_chunk(df, self.parquet_dir)
+
+    def convert_streaming(self, csv_files: List[Path], chunksize: int = 100_000,
+                          insert_method: str = 'to_sql'):
+        """
+        Converte i CSV un blocco alla volta: lettura, pulizia, traduzione e
+        inserimento avvengono per blocco, così la memoria resta costante
+        indipendentemente dal numero di file.
+        
+        Il risultato è identico alla conversione in memoria: i duplicati
+        vengono rimossi anche tra blocchi diversi dello stesso file (tra file
+        diversi non possono esistere, perché differiscono per source_file).
+        """
+        logger.info(f"Conversione streaming di {len(csv_files)} file (blocchi da {chunksize:,} righe)...")
+        
+        total_rows = 0
+        for i, csv_file in enumerate(csv_files):
+            logger.info(f"Elaborazione file {i+1}/{len(csv_files)}: {csv_file.name}")
+            seen_hashes = set()
+            
+            for chunk_number, chunk in enumerate(self.iter_csv_chunks(csv_file, chunksize)):
+                chunk_cleaned = self.clean_data(chunk, verbose=(i == 0 and chunk_number == 0))
+                chunk_cleaned = self.drop_seen_duplicates(chunk_cleaned, seen_hashes)
+                
+                self.store_cleaned_data(chunk_cleaned, insert_method)
+                total_rows += len(chunk_cleaned)
+            
+            logger.info(f"File {csv_file.name} completato ({total_rows:,} record inseriti finora)")
+        
+        return total_rows
+
+    def iter_cleaned_files_parallel(self, csv_files: List[Path], workers: int) -> Iterator[pd.DataFrame]:
+        """
+        Legge, pulisce e traduce i file in un pool di processi e restituisce
+        i DataFrame puliti nell'ordine dei file, per un unico scrittore.
+        
+        Al massimo `workers` file sono in elaborazione o in attesa di
+        inserimento, così la memoria resta limitata anche con molti file.
+        """
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            pending = deque()
+            for csv_file in csv_files:
+                pending.append(executor.submit(_load_and_clean_file, str(csv_file)))
+                if len(pending) >= workers:
+                    yield pending.popleft().result()
+            
+            while pending:
+                yield pending.popleft().result()
 
-    def convert_csv_to_sql(self, data_dir: str = "data", max_files: int = None):
+    def convert_parallel(self, csv_files: List[Path], workers: int = 2,
+                         insert_method: str = 'to_sql'):
+        """
+        Converte i CSV in parallelo: ogni processo del pool legge un file,
+        pulisce i codici tariff e traduce le colonne, mentre il processo
+        principale inserisce i risultati nel database nell'ordine dei file.
+        
+        Il risultato è identico alla conversione sequenziale, perché i
+        duplicati possono esistere solo all'interno dello stesso file.
+        """
+        logger.info(f"Conversione parallela di {len(csv_files)} file con {workers} processi...")
+        
+        total_rows = 0
+        for csv_file, df_cleaned in zip(csv_files, self.iter_cleaned_files_parallel(csv_files, workers)):
+            self.store_cleaned_data(df_cleaned, insert_method)
+            total_rows += len(df_cleaned)
+            logger.info(f"File {csv_file.name} completato ({total_rows:,} record inseriti finora)")
+        
+        return total_rows
+
+    def convert_csv_to_sql(self, data_dir: str = "data", max_files: int = None,
+                           streaming: bool = False, chunksize: int = 100_000, workers: int = 1,
+                           bulk_load: bool = False, parquet_dir: str = None, incremental: bool = False):
         """
         Processo completo di conversione CSV -> SQL con traduzione
+        
+        Args:
+            data_dir: Cartella con i file data_css_challenge_*.csv
+            max_files: Numero massimo di file da convertire
+            streaming: Se True legge e inserisce i dati a blocchi (memoria costante)
+            chunksize: Righe per blocco in modalità streaming
+            workers: Numero di processi per lettura e pulizia in parallelo
+                (con workers > 1 ogni processo elabora un file intero in
+                memoria, quindi non si può combinare con streaming)
+            bulk_load: Se True inserisce con executemany in un'unica transazione,
+                con PRAGMA di caricamento massivo, e crea gli indici alla fine
+            parquet_dir: Se indicato, scrive anche un dataset Parquet partizionato
+                per gruppo di provider (letto dalle dashboard)
+            incremental: Se True e il database contiene già una conversione,
+                carica solo i file nuovi o modificati rispetto a ingest_manifest
+                ed elimina le righe dei file modificati o rimossi, invece di
+                ricreare tutto da zero
         """
+        if streaming and workers > 1:
+            raise ValueError("streaming e workers > 1 non possono essere usati insieme: "
+                             "ogni processo carica un file intero")
+        
         try:
             # Connessione al database
             self.conn = sqlite3.connect(self.db_path)
             logger.info(f"Connesso al database: {self.db_path}")
             
-            # 1. Crea schema
-            self.create_database_schema()
+            self.parquet_dir = parquet_dir
+            self.next_source_row = {}
+            csv_files = self.find_csv_files(data_dir, max_files)
+            files_to_delete, file_hashes = [], {}
             
-            # 2. Carica CSV
-            df = self.load_csv_files(data_dir, max_files)
+            if not parquet_dir and parquet_dataset_exists(DEFAULT_PARQUET_DIR):
+                logger.warning(f"Il dataset Parquet {DEFAULT_PARQUET_DIR} non viene aggiornato senza "
+                               f"parquet_dir (--parquet-dir): le dashboard lo leggono al posto del "
+                               f"database e mostrerebbero dati non aggiornati")
             
-            # 3. Pulisci e traduci dati
-            df_cleaned = self.clean_data(df)
+            incremental = incremental and self.can_ingest_incrementally()
+            if incremental:
+                # 1. Confronta i file con il manifest (schema e indici restano)
+                if self.schema == 'normalized':
+                    self.load_lookup_ids()
+                # Con max_files i file esclusi non vanno considerati rimossi
+                csv_files, files_to_delete, file_hashes = self.plan_incremental_ingest(
+                    csv_files, remove_missing=max_files is None
+                )
+            else:
+                # Il dataset Parquet viene ricostruito da zero, come il database
+                if parquet_dir and parquet_dataset_exists(parquet_dir):
+                    shutil.rmtree(parquet_dir)
+                
+                # 1. Crea schema (in bulk load gli indici vengono creati dopo i dati)
+                self.create_database_schema(create_indexes=not bulk_load)
             
-            # 4. Inserisci nel database
-            self.insert_data_to_db(df_cleaned)
+            insert_method = 'executemany' if bulk_load else 'to_sql'
+            load_start = time.perf_counter()
+            inserted_rows = 0
             
-            # 5. Statistiche finali
+            # Con l'ingest incrementale si ricalcolano solo le transizioni dei
+            # pazienti toccati (se la tabella esiste già)
+            has_transitions = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.transitions_table,)
+            ).fetchone() is not None
+            changed_patients = None
+            if incremental and has_transitions:
+                changed_patients = self.collect_changed_patients(files_to_delete)
+            
+            with self.bulk_load() if bulk_load else nullcontext():
+                self.delete_source_files(files_to_delete)
+                
+                if not csv_files:
+                    logger.info("Nessun file nuovo o modificato da caricare")
+                elif workers > 1:
+                    # 2-4. Carica e pulisci in parallelo, inserisci in ordine
+                    inserted_rows = self.convert_parallel(csv_files, workers, insert_method)
+                elif streaming:
+                    # 2-4. Carica, pulisci e inserisci un blocco alla volta
+                    inserted_rows = self.convert_streaming(csv_files, chunksize, insert_method)
+                else:
+                    # 2. Carica CSV
+                    df = self.load_csv_files(csv_files=csv_files)
+                    
+                    # 3. Pulisci e traduci dati
+                    df_cleaned = self.clean_data(df)
+                    
+                    # 4. Inserisci nel database
+                    self.store_cleaned_data(df_cleaned, insert_method)
+                    inserted_rows = len(df_cleaned)
+                
+                if bulk_load and not incremental:
+                    self.create_indexes()
+                
+                if files_to_delete and self.schema == 'normalized':
+                    self.prune_lookup_tables()
+                
+                # 5. Transizioni tra visite consecutive di ogni paziente
+                if changed_patients is not None:
+                    self.collect_changed_patients([csv_file.name for csv_file in csv_files], changed_patients)
+                self.build_transitions_table(changed_patients)
+                
+                self.record_ingested_files(csv_files, file_hashes)
+            self.conn.commit()
+            
+            # 6. Statistiche finali
             cursor = self.conn.execute("SELECT COUNT(*) FROM healthcare_records")
             total_records = cursor.fetchone()[0]
             
             logger.info(f"✅ Conversione completata!")
             logger.info(f"📊 Record totali nel database: {total_records:,}")
+            load_elapsed = time.perf_counter() - load_start
+            logger.info(f"⏱️ Caricati {inserted_rows:,} record in {load_elapsed:.1f}s "
+                        f"({inserted_rows / max(load_elapsed, 1e-9):,.0f} righe/s)")
             
             # Mostra esempi di record tradotti
             sample_query = """
@@ -633,6 +1166,26 @@ class HealthcareDataConverter:
                 """
             }
             
+            # Schema normalizzato: raggruppa sulle chiavi intere e unisci solo le prime 5
+            is_normalized = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'healthcare_facts'"
+            ).fetchone()[0]
+            if is_normalized:
+                for desc, col in [("Top 5 reason_for_treatment (IN INGLESE)", 'reason_for_treatment'),
+                                  ("Top 5 provider types (IN INGLESE)", 'healthcare_provider_type')]:
+                    stats_queries[desc] = f"""
+                    SELECT d.value AS {col}, t.count
+                    FROM (
+                        SELECT {col}_id, COUNT(*) as count
+                        FROM healthcare_facts
+                        GROUP BY {col}_id
+                        ORDER BY count DESC
+                        LIMIT 5
+                    ) t
+                    LEFT JOIN dim_{col} d ON d.id = t.{col}_id
+                    ORDER BY t.count DESC
+                    """
+            
             print("\n📊 Statistiche database (DATI TRADOTTI):")
             print("-" * 40)
             for desc, query in stats_queries.items():
@@ -650,13 +1203,64 @@ class HealthcareDataConverter:
             conn.close()
 
 
+# Convertitore per-processo usato dai worker del pool
+_worker_converter = None
+
+
+def _init_worker():
+    """
+    Inizializza il convertitore in ogni processo del pool (una volta sola)
+    """
+    global _worker_converter
+    _worker_converter = HealthcareDataConverter()
+
+
+def _load_and_clean_file(csv_file: str) -> pd.DataFrame:
+    """
+    Legge, pulisce e traduce un singolo file CSV in un processo del pool
+    """
+    df = pd.read_csv(csv_file, dtype=_worker_converter.pandas_dtypes, low_memory=False)
+    df['source_file'] = Path(csv_file).name
+    return _worker_converter.clean_data(df, verbose=False)
+
+
 if __name__ == "__main__":
     # Configurazione
-    converter = HealthcareDataConverter("healthcare_data_english.db")
+    parser = argparse.ArgumentParser(description="Converte i CSV CSS Challenge in un database SQLite tradotto")
+    parser.add_argument("--db-path", default="healthcare_data_english.db", help="Percorso del database SQLite")
+    parser.add_argument("--data-dir", default="data", help="Cartella con i file data_css_challenge_*.csv")
+    parser.add_argument("--max-files", type=int, default=None, help="Numero massimo di file da convertire")
+    parser.add_argument("--streaming", action="store_true", help="Converte a blocchi con memoria costante")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Righe per blocco in modalità streaming")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processi per lettura e pulizia in parallelo (un file intero per processo, "
+                             "non compatibile con --streaming)")
+    parser.add_argument("--schema", choices=["wide", "normalized"], default="wide",
+                        help="'normalized' usa tabelle di lookup e chiavi intere (DB più piccolo)")
+    parser.add_argument("--parquet-dir", default=None,
+                        help="Scrive anche un dataset Parquet partizionato (es. data/healthcare_parquet)")
+    parser.add_argument("--bulk-load", action="store_true",
+                        help="Inserimento con executemany in un'unica transazione e indici creati alla fine")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Carica solo i file nuovi o modificati rispetto all'ultima conversione")
+    args = parser.parse_args()
+    if args.streaming and args.workers > 1:
+        parser.error("--streaming non si può usare con --workers > 1 (ogni processo carica un file intero)")
+    
+    converter = HealthcareDataConverter(args.db_path, schema=args.schema)
     
     # Converti CSV a SQL con traduzioni (puoi limitare il numero di file per test)
     print("🚀 Avvio conversione CSV -> SQL con traduzioni inglesi...")
-    converter.convert_csv_to_sql()  # Rimuovi max_files per processare tutti i file
+    converter.convert_csv_to_sql(
+        data_dir=args.data_dir,
+        max_files=args.max_files,
+        streaming=args.streaming,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        bulk_load=args.bulk_load,
+        parquet_dir=args.parquet_dir,
+        incremental=args.incremental
+    )
     
     # Mostra informazioni sul database creato
     converter.get_database_info()
@@ -1,11 +1,31 @@
+import hashlib
 import networkx as nx
 import numpy as np
+import pandas as pd
 from pyvis.network import Network
 import streamlit as st
+from graph_summary import summarize_network
+from result_cache import ResultCache, dataframe_fingerprint
+
+# Memory budget of the network HTML cache (a page is a few hundred KB)
+HTML_CACHE_MAX_BYTES = 64 * 2**20
+
+@st.cache_resource
+def get_html_cache():
+    """Process-wide network pages per content hash, shared by all sessions"""
+    return ResultCache(max_bytes=HTML_CACHE_MAX_BYTES)
+
+def network_content_hash(links, feature1_counts, feature1, feature2, min_count, length, max_nodes=None):
+    """Hash of everything a network page depends on: the settings and the counts"""
+    digest = hashlib.sha256()
+    digest.update(repr((feature1, feature2, min_count, length, max_nodes)).encode())
+    digest.update(dataframe_fingerprint(links).encode())
+    digest.update(dataframe_fingerprint(feature1_counts.rename('count').reset_index()).encode())
+    return digest.hexdigest()[:16]
 
 def create_directed_network(df, feature1, feature2, title, min_count=1000, output_file="network.html", length=500):
     """
-    Create a directed network from a DataFrame and save as HTML.
+    Create a directed network from a DataFrame, save it as HTML and return the page.
     
     Parameters:
     - df: pandas DataFrame containing the data
@@ -19,37 +39,66 @@ def create_directed_network(df, feature1, feature2, title, min_count=1000, outpu
     feature1_counts = df[feature1].value_counts()
 
     # Count links between feature1 and feature2
-    links = df.groupby([feature1, feature2]).size().reset_index(name='counts')
+    links = df.groupby([feature1, feature2], observed=True).size().reset_index(name='counts')
+    return draw_directed_network(links, feature1_counts, feature1, feature2, title, min_count, output_file, length)
 
+def draw_directed_network(links, feature1_counts, feature1, feature2, title, min_count=1000,
+                          output_file="network.html", length=500, max_nodes=None):
+    """
+    Same as create_directed_network, from counts computed beforehand (e.g.
+    accumulated over the whole dataset chunk by chunk).
+    
+    The page is cached in memory by network_content_hash(): when the counts
+    and settings are unchanged it is returned without building the graph or
+    writing output_file again.
+    
+    Parameters:
+    - links: DataFrame with feature1, feature2 and 'counts' (rows per pair)
+    - feature1_counts: Series of rows per feature1 value, used for node sizes
+    - max_nodes: node budget; when set, the links are summarized before drawing
+      (graph_summary.summarize_network: community super-nodes, top-K edges and
+      disparity backbone, at most 3 edges per node of the budget)
+    """
+    key = network_content_hash(links, feature1_counts, feature1, feature2, min_count, length, max_nodes)
+    return get_html_cache().get_or_compute(
+        key, lambda: build_network_html(links, feature1_counts, feature1, feature2, min_count, output_file, length,
+                                        max_nodes)
+    )
+
+def build_network_html(links, feature1_counts, feature1, feature2, min_count, output_file, length, max_nodes=None):
+    """Build the PyVis page of draw_directed_network, save it to output_file and return it"""
     # Apply filters
     links = links[links['counts'] >= min_count]
-    links = links[links[feature1] != links[feature2]]
+    if max_nodes is not None:
+        links, feature1_counts = summarize_network(links, feature1_counts, feature1, feature2, 'counts', max_nodes)
+    # Categorical columns (Parquet) have different categories, compare plain values
+    sources = links[feature1].astype(object).to_numpy()
+    targets = links[feature2].astype(object).to_numpy()
+    counts = links['counts'].to_numpy()
+    keep = sources != targets
+    sources, targets, counts = sources[keep], targets[keep], counts[keep]
 
-    print(links.head())
-    print(f"Number of unique links: {len(links)}")
+    print(links[keep].head())
+    print(f"Number of unique links: {len(counts)}")
+
+    # Node sizes: log of the feature1 counts (1 for nodes that are only targets)
+    nodes = pd.unique(np.concatenate([sources, targets]))
+    node_counts = feature1_counts.set_axis(feature1_counts.index.astype(object))
+    sizes = np.log1p(node_counts.reindex(nodes).fillna(1).to_numpy(dtype=float)) * 10  # scale for PyVis
 
     # Create directed graph
     G = nx.DiGraph()
-
-    all_nodes = set(links[feature1]).union(set(links[feature2]))
-    for node in all_nodes:
-        count = feature1_counts.get(node, 1)
-        size = np.log1p(count) * 10  # scale for PyVis
-        G.add_node(node, size=size)
-
-    for _, row in links.iterrows():
-        G.add_edge(
-            row[feature1], 
-            row[feature2], 
-            title=f"Count: {row['counts']}",
-            physics=True,
-            length=length
-        )
+    G.add_nodes_from((node, {'size': size}) for node, size in zip(nodes.tolist(), sizes.tolist()))
+    G.add_edges_from(
+        (source, target, {'title': f"Count: {count}", 'physics': True, 'length': length})
+        for source, target, count in zip(sources.tolist(), targets.tolist(), counts.tolist())
+    )
 
     # Create PyVis network
     net = Network(height="750px", width="100%", directed=True)
     net.from_nx(G)
     net.show_buttons(filter_=['physics'])
 
-    # Save and display in Streamlit
-    net.save_graph(output_file)
\ No newline at end of file
+    # Save, and keep the page for Streamlit
+    net.save_graph(output_file)
+    return net.html
\ No newline at end of file
@@ -0,0 +1,415 @@
+"""
+Patient-flow analytics shared by the dashboards.
+
+Pure pandas/numpy code with no Streamlit dependency, so it can be reused by
+the converter, benchmarks and notebooks. A transition is a pair of
+consecutive visits of the same patient, ordered by start date.
+"""
+
+import numpy as np
+import pandas as pd
+
+from claims_layout import concat_claims
+
+# Columns of the transitions frame, in order
+TRANSITION_COLUMNS = ['from', 'to', 'patient_id', 'age', 'gender', 'reason', 'from_date', 'to_date']
+
+
+def pair_consecutive_visits(data: pd.DataFrame, columns: list) -> tuple:
+    """
+    Sort the visits once by (patient_id, start_date), keeping the file order
+    for visits on the same day, and pair each row with the next one (a shift
+    by one row) when both belong to the same patient.
+
+    Returns:
+        (sorted visits with `columns`, positions of the from-visits,
+        positions of the to-visits). Visits without a patient_id are ignored.
+    """
+    columns = list(dict.fromkeys(['patient_id', 'start_date'] + list(columns)))
+    visits = data.loc[data['patient_id'].notna(), columns]
+    visits = visits.sort_values(['patient_id', 'start_date'], kind='stable')
+
+    patient_codes = pd.factorize(visits['patient_id'])[0]
+    from_rows = np.flatnonzero(patient_codes[1:] == patient_codes[:-1])
+    return visits, from_rows, from_rows + 1
+
+
+def build_transitions(data: pd.DataFrame, provider_column: str = 'healthcare_provider_type') -> pd.DataFrame:
+    """
+    Build one row per patient transition (visit i -> visit i+1).
+    Demographics (age, gender, reason) come from the visit the patient moves from.
+    """
+    visits, from_rows, to_rows = pair_consecutive_visits(
+        data, [provider_column, 'age', 'gender', 'reason_for_treatment'])
+
+    def column(name, rows):
+        return visits[name].iloc[rows].reset_index(drop=True)
+
+    return pd.DataFrame({
+        'from': column(provider_column, from_rows),
+        'to': column(provider_column, to_rows),
+        'patient_id': column('patient_id', from_rows),
+        'age': column('age', from_rows),
+        'gender': column('gender', from_rows),
+        'reason': column('reason_for_treatment', from_rows),
+        'from_date': column('start_date', from_rows),
+        'to_date': column('start_date', to_rows),
+    }, columns=TRANSITION_COLUMNS)
+
+
+def group_mode(df: pd.DataFrame, keys: list, column: str, index: pd.Index, default='Unknown',
+               weights: str = None) -> pd.Series:
+    """
+    Most frequent value of `column` within each group of `keys`, aligned to
+    `index` (the groups of keys).
+
+    Counts every (keys, value) pair once (or sums the `weights` column for
+    pre-aggregated rows), then picks the largest count per group. Ties go to
+    the smallest value, as with Series.mode().iloc[0]. Groups whose values
+    are all missing get `default`.
+    """
+    grouped = df.groupby(keys + [column], observed=True)
+    counts = grouped[weights].sum() if weights else grouped.size()
+    counts = counts[counts > 0].rename('_count').reset_index()
+
+    # Counts come sorted by (keys, value): a stable sort on the count keeps the
+    # smallest value first among ties, so the first row per group is the mode
+    top = counts.sort_values('_count', ascending=False, kind='stable').drop_duplicates(keys)
+
+    mode = top.set_index(keys)[column].astype(object)
+    return mode.reindex(index).fillna(default)
+
+
+def aggregate_edges(transitions: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (from, to) pair with the number of transitions (weight) and
+    the most common age, gender and reason of the patients taking it
+    """
+    keys = ['from', 'to']
+    edges = transitions.groupby(keys, observed=True)['patient_id'].count().rename('weight').to_frame()
+    edges['common_age'] = group_mode(transitions, keys, 'age', edges.index)
+    edges['common_gender'] = group_mode(transitions, keys, 'gender', edges.index)
+    edges['common_reason'] = group_mode(transitions, keys, 'reason', edges.index)
+    return edges.reset_index()
+
+
+def node_statistics(data: pd.DataFrame, providers, provider_column: str = 'healthcare_provider_type') -> pd.DataFrame:
+    """
+    Visit statistics for all the given providers at once: unique patients,
+    total visits and the most common age, reason and provider group
+    """
+    visits = data[data[provider_column].isin(list(providers))]
+    keys = [provider_column]
+
+    stats = visits.groupby(keys, observed=True).agg(
+        unique_patients=('patient_id', 'nunique'),
+        total_visits=('patient_id', 'size'),
+    )
+    stats['avg_age'] = group_mode(visits, keys, 'age', stats.index)
+    stats['common_reason'] = group_mode(visits, keys, 'reason_for_treatment', stats.index)
+    stats['provider_group'] = group_mode(visits, keys, 'healthcare_provider_main_group', stats.index)
+
+    # Small frame: plain values are easier to use for labels and hover text
+    stats.index = pd.Index(stats.index.astype(object), name='provider')
+    return stats.sort_index().reset_index()
+
+
+# Columns the dashboard filters on, in cube key order
+FILTER_COLUMNS = ['age', 'gender', 'reason_for_treatment', 'healthcare_provider_main_group']
+
+# Provider group of a transition between two different provider groups
+MIXED_GROUP = 'Mixed'
+
+
+class FlowCube:
+    """
+    Pre-aggregated transition and visit counts for instant filter changes.
+
+    Built once per loaded dataset:
+    - transitions: count of transitions per (age, gender, reason, provider
+      group, from, to). Age, gender and reason are those of the visit the
+      patient moves from. The provider group is the group shared by both
+      visits, or MIXED_GROUP when the patient changes group, so a group
+      filter keeps only the flows inside that group.
+    - nodes: visits per (age, gender, reason, provider group, provider,
+      patient), enough for exact node statistics under any filter.
+    - transition_patients: the distinct (age, gender, reason, provider
+      group, patient) of the transitions, keyed as these, for the number
+      of patients behind the filtered transitions.
+
+    Edges, node statistics and visit summaries are rolled up from these
+    once per combination of active filter columns and kept, so changing a
+    filter value is a mask over an already aggregated table.
+    """
+
+    def __init__(self, data: pd.DataFrame, provider_column: str = 'healthcare_provider_type'):
+        self.provider_column = provider_column
+        # -1 marks visits without a patient_id (counted as visits, not as patients)
+        patient_codes, patients = pd.factorize(data['patient_id'])
+        self.transitions, self.transition_patients = self._build_transitions(data, pd.Index(patients))
+        self.nodes = self._build_nodes(data, patient_codes)
+        self._rollups = {}
+
+    @classmethod
+    def from_tables(cls, transitions: pd.DataFrame, nodes: pd.DataFrame, transition_patients: pd.DataFrame,
+                    provider_column: str = 'healthcare_provider_type') -> 'FlowCube':
+        """Cube over already built transitions, nodes and transition_patients tables"""
+        cube = cls.__new__(cls)
+        cube.provider_column = provider_column
+        cube.transitions = transitions
+        cube.nodes = nodes
+        cube.transition_patients = transition_patients
+        cube._rollups = {}
+        return cube
+
+    @classmethod
+    def merge(cls, cubes: list) -> 'FlowCube':
+        """
+        Combine cubes built over disjoint sets of patients (e.g. partitions of
+        a dataset hashed on patient_id) into the cube of all their visits.
+        Transition counts are summed; patient codes are offset so they stay
+        distinct across cubes.
+        """
+        provider_column = cubes[0].provider_column
+        keys = FILTER_COLUMNS + ['from', 'to']
+        transitions = concat_claims([cube.transitions for cube in cubes])
+        transitions = transitions.groupby(keys, observed=True, dropna=False)['count'].sum().reset_index()
+
+        nodes, transition_patients, offset = [], [], 0
+        for cube in cubes:
+            codes = cube.nodes['patient_code'].to_numpy()
+            nodes.append(cube.nodes.assign(patient_code=np.where(codes >= 0, codes + offset, -1).astype(np.int32)))
+            transition_patients.append(cube.transition_patients.assign(
+                patient_code=(cube.transition_patients['patient_code'] + offset).astype(np.int32)))
+            offset += int(codes.max()) + 1 if len(codes) else 0
+
+        return cls.from_tables(
+            transitions.astype({key: 'category' for key in keys}),
+            concat_claims(nodes),
+            concat_claims(transition_patients),
+            provider_column
+        )
+
+    def _build_transitions(self, data: pd.DataFrame, patients: pd.Index) -> tuple:
+        group_column = 'healthcare_provider_main_group'
+        visits, from_rows, to_rows = pair_consecutive_visits(data, [self.provider_column] + FILTER_COLUMNS)
+
+        def column(name, rows):
+            return visits[name].iloc[rows].reset_index(drop=True)
+
+        pairs = {name: column(name, from_rows) for name in FILTER_COLUMNS}
+        from_group, to_group = pairs[group_column], column(group_column, to_rows)
+        if isinstance(from_group.dtype, pd.CategoricalDtype) and MIXED_GROUP not in from_group.cat.categories:
+            from_group = from_group.cat.add_categories([MIXED_GROUP])
+            to_group = to_group.cat.add_categories([MIXED_GROUP])
+        pairs[group_column] = from_group.where(from_group == to_group, MIXED_GROUP)
+        pairs['from'] = column(self.provider_column, from_rows)
+        pairs['to'] = column(self.provider_column, to_rows)
+
+        pairs = pd.DataFrame(pairs)
+
+        keys = FILTER_COLUMNS + ['from', 'to']
+        counts = pairs.groupby(keys, observed=True, dropna=False).size()
+        counts = counts.rename('count').reset_index()
+
+        # Same codes as the nodes table: the position of the patient in `patients`
+        pairs['patient_code'] = patients.get_indexer(column('patient_id', from_rows)).astype(np.int32)
+        transition_patients = pairs[FILTER_COLUMNS + ['patient_code']].drop_duplicates(ignore_index=True)
+        return (counts.astype({key: 'category' for key in keys}),
+                transition_patients.astype({key: 'category' for key in FILTER_COLUMNS}))
+
+    def _build_nodes(self, data: pd.DataFrame, patient_codes: np.ndarray) -> pd.DataFrame:
+        keys = FILTER_COLUMNS + [self.provider_column]
+        patient_code = pd.Series(patient_codes.astype(np.int32), index=data.index, name='patient_code')
+
+        # Group the loaded frame directly rather than a copy of its key columns
+        counts = data.groupby(keys + [patient_code], observed=True, dropna=False).size()
+        counts = counts.rename('visits').astype(np.int32).reset_index()
+        return counts.astype({key: 'category' for key in keys})
+
+    @staticmethod
+    def _active(filters: dict) -> tuple:
+        """(filtered columns in cube order, their values); 'All' or None = no filter"""
+        active = {column: value for column, value in (filters or {}).items()
+                  if value is not None and value != 'All'}
+        pattern = tuple(column for column in FILTER_COLUMNS if column in active)
+        return pattern, tuple(active[column] for column in pattern)
+
+    def _rollup(self, kind: str, pattern: tuple) -> pd.DataFrame:
+        """Aggregate of `kind` per value of the `pattern` columns, built on first use"""
+        key = (kind, pattern)
+        if key not in self._rollups:
+            build = {'edges': self._rollup_edges, 'nodes': self._rollup_nodes,
+                     'summary': self._rollup_summary, 'transition_patients': self._rollup_transition_patients}[kind]
+            self._rollups[key] = build(list(pattern))
+        return self._rollups[key]
+
+    @staticmethod
+    def _slice(table: pd.DataFrame, pattern: tuple, values: tuple) -> pd.DataFrame:
+        mask = np.ones(len(table), dtype=bool)
+        for column, value in zip(pattern, values):
+            mask &= (table[column] == value).to_numpy(dtype=bool, na_value=False)
+        return table[mask].drop(columns=list(pattern))
+
+    def _modes(self, table: pd.DataFrame, source: pd.DataFrame, keys: list, weights: str, modes: dict):
+        """Add weighted mode columns; a filtered column's mode is its filter value"""
+        for column, name in modes.items():
+            if column in keys:
+                table[name] = table.index.get_level_values(column).astype(object)
+            else:
+                table[name] = group_mode(source, keys, column, table.index, weights=weights)
+
+    def _rollup_edges(self, pattern: list) -> pd.DataFrame:
+        keys = pattern + ['from', 'to']
+        edges = self.transitions.groupby(keys, observed=True)['count'].sum().rename('weight').to_frame()
+        edges = edges[edges['weight'] > 0]
+        self._modes(edges, self.transitions, keys, 'count',
+                    {'age': 'common_age', 'gender': 'common_gender', 'reason_for_treatment': 'common_reason'})
+        return edges.reset_index()
+
+    def _rollup_nodes(self, pattern: list) -> pd.DataFrame:
+        keys = pattern + [self.provider_column]
+        stats = self.nodes.groupby(keys, observed=True)['visits'].sum().rename('total_visits').to_frame()
+        patients = self.nodes[self.nodes['patient_code'] >= 0].groupby(keys, observed=True)['patient_code'].nunique()
+        stats.insert(0, 'unique_patients', patients.reindex(stats.index, fill_value=0))
+        self._modes(stats, self.nodes, keys, 'visits',
+                    {'age': 'avg_age', 'reason_for_treatment': 'common_reason',
+                     'healthcare_provider_main_group': 'provider_group'})
+        return stats.reset_index().rename(columns={self.provider_column: 'provider'})
+
+    def _rollup_summary(self, pattern: list) -> pd.DataFrame:
+        # A constant key stands in for "no filter" so both cases share one groupby
+        keys = pattern or ['_all']
+        nodes = self.nodes if pattern else self.nodes.assign(_all=0)
+
+        summary = nodes.groupby(keys, observed=True)['visits'].sum().rename('records').to_frame()
+
+        known = nodes[nodes['patient_code'] >= 0]
+        per_patient = known.groupby(keys + ['patient_code'], observed=True)['visits'].sum().reset_index()
+        per_patient['multi_visit'] = per_patient['visits'] > 1
+        patients = per_patient.groupby(keys, observed=True).agg(
+            patients=('visits', 'size'),
+            multi_visit_patients=('multi_visit', 'sum'),
+            avg_visits_per_patient=('visits', 'mean'),
+        )
+
+        summary = summary.join(patients).fillna({'patients': 0, 'multi_visit_patients': 0,
+                                                 'avg_visits_per_patient': 0.0})
+        return summary.reset_index()
+
+    def _rollup_transition_patients(self, pattern: list) -> pd.DataFrame:
+        keys = pattern or ['_all']
+        table = self.transition_patients if pattern else self.transition_patients.assign(_all=0)
+        patients = table.groupby(keys, observed=True)['patient_code'].nunique().rename('patients')
+        return patients.reset_index()
+
+    def edges(self, filters: dict = None, min_transitions: int = 1) -> pd.DataFrame:
+        """Same columns as aggregate_edges(), for the filtered transitions"""
+        pattern, values = self._active(filters)
+        edges = self._slice(self._rollup('edges', pattern), pattern, values)
+        edges = edges[edges['weight'] >= min_transitions].reset_index(drop=True)
+        edges[['from', 'to']] = edges[['from', 'to']].astype(object)
+        return edges
+
+    def transition_count(self, filters: dict = None) -> int:
+        """Number of filtered transitions, before any minimum threshold"""
+        pattern, values = self._active(filters)
+        return int(self._slice(self._rollup('edges', pattern), pattern, values)['weight'].sum())
+
+    def transition_patient_count(self, filters: dict = None) -> int:
+        """Number of distinct patients of the filtered transitions (the ones transition_count() counts)"""
+        pattern, values = self._active(filters)
+        patients = self._slice(self._rollup('transition_patients', pattern), pattern, values)
+        return int(patients['patients'].sum())
+
+    def node_stats(self, providers, filters: dict = None) -> pd.DataFrame:
+        """Same columns as node_statistics(), for the filtered visits"""
+        pattern, values = self._active(filters)
+        stats = self._slice(self._rollup('nodes', pattern), pattern, values)
+        stats = stats[stats['provider'].isin(list(providers))]
+        stats['provider'] = stats['provider'].astype(object)
+        return stats.sort_values('provider').reset_index(drop=True)
+
+    def visit_summary(self, filters: dict = None) -> dict:
+        """Records, unique patients and visits per patient of the filtered visits"""
+        pattern, values = self._active(filters)
+        summary = self._slice(self._rollup('summary', pattern), pattern, values)
+        if len(summary) == 0:
+            return {'records': 0, 'patients': 0, 'multi_visit_patients': 0, 'avg_visits_per_patient': 0.0}
+        row = summary.iloc[0]
+        return {
+            'records': int(row['records']),
+            'patients': int(row['patients']),
+            'multi_visit_patients': int(row['multi_visit_patients']),
+            'avg_visits_per_patient': float(row['avg_visits_per_patient']),
+        }
+
+    def values(self, column: str) -> list:
+        """Sorted distinct values of a visit column (every visit has a row in the nodes table)"""
+        return sorted(self.nodes[column].dropna().unique())
+
+    def visits_by(self, column: str) -> pd.Series:
+        """Visits per value of a visit column, most frequent first"""
+        return self.nodes.groupby(column, observed=True)['visits'].sum().sort_values(ascending=False)
+
+    def provider_patients(self, provider) -> tuple:
+        """(unique patients, their visits) of one provider; visits without a patient_id are left out"""
+        visits = self.nodes[(self.nodes[self.provider_column] == provider) & (self.nodes['patient_code'] >= 0)]
+        return visits['patient_code'].nunique(), int(visits['visits'].sum())
+
+    def patients_by_provider(self) -> pd.DataFrame:
+        """provider_patients() of every provider in one pass: unique_patients and patient_visits, by provider"""
+        visits = self.nodes[self.nodes['patient_code'] >= 0]
+        return visits.groupby(self.provider_column, observed=True).agg(
+            unique_patients=('patient_code', 'nunique'),
+            patient_visits=('visits', 'sum')
+        )
+
+    def memory_bytes(self) -> int:
+        """Memory held by the cube's tables"""
+        tables = [self.nodes, self.transitions, self.transition_patients]
+        return int(sum(table.memory_usage(deep=True).sum() for table in tables))
+
+
+class ProviderProfiles:
+    """
+    The provider panel of every provider, computed once per dataset:
+    unique patients, their visits and the counts of the client types the
+    provider's visits go to, most frequent first. Providers are dict keys,
+    so switching the selected provider is a lookup, not a scan.
+
+    Args:
+        patients: patients_by_provider() of a cube
+        flows: Row counts per (provider, client), with a 'count' column
+    """
+
+    def __init__(self, patients: pd.DataFrame, flows: pd.DataFrame,
+                 provider_column: str = 'healthcare_provider_type', client_column: str = 'client_type'):
+        self._patients = dict(zip(patients.index, zip(patients['unique_patients'].astype(int),
+                                                      patients['patient_visits'].astype(int))))
+
+        flows = flows[flows[provider_column].notna() & flows[client_column].notna() & (flows['count'] > 0)]
+        flows = flows.sort_values([provider_column, 'count', client_column], ascending=[True, False, True])
+        self._flows = {
+            provider: group.set_index(client_column)['count']
+            for provider, group in flows.groupby(provider_column, observed=True, sort=False)
+        }
+        self._no_flows = pd.Series(dtype='int64', name='count').rename_axis(client_column)
+
+    @classmethod
+    def from_aggregates(cls, aggregates, grouping: str) -> 'ProviderProfiles':
+        """Profiles of a DatasetAggregates (or SqlAggregates), from its (provider, client) row counts `grouping`"""
+        flows = aggregates.counts(grouping)
+        provider_column, client_column = flows.columns.drop('count')
+        return cls(aggregates.cube.patients_by_provider(), flows, provider_column, client_column)
+
+    def patients(self, provider) -> tuple:
+        """(unique patients, their visits) of one provider, (0, 0) if it has none"""
+        return self._patients.get(provider, (0, 0))
+
+    def client_flows(self, provider) -> pd.Series:
+        """Visits per client type of one provider, most frequent first (missing client types left out)"""
+        return self._flows.get(provider, self._no_flows)
+
+    def memory_bytes(self) -> int:
+        return int(sum(flows.memory_usage(index=True, deep=True) for flows in self._flows.values()))
@@ -0,0 +1,165 @@
+"""
+Provider flow graph stored as a sparse adjacency matrix.
+
+Providers (types or IDs) are factorized to integer codes 0..n-1 and the
+transition counts go into an n x n SciPy CSR matrix, entry (i, j) being the
+transitions from provider i to provider j. One FlowGraph holds one filter
+slice (FlowGraph.from_cube). Every query is a NumPy/SciPy operation on that
+matrix instead of a pandas groupby or a walk over NetworkX dicts:
+- degrees are row/column sums;
+- PageRank is a power iteration of sparse matrix-vector products;
+- the top neighbours of a node are read from its CSR row (or column);
+- k-hop reachability is k sparse products of a frontier vector.
+A graph with millions of edges takes a few tens of MB (12 bytes per edge)
+and answers each query in milliseconds.
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+class FlowGraph:
+    """
+    Weighted directed graph of provider transitions.
+
+    Args:
+        matrix: n x n CSR matrix of transition counts (row = from, column = to)
+        nodes: Labels of the n nodes, in code order
+    """
+
+    def __init__(self, matrix: sp.csr_matrix, nodes: pd.Index):
+        self.matrix = matrix
+        self.nodes = nodes
+        self._transpose = None
+
+    @classmethod
+    def from_edges(cls, sources, targets, weights=None) -> 'FlowGraph':
+        """Graph of the (source, target, weight) edges; repeated pairs are summed"""
+        codes, nodes = pd.factorize(np.concatenate([np.asarray(sources, dtype=object),
+                                                    np.asarray(targets, dtype=object)]))
+        n_edges = len(codes) // 2
+        weights = np.ones(n_edges) if weights is None else np.asarray(weights, dtype=float)
+        # Edges with a missing endpoint have code -1 and are left out
+        valid = (codes[:n_edges] >= 0) & (codes[n_edges:] >= 0)
+        matrix = sp.csr_matrix(
+            (weights[valid], (codes[:n_edges][valid], codes[n_edges:][valid])), shape=(len(nodes), len(nodes))
+        )
+        matrix.sum_duplicates()
+        return cls(matrix, pd.Index(nodes))
+
+    @classmethod
+    def from_frame(cls, edges: pd.DataFrame, source: str = 'from', target: str = 'to',
+                   weight: str = 'weight') -> 'FlowGraph':
+        return cls.from_edges(edges[source].astype(object), edges[target].astype(object), edges[weight])
+
+    @classmethod
+    def from_cube(cls, cube, filters: dict = None) -> 'FlowGraph':
+        """The filter slice of a FlowCube (every edge, no minimum count)"""
+        return cls.from_frame(cube.edges(filters, 1))
+
+    @property
+    def transpose(self) -> sp.csr_matrix:
+        """CSR of the reversed graph (row = to), built on first use"""
+        if self._transpose is None:
+            self._transpose = self.matrix.T.tocsr()
+        return self._transpose
+
+    @property
+    def n_edges(self) -> int:
+        return self.matrix.nnz
+
+    def codes(self, labels: Iterable) -> np.ndarray:
+        """Codes of node labels; unknown labels raise KeyError"""
+        labels = list(labels)
+        codes = self.nodes.get_indexer(labels)
+        if (codes < 0).any():
+            raise KeyError(f"Unknown nodes: {[label for label, code in zip(labels, codes) if code < 0][:5]}")
+        return codes
+
+    def _adjacency(self, direction: str) -> sp.csr_matrix:
+        if direction not in ('out', 'in'):
+            raise ValueError("direction must be 'out' or 'in'")
+        return self.matrix if direction == 'out' else self.transpose
+
+    def out_degree(self, weighted: bool = True) -> pd.Series:
+        """Transitions (or distinct targets) leaving each node"""
+        values = np.asarray(self.matrix.sum(axis=1)).ravel() if weighted else np.diff(self.matrix.indptr)
+        return pd.Series(values, index=self.nodes)
+
+    def in_degree(self, weighted: bool = True) -> pd.Series:
+        """Transitions (or distinct sources) reaching each node"""
+        values = np.asarray(self.matrix.sum(axis=0)).ravel() if weighted else np.diff(self.transpose.indptr)
+        return pd.Series(values, index=self.nodes)
+
+    def pagerank(self, alpha: float = 0.85, tol: float = 1e-10, max_iter: int = 100) -> pd.Series:
+        """
+        Weighted PageRank, as networkx.pagerank: a walker follows a transition
+        with probability alpha (in proportion to its count) or jumps to a
+        uniformly random node; nodes without outgoing transitions jump.
+        """
+        n = len(self.nodes)
+        if n == 0:
+            return pd.Series(dtype=float, index=self.nodes)
+        out_weight = np.asarray(self.matrix.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+        # Column-stochastic transpose: rank flows from row i to its targets
+        transitions = (sp.diags(inverse) @ self.matrix).T.tocsr()
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            previous = rank
+            rank = alpha * (transitions @ rank) + (alpha * rank[dangling].sum() + 1 - alpha) / n
+            if np.abs(rank - previous).sum() < n * tol:
+                break
+        return pd.Series(rank / rank.sum(), index=self.nodes)
+
+    def top_neighbours(self, node, k: int = 5, direction: str = 'out') -> pd.Series:
+        """The `k` heaviest successors (or predecessors) of a node, with their transition counts"""
+        adjacency = self._adjacency(direction)
+        code = self.codes([node])[0]
+        start, end = adjacency.indptr[code], adjacency.indptr[code + 1]
+        neighbours, weights = adjacency.indices[start:end], adjacency.data[start:end]
+        if len(weights) > k:
+            top = np.argpartition(-weights, k - 1)[:k]
+            neighbours, weights = neighbours[top], weights[top]
+        order = np.lexsort((neighbours, -weights))
+        return pd.Series(weights[order], index=self.nodes[neighbours[order]])
+
+    def reachable(self, sources: Iterable, hops: int = 2, direction: str = 'out') -> pd.Series:
+        """
+        Nodes reachable from `sources` within `hops` transitions (or reaching
+        them, for direction='in'), with their distance in hops. The sources
+        themselves are at distance 0.
+        """
+        # The successors of a set are the columns of its rows: step with the reversed graph
+        step = self._adjacency({'out': 'in', 'in': 'out'}.get(direction, direction))
+        distance = np.full(len(self.nodes), -1)
+        frontier = np.zeros(len(self.nodes), dtype=bool)
+        frontier[self.codes(sources)] = True
+        distance[frontier] = 0
+        for hop in range(1, hops + 1):
+            frontier = (step @ frontier.astype(np.float64) > 0) & (distance < 0)
+            if not frontier.any():
+                break
+            distance[frontier] = hop
+        reached = np.flatnonzero(distance >= 0)
+        return pd.Series(distance[reached], index=self.nodes[reached]).sort_values(kind='stable')
+
+    def edges(self, min_weight: float = 0) -> pd.DataFrame:
+        """The edges as a from / to / weight frame, heaviest first"""
+        coo = self.matrix.tocoo()
+        keep = coo.data >= min_weight
+        edges = pd.DataFrame({
+            'from': self.nodes[coo.row[keep]],
+            'to': self.nodes[coo.col[keep]],
+            'weight': coo.data[keep],
+        })
+        return edges.sort_values('weight', ascending=False, kind='stable').reset_index(drop=True)
+
+    def memory_bytes(self) -> int:
+        matrices = [self.matrix] + ([self._transpose] if self._transpose is not None else [])
+        return sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices)
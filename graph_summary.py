@@ -0,0 +1,165 @@
+"""
+Summaries of large weighted networks, sized to a render budget.
+
+A global minimum count either keeps thousands of provider IDs or none of
+them. summarize_network() instead returns at most `max_nodes` nodes and
+`max_edges` edges, whatever the input:
+1. Community collapse: when there are more nodes than the budget, the
+   nodes with the most flow (in + out weight) are kept and every other one
+   is merged into the super-node of its Louvain community, computed on the
+   whole graph. Edges are summed per (super-)node pair and edges inside a
+   super-node are dropped.
+2. Top-K: an edge is a candidate if it is one of the `top_k` heaviest
+   outgoing edges of its source or incoming edges of its target (so sinks,
+   like clients fed by collapsed providers, keep their main inflows too).
+3. Backbone: the disparity filter (Serrano, Boguñá and Vespignani, 2009)
+   scores each edge by how unlikely its share of its source's outgoing
+   weight, or of its target's incoming weight, would be if the node spread
+   its weight at random (computed on the collapsed graph, before top-K).
+   Top-K edges scoring below `alpha` on either side (the backbone) are
+   kept first, most significant first, then the heaviest other top-K edges
+   fill what is left of `max_edges` (unless fill=False).
+"""
+
+from typing import Optional
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+# Share of the node budget left to super-nodes when nodes are collapsed
+SUPER_NODE_SHARE = 0.2
+
+COMMUNITY_SEED = 42
+
+
+def top_k_edges(links: pd.DataFrame, node: str, weight: str, k: int) -> pd.DataFrame:
+    """The `k` heaviest edges of every value of `node` (ties keep the input order)"""
+    ranked = links.sort_values(weight, ascending=False, kind='stable')
+    return ranked.groupby(node, sort=False, observed=True).head(k).sort_index()
+
+
+def disparity_scores(links: pd.DataFrame, source: str, target: str, weight: str) -> np.ndarray:
+    """
+    Disparity filter p-value of each edge: the smaller of
+    (1 - w / s) ** (k - 1) over its source's outgoing edges and its target's
+    incoming edges (s their total weight, k their number). Edges of a node
+    with a single edge on that side score 1 there.
+    """
+    def side_scores(node: str) -> np.ndarray:
+        grouped = links.groupby(node, sort=False, observed=True)[weight]
+        strength = grouped.transform('sum').to_numpy(dtype=float)
+        degree = grouped.transform('size').to_numpy(dtype=float)
+        share = np.divide(links[weight].to_numpy(dtype=float), strength,
+                          out=np.zeros(len(links)), where=strength > 0)
+        return np.where(degree > 1, (1 - share) ** (degree - 1), 1.0)
+
+    return np.minimum(side_scores(source), side_scores(target))
+
+
+def undirected_graph(links: pd.DataFrame, source: str, target: str, weight: str) -> nx.Graph:
+    """
+    Undirected graph of the links, flows both ways between two nodes added up
+    (Louvain is undirected). Nodes and edges are added in order of first
+    appearance, as an edge-by-edge build would, so the seeded Louvain run
+    gives the same communities.
+    """
+    endpoints = np.column_stack([links[source].astype(object), links[target].astype(object)]).ravel()
+    codes, nodes = pd.factorize(endpoints)
+    u, v = codes[0::2], codes[1::2]
+    pairs = pd.DataFrame({'u': u, 'v': v, 'weight': links[weight].to_numpy()})
+    # One key per unordered pair
+    pair_key = np.minimum(u, v).astype(np.int64) * len(nodes) + np.maximum(u, v)
+    edges = pairs.groupby(pair_key, sort=False).agg(u=('u', 'first'), v=('v', 'first'), weight=('weight', 'sum'))
+
+    graph = nx.Graph()
+    graph.add_nodes_from(nodes)
+    graph.add_weighted_edges_from(zip(nodes[edges['u']], nodes[edges['v']], edges['weight']))
+    return graph
+
+
+def collapse_communities(links: pd.DataFrame, node_counts: pd.Series, source: str, target: str, weight: str,
+                         max_nodes: int, seed: int = COMMUNITY_SEED) -> tuple:
+    """
+    Keep the nodes with the most flow and merge the others into community
+    super-nodes, so there are at most `max_nodes` nodes. Returns the
+    aggregated links and node counts (super-nodes sum their members').
+    """
+    flow = pd.concat([
+        links.groupby(source, observed=True)[weight].sum(),
+        links.groupby(target, observed=True)[weight].sum(),
+    ]).groupby(level=0).sum().sort_values(ascending=False, kind='stable')
+    if len(flow) <= max_nodes:
+        return links, node_counts
+
+    max_super = max(1, int(max_nodes * SUPER_NODE_SHARE))
+    kept = flow.index[:max_nodes - max_super]
+
+    communities = nx.community.louvain_communities(undirected_graph(links, source, target, weight),
+                                                   weight='weight', seed=seed)
+
+    # Super-nodes of the communities with most collapsed flow, the rest in one more
+    collapsed = flow.drop(kept)
+    community_of = {node: number for number, members in enumerate(communities) for node in members}
+    community_flow = collapsed.groupby(collapsed.index.map(community_of)).agg(['sum', 'size'])
+    community_flow = community_flow.sort_values('sum', ascending=False, kind='stable')
+    named = community_flow.index[:max_super - 1] if len(community_flow) > max_super else community_flow.index
+    names = {number: f"Community {rank + 1} ({community_flow.loc[number, 'size']:,} nodes)"
+             for rank, number in enumerate(named)}
+    rest = community_flow.index.difference(named)
+    if len(rest):
+        other = f"Other communities ({int(community_flow.loc[rest, 'size'].sum()):,} nodes)"
+        names.update({number: other for number in rest})
+    mapping = {node: names[community_of[node]] for node in collapsed.index}
+
+    def relabel(values: pd.Series) -> pd.Series:
+        values = values.astype(object)
+        return values.map(mapping).fillna(values)
+
+    summary = links.assign(**{source: relabel(links[source]), target: relabel(links[target])})
+    summary = summary[summary[source] != summary[target]]
+    summary = summary.groupby([source, target], sort=False)[weight].sum().reset_index()
+    counts = node_counts.groupby(relabel(node_counts.index.to_series())).sum()
+    return summary, counts
+
+
+def summarize_network(links: pd.DataFrame, node_counts: pd.Series, source: str, target: str,
+                      weight: str = 'counts', max_nodes: int = 150, max_edges: Optional[int] = None,
+                      top_k: int = 5, alpha: float = 0.05, fill: bool = True) -> tuple:
+    """
+    Community collapse, top-K and disparity backbone (see module docstring).
+
+    Args:
+        links: One row per edge: source, target and weight columns
+        node_counts: Series of a weight per node (node sizes), summed into super-nodes
+        max_nodes: Node budget
+        max_edges: Edge budget (3 per node of the budget by default)
+        top_k: Outgoing and incoming edges per node that are candidates for the backbone
+        alpha: Significance level of the disparity filter
+        fill: Use the edge budget the backbone leaves on the heaviest other top-K edges
+
+    Returns:
+        (links, node_counts) of the summary
+    """
+    max_edges = 3 * max_nodes if max_edges is None else max_edges
+    links = links[[source, target, weight]].astype({source: object, target: object})
+    links = links[(links[source] != links[target]) & (links[weight] > 0)]
+    node_counts = node_counts.set_axis(node_counts.index.astype(object))
+
+    links, node_counts = collapse_communities(links, node_counts, source, target, weight, max_nodes)
+    links = links.reset_index(drop=True)
+
+    scores = disparity_scores(links, source, target, weight)
+    candidates = np.zeros(len(links), dtype=bool)
+    candidates[top_k_edges(links, source, weight, top_k).index] = True
+    candidates[top_k_edges(links, target, weight, top_k).index] = True
+    backbone = candidates & (scores < alpha)
+
+    # Backbone by significance (heavier first among equal scores), then the rest by weight
+    weights = links[weight].to_numpy(dtype=float)
+    order = np.lexsort((-weights, scores))
+    selected = order[backbone[order]]
+    if fill:
+        by_weight = np.argsort(-weights, kind='stable')
+        selected = np.concatenate([selected, by_weight[(candidates & ~backbone)[by_weight]]])
+    return links.iloc[np.sort(selected[:max_edges])].reset_index(drop=True), node_counts
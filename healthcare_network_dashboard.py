@@ -10,7 +10,27 @@ import hashlib
 import traceback
 import json
 import openai
+import glob
 import os
+import sys
+import tracemalloc
+from translation import GERMAN_TO_ENGLISH, Translator
+from parquet_store import (DEFAULT_PARQUET_DIR, parquet_dataset_exists, read_parquet_dataset, column_values,
+                           iter_parquet_batches, parquet_row_count)
+from out_of_core import DatasetAggregates, read_csv_chunks, partitions_for_files, partitions_for_rows
+from result_cache import ResultCache, dataframe_fingerprint, files_fingerprint
+from claims_layout import compact_claims, concat_claims, map_categories, memory_per_million_rows, month_labels
+from sampling import PatientSampler
+from sql_analytics import DEFAULT_DB_PATH, SqlAggregates, database_exists
+from flow_analytics import ProviderProfiles
+from graph_layout import LayoutCache
+from flow_graph import FlowGraph
+from network_figure import network_figure
+from pathway_index import MAX_STEPS
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 warnings.filterwarnings('ignore')
 
 # OpenAI client setup
@@ -29,6 +49,80 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_data
+def get_parquet_filter_options(root):
+    """Distinct values of the pre-load filter columns (one column read each)"""
+    return {
+        col: column_values(root, col)
+        for col in ['healthcare_provider_main_group', 'age', 'gender', 'reason_for_treatment']
+    }
+
+# Memory budget of the shared result cache (network tables, figures, statistics)
+RESULT_CACHE_MAX_BYTES = 256 * 2**20
+
+@st.cache_resource
+def get_result_cache():
+    """Process-wide LRU of computed results, shared by all sessions"""
+    return ResultCache(max_bytes=RESULT_CACHE_MAX_BYTES)
+
+@st.cache_resource
+def get_layout_cache():
+    """Process-wide node positions per network topology, shared by all sessions"""
+    return LayoutCache()
+
+# How a sample is drawn; Sample Size is its row budget in every mode
+SAMPLING_MODES = {
+    "Random patients": "patients",
+    "Patients stratified by age × reason": "stratified",
+    "Rows only (fastest, cuts journeys)": "rows",
+}
+
+def current_rss_mb():
+    """Current resident set size of this process in MB (None where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+def peak_rss_mb():
+    """Peak resident set size of this process over its lifetime in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+class RerunMemoryProbe:
+    """
+    Memory used by one script rerun: change of the process current RSS (the
+    peak RSS is the lifetime high-water mark, it says nothing about one rerun)
+    and, when allocation tracing is on, the peak and retained bytes allocated
+    by Python and numpy (tracemalloc). Other sessions running at the same time
+    are counted too.
+    """
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        if trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.start_traced = tracemalloc.get_traced_memory()[0]
+        elif tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.start_rss = current_rss_mb()
+    
+    def stop(self):
+        stats = {'rss_mb': current_rss_mb(), 'peak_rss_mb': peak_rss_mb()}
+        if stats['rss_mb'] is not None and self.start_rss is not None:
+            stats['rss_change_mb'] = stats['rss_mb'] - self.start_rss
+        if self.trace_allocations and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            stats['allocated_peak_mb'] = (peak - self.start_traced) / 2**20
+            stats['retained_mb'] = (current - self.start_traced) / 2**20
+        return stats
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -53,264 +147,9 @@ class HealthcareNetworkDashboard:
         self.network_data = None
         self.filtered_data = None
         
-        # German to English translation mappings
-        self.translations = {
-            # Age groups
-            '0-10 Jahre': '0-10 Years',
-            '10-20 Jahre': '10-20 Years', 
-            '20-30 Jahre': '20-30 Years',
-            '30-40 Jahre': '30-40 Years',
-            '40-50 Jahre': '40-50 Years',
-            '50-60 Jahre': '50-60 Years',
-            '60-70 Jahre': '60-70 Years',
-            '70-80 Jahre': '70-80 Years',
-            '80-90 Jahre': '80-90 Years',
-            '90+ Jahre': '90+ Years',
-            
-            # Reasons for treatment
-            'Krankheit': 'Illness',
-            'Unfall': 'Accident',
-            'Mutterschaft': 'Maternity',
-            'Prävention': 'Prevention',
-            'Vorsorge': 'Preventive Care',
-            'Nachsorge': 'Follow-up Care',
-            
-            # Healthcare provider main groups
-            'Spitäler': 'Hospitals',
-            'SpitÃ¤ler': 'Hospitals',  # Handle encoding issues
-            'Ärzte und Ärztinnen': 'Doctors',
-            'Ã„rzte und Ã„rztinnen': 'Doctors',  # Handle encoding issues
-            'Laboratorien': 'Laboratories',
-            'Pflegeheime': 'Nursing Homes',
-            'Apotheken': 'Pharmacies',
-            'Physiotherapie': 'Physiotherapy',
-            'Ergotherapie': 'Occupational Therapy',
-            'Psychologie': 'Psychology',
-            'Zahnärzte': 'Dentists',
-            'Optiker': 'Opticians',
-            'Abgabestellen Mittel und Gegenstände': 'Medical Device Dispensing Points',
-            'Chiropraktoren und Chiropraktorinnen': 'Chiropractors',
-            'Ergotherapeuten und Ergotherapeutinnen': 'Occupational Therapists',
-            'Ernährungsberater und Ernährungsberaterinnen': 'Nutritional Counselors',
-            'Fitness': 'Fitness',
-            'Hebammen': 'Midwives',
-            'Komplementärtherapeuten und -therapeutinnen': 'Complementary Therapists',
-            'Logopäden und Logopädinnen': 'Speech Therapists',
-            'Neuropsychologen und Neuropsychologinnen': 'Neuropsychologists',
-            'Organisationen der Krankenpflege & Hilfe zu Hause': 'Nursing & Home Care Organizations',
-            'Pflegefachmänner und Pflegefachfrauen': 'Professional Nurses',
-            'Physiotherapeuten und Physiotherapeutinnen': 'Physiotherapists',
-            'Podologen und Podologinnen': 'Podologists',
-            'Psych. Psychotherapeuten und Psychotherapeutinnen': 'Psychological Psychotherapists',
-            'Transport-/Rettungsunternehmen': 'Transport/Rescue Companies',
-            'Übrige Rechnungssteller': 'Other Billing Entities',
-            
-            # Healthcare provider types (extended)
-            'Zentrumsversorgung, Niveau 1': 'Central Care, Level 1',
-            'Zentrumsversorgung, Niveau 2': 'Central Care, Level 2',
-            'Zentrumsversorgung, Niveau 3': 'Central Care, Level 3',
-            'Zentrumsversorgung, Niveau 4': 'Central Care, Level 4',
-            'Zentrumsversorgung, Niveau 5': 'Central Care, Level 5',
-            'Zentrumsversorgung': 'Central Care',
-            'Grundversorgung': 'Basic Care',
-            'Spezialisierte Psychiatrie': 'Specialized Psychiatry',
-            'Psychiatrische Kliniken': 'Psychiatric Clinics',
-            'Rehabilitation': 'Rehabilitation',
-            'Gruppenpraxen': 'Group Practices',
-            'Einzelpraxen': 'Individual Practices',
-            'Gemeinschaftspraxen': 'Community Practices',
-            'Polikliniken': 'Polyclinics',
-            'Tageskliniken': 'Day Clinics',
-            'Ambulatorien': 'Outpatient Clinics',
-            'Notfallzentren': 'Emergency Centers',
-            'Universitätsspitäler': 'University Hospitals',
-            'Regionalspitäler': 'Regional Hospitals',
-            'Kantonsspitäler': 'Cantonal Hospitals',
-            'Privatspitäler': 'Private Hospitals',
-            'Spezialkliniken': 'Specialty Clinics',
-            'Spezialkliniken Chirurgie': 'Surgical Specialty Clinics',
-            'Pflegeheime': 'Nursing Homes',
-            'Privatlaboratorien': 'Private Laboratories',
-            'Mikrobiologie/Genetik-Laboratorien': 'Microbiology/Genetics Laboratories',
-            'Mikrobiologie-Laboratorien': 'Microbiology Laboratories',
-            'Organisationen der Apotheker und Apothekerinnen': 'Pharmacy Organizations',
-            'Organisationen der Krankenpflege & Hilfe zu Hause': 'Nursing & Home Care Organizations',
-            'Physiotherapeuten und Physiotherapeutinnen': 'Physiotherapists',
-            'Chiropraktoren und Chiropraktorinnen': 'Chiropractors',
-            'Psych. Psychotherapeuten und Psychotherapeutinnen': 'Psychological Psychotherapists',
-            'praktischer Arzt / Ärztin': 'General Practitioner',
-            'Ärzte, Spezialfälle': 'Doctors, Special Cases',
-            'Übrige Rechnungssteller': 'Other Billing Entities',
-            'Übrige Rechnungssteller, Spezialfälle': 'Other Billing Entities, Special Cases',
-            'Abgabestellen Mittel und Gegenstände': 'Medical Device Dispensing Points',
-            'Akut- und Übergangspflege': 'Acute and Transitional Care',
-            'Alters- und Pflegeheime': 'Elderly and Nursing Homes',
-            'Apotheken, Spezialfälle': 'Pharmacies, Special Cases',
-            'Blutspendezentren': 'Blood Donation Centers',
-            'Diverse Spezialkliniken': 'Various Specialty Clinics',
-            'Ergotherapeuten und Ergotherapeutinnen': 'Occupational Therapists',
-            'Ergotherapiezentren': 'Occupational Therapy Centers',
-            'Ernährungsberater und Ernährungsberaterinnen': 'Nutritional Counselors',
-            'Ernährungsberatung, Organisation': 'Nutritional Counseling, Organization',
-            'Fitness': 'Fitness',
-            'Geburtshäuser': 'Birth Centers',
-            'Gemeinsame Einrichtung KVG': 'Joint Health Insurance Institution',
-            'Genetik-Laboratorien': 'Genetics Laboratories',
-            'Grundversorgung, Niveau 3': 'Basic Care, Level 3',
-            'Grundversorgung, Niveau 4': 'Basic Care, Level 4',
-            'Grundversorgung, Niveau 5': 'Basic Care, Level 5',
-            'Hebammen': 'Midwives',
-            'Heime für Behinderte': 'Homes for Disabled',
-            'Komplementärtherapeuten und -therapeutinnen': 'Complementary Therapists',
-            'Logopäden und Logopädinnen': 'Speech Therapists',
-            'Neuropsychologen und Neuropsychologinnen': 'Neuropsychologists',
-            'Organisationen der Chiropraktik': 'Chiropractic Organizations',
-            'Organisationen der Hebammen': 'Midwife Organizations',
-            'Organisationen der Krankenpflege & Hilfe zu Hause AÜP': 'Nursing & Home Care Organizations AÜP',
-            'Organisationen der Krankenpflege & Hilfe zu Hause TON': 'Nursing & Home Care Organizations TON',
-            'Organisationen der Logopädie': 'Speech Therapy Organizations',
-            'Organisationen der Neuropsychologie': 'Neuropsychology Organizations',
-            'Organisationen der Physiotherapie': 'Physiotherapy Organizations',
-            'Organisationen der Podologie': 'Podology Organizations',
-            'Organisationen der psychologischen Psychotherapie': 'Psychological Psychotherapy Organizations',
-            'Pflegefachmänner und Pflegefachfrauen': 'Professional Nurses',
-            'Pflegeheime, Spezialfälle (ohne BUR-Zurodnung)': 'Nursing Homes, Special Cases (without BUR assignment)',
-            'Podologen und Podologinnen': 'Podologists',
-            'Prävention und Gesundheitswesen': 'Prevention and Public Health',
-            'Psychiatrische Kliniken, Niveau 1': 'Psychiatric Clinics, Level 1',
-            'Psychiatrische Kliniken, Niveau 2': 'Psychiatric Clinics, Level 2',
-            'Rehabilitationskliniken': 'Rehabilitation Clinics',
-            'Spezialkliniken Geriatrie': 'Geriatric Specialty Clinics',
-            'Spezialkliniken Pädiatrie': 'Pediatric Specialty Clinics',
-            'Spitäler, Spezialfälle (ohne BUR-Zuordnung)': 'Hospitals, Special Cases (without BUR assignment)',
-            'Tages- oder Nachtstrukturen TON': 'Day or Night Structures TON',
-            'Transport-/Rettungsunternehmen, Spezialfälle': 'Transport/Rescue Companies, Special Cases',
-            'Zentrumsversorgung, Niveau 1 (Universitätsspitäler)': 'Central Care, Level 1 (University Hospitals)',
-            'Diabetesgesellschaften': 'Diabetes Societies',
-            
-            # Medical specialties (extended)
-            'Kinder- und Jugendmedizin': 'Pediatrics',
-            'Kinder- und Jugendpsychiatrie und -psychotherapie': 'Child and Adolescent Psychiatry and Psychotherapy',
-            'Gynäkologie und Geburtshilfe': 'Gynecology and Obstetrics',
-            'GynÃ¤kologie und Geburtshilfe': 'Gynecology and Obstetrics',  # Handle encoding issues
-            'Psychiatrie und Psychotherapie': 'Psychiatry and Psychotherapy',
-            'Chirurgie': 'Surgery',
-            'Innere Medizin': 'Internal Medicine',
-            'Allgemeine Innere Medizin': 'General Internal Medicine',
-            'Radiologie': 'Radiology',
-            'Anästhesiologie': 'Anesthesiology',
-            'Dermatologie': 'Dermatology',
-            'Dermatologie und Venerologie': 'Dermatology and Venereology',
-            'Ophthalmologie': 'Ophthalmology',
-            'Orthopädie': 'Orthopedics',
-            'Neurologie': 'Neurology',
-            'Urologie': 'Urology',
-            'HNO': 'ENT (Ear, Nose, Throat)',
-            'Oto-Rhino-Laryngologie': 'Otorhinolaryngology (ENT)',
-            'Kardiologie': 'Cardiology',
-            'Onkologie': 'Oncology',
-            'Endokrinologie': 'Endocrinology',
-            'Rheumatologie': 'Rheumatology',
-            'Nephrologie': 'Nephrology',
-            'Pneumologie': 'Pneumology',
-            'Gastroenterologie': 'Gastroenterology',
-            'Hämatologie': 'Hematology',
-            'Infektiologie': 'Infectious Diseases',
-            'Notfallmedizin': 'Emergency Medicine',
-            'Allgemeinmedizin': 'General Medicine',
-            'Hausarztmedizin': 'Family Medicine',
-            'Tropenmedizin': 'Tropical Medicine',
-            'Arbeitsmedizin': 'Occupational Medicine',
-            'Sportmedizin': 'Sports Medicine',
-            'Geriatrie': 'Geriatrics',
-            'Palliativmedizin': 'Palliative Medicine',
-            'Intensivmedizin': 'Intensive Care Medicine',
-            'Nuklearmedizin': 'Nuclear Medicine',
-            'Pathologie': 'Pathology',
-            'Rechtsmedizin': 'Forensic Medicine',
-            'Labormedizin': 'Laboratory Medicine',
-            'Mikrobiologie': 'Microbiology',
-            'Immunologie': 'Immunology',
-            'Genetik': 'Genetics',
-            'Toxikologie': 'Toxicology',
-            'Pharmakologie': 'Pharmacology',
-            'Hygiene': 'Hygiene',
-            'Epidemiologie': 'Epidemiology',
-            'Biostatistik': 'Biostatistics',
-            'Physikalische Medizin und Rehabilitation': 'Physical Medicine and Rehabilitation',
-            'Allergologie und klinische Immunologie': 'Allergology and Clinical Immunology',
-            'Angiologie': 'Angiology',
-            'Arbeitsmedizin': 'Occupational Medicine',
-            'Gefässchirurgie': 'Vascular Surgery',
-            'Handchirurgie': 'Hand Surgery',
-            'Herz- und thorakale Gefässchirurgie': 'Cardiac and Thoracic Vascular Surgery',
-            'Infektiologie': 'Infectious Diseases',
-            'Intensivmedizin': 'Intensive Care Medicine',
-            'Kiefer- und Gesichtschirurgie': 'Oral and Maxillofacial Surgery',
-            'Kinderchirurgie': 'Pediatric Surgery',
-            'Klinische Pharmakologie und Toxikologie': 'Clinical Pharmacology and Toxicology',
-            'Medizinische Genetik': 'Medical Genetics',
-            'Medizinische Onkologie': 'Medical Oncology',
-            'Neurochirurgie': 'Neurosurgery',
-            'Orthopädische Chirurgie und Traumatologie des Bewegungsapparates': 'Orthopedic Surgery and Traumatology of the Locomotor System',
-            'Plastische, Rekonstruktive und Ästhetische Chirurgie': 'Plastic, Reconstructive and Aesthetic Surgery',
-            'Radio-Onkologie und Strahlentherapie': 'Radio-Oncology and Radiation Therapy',
-            'Tropen- und Reisemedizin': 'Tropical and Travel Medicine',
-            
-            # Other healthcare services
-            'Spitex': 'Home Care',
-            'Ambulante Pflege': 'Outpatient Care',
-            'Stationäre Pflege': 'Inpatient Care',
-            'Langzeitpflege': 'Long-term Care',
-            'Kurzzeitpflege': 'Short-term Care',
-            'Tagespflege': 'Day Care',
-            'Nachtpflege': 'Night Care',
-            'Palliativpflege': 'Palliative Care',
-            'Hospiz': 'Hospice',
-            'Diabetesberatung': 'Diabetes Counseling',
-            'Ernährungsberatung': 'Nutritional Counseling',
-            'Sozialberatung': 'Social Counseling',
-            'Psychologische Beratung': 'Psychological Counseling',
-            'Seelsorge': 'Pastoral Care',
-            'Logopädie': 'Speech Therapy',
-            'Podologie': 'Podology',
-            'Osteopathie': 'Osteopathy',
-            'Chiropraktik': 'Chiropractic',
-            'Homöopathie': 'Homeopathy',
-            'Naturheilkunde': 'Naturopathy',
-            'Akupunktur': 'Acupuncture',
-            'Massage': 'Massage',
-            'Fitness': 'Fitness',
-            'Wellness': 'Wellness',
-            
-            # Gender terms
-            'M': 'Male',
-            'F': 'Female',
-            'W': 'Female',
-            'männlich': 'Male',
-            'weiblich': 'Female',
-            
-            # Common German words that might appear
-            'und': 'and',
-            'oder': 'or',
-            'mit': 'with',
-            'ohne': 'without',
-            'für': 'for',
-            'von': 'from',
-            'zu': 'to',
-            'in': 'in',
-            'an': 'at',
-            'auf': 'on',
-            'bei': 'at',
-            'nach': 'after',
-            'vor': 'before',
-            'über': 'about',
-            'unter': 'under',
-            'durch': 'through',
-            'um': 'around',
-            'gegen': 'against',
-            'zwischen': 'between',
-        }
+        # German to English translation mappings (shared with the converter)
+        self.translations = GERMAN_TO_ENGLISH
+        self.translator = Translator(self.translations, partial_match='substring')
         
         # Column name translations
         self.column_translations = {
@@ -329,29 +168,33 @@ class HealthcareNetworkDashboard:
             'weight': 'Transitions',
             'provider': 'Provider',
             'unique_patients': 'Unique Patients',
-            'total_visits': 'Total Visits'
+            'total_visits': 'Total Visits',
+            'pagerank': 'Flow Centrality (PageRank)'
+        }
+        
+        # Columns read from the CSV files and the Parquet dataset (everything else is pruned)
+        self.data_columns = [
+            'patient_id', 'age', 'gender', 'reason_for_treatment',
+            'healthcare_provider_type', 'healthcare_provider_main_group',
+            'client_type', 'client_main_group', 'start_date', 'end_date'
+        ]
+        
+        # Row counts kept next to the transition cube (Sankey flows, top client types)
+        self.count_groupings = {
+            'provider_clients': ['healthcare_provider_type', 'client_type'],
         }
     
     def translate_text(self, text):
         """Translate German text to English using the translation dictionary"""
-        if pd.isna(text) or text == '':
-            return text
-        
-        # Handle exact matches first
-        if str(text) in self.translations:
-            return self.translations[str(text)]
-        
-        # Handle partial matches for complex provider types
-        text_str = str(text)
-        for german_term, english_term in self.translations.items():
-            if german_term in text_str:
-                text_str = text_str.replace(german_term, english_term)
-        
-        return text_str
+        return self.translator.translate_text(text)
     
-    def translate_dataframe(self, df):
-        """Apply translations to relevant columns in the dataframe"""
-        df_translated = df.copy()
+    def translate_dataframe(self, df, copy=True):
+        """Apply translations to relevant columns in the dataframe
+        
+        Only the translated columns are replaced: with copy=True the result
+        shares every other column with df, with copy=False df is modified in place.
+        """
+        df_translated = df.copy(deep=False) if copy else df
         
         # Columns that need translation
         translation_columns = [
@@ -361,80 +204,69 @@ class HealthcareNetworkDashboard:
         
         for col in translation_columns:
             if col in df_translated.columns:
-                df_translated[col] = df_translated[col].apply(self.translate_text)
+                df_translated[col] = self.translator.translate_series(df_translated[col])
         
         return df_translated
     
     def translate_dataframe_for_display(self, df):
         """Translate both content and column headers for display"""
-        df_display = self.translate_dataframe(df).copy()
+        df_display = self.translate_dataframe(df)
         
-        # Translate column headers
-        new_columns = {}
-        for col in df_display.columns:
-            if col in self.column_translations:
-                new_columns[col] = self.column_translations[col]
-            else:
-                new_columns[col] = col
-        
-        df_display = df_display.rename(columns=new_columns)
+        # Translate column headers (the frame is already ours, no rename copy)
+        df_display.columns = [self.column_translations.get(col, col) for col in df_display.columns]
         return df_display
         
-    def load_data(self, sample_size=50000, files_to_load=3):
-        """Load and prepare healthcare data"""
+    def load_data(self, sample_size=50000, files_to_load=3, source="csv", parquet_filters=None, sampling="rows"):
+        """Load and prepare healthcare data
+        
+        source="csv" parses the raw CSV files and translates them;
+        source="parquet" reads the converter's Parquet dataset, which is already
+        translated and typed, pushing parquet_filters ({column: values}) down to the files.
+        sampling="rows" takes the first rows of each CSV file (random rows of the
+        Parquet dataset); "patients" and "stratified" keep complete patient
+        journeys, see sample_patients().
+        """
         try:
-            data_dir = "data"
-            sample_dfs = []
-            
             # Show progress
             progress_container = st.container()
             with progress_container:
                 progress_bar = st.progress(0)
                 status_text = st.empty()
             
-            status_text.text(f'Starting data load: {sample_size:,} records from {files_to_load} files...')
-            
-            for i in range(files_to_load):
-                try:
-                    status_text.text(f'Loading file {i+1}/{files_to_load}: data_css_challenge_{i}.csv...')
-                    file_path = f"{data_dir}/data_css_challenge_{i}.csv"
-                    
-                    # Load with explicit parameters
-                    df_sample = pd.read_csv(
-                        file_path, 
-                        nrows=sample_size//files_to_load,
-                        low_memory=False
-                    )
-                    df_sample['source_file'] = i
-                    sample_dfs.append(df_sample)
-                    
-                    progress_bar.progress((i + 1) / files_to_load)
-                    status_text.text(f'Loaded {len(df_sample):,} records from file {i+1}')
-                    
-                except Exception as file_error:
-                    st.error(f"Error loading file {i}: {str(file_error)}")
-                    continue
-            
-            if not sample_dfs:
-                st.error("No data files could be loaded!")
-                return None
-            
-            status_text.text('Combining and processing data...')
-            data = pd.concat(sample_dfs, ignore_index=True)
-            
-            # Clean and prepare data
-            status_text.text('Processing dates and cleaning data...')
-            data['start_date'] = pd.to_datetime(data['start_date'], errors='coerce')
-            data['end_date'] = pd.to_datetime(data['end_date'], errors='coerce')
-            data['treatment_duration_days'] = (data['end_date'] - data['start_date']).dt.days
-            data['year_month'] = data['start_date'].dt.to_period('M').astype(str)
-            
-            # Apply translations to German text
-            status_text.text('Translating German text to English...')
-            data = self.translate_dataframe(data)
-            
-            # Clean provider names for better visualization
-            data['provider_clean'] = data['healthcare_provider_type'].apply(
+            if sampling != "rows":
+                data = self.sample_patients(sample_size, files_to_load, source, parquet_filters,
+                                            sampling == "stratified", status_text)
+                progress_bar.progress(1.0)
+                
+                if data.empty:
+                    st.error("No records match the selected pre-load filters!")
+                    return None
+            elif source == "parquet":
+                status_text.text(f'Reading Parquet dataset from {DEFAULT_PARQUET_DIR}...')
+                data = read_parquet_dataset(DEFAULT_PARQUET_DIR, columns=self.data_columns, equals=parquet_filters)
+                # Rows come grouped by partition, so cap with a random sample rather than head()
+                if len(data) > sample_size:
+                    data = data.sample(n=sample_size, random_state=42).sort_index()
+                data = data.reset_index(drop=True)
+                progress_bar.progress(1.0)
+                
+                if data.empty:
+                    st.error("No records match the selected pre-load filters!")
+                    return None
+            else:
+                data = self.load_csv_data(sample_size, files_to_load, progress_bar, status_text)
+                if data is None:
+                    return None
+            
+            status_text.text('Deriving columns...')
+            # Categorical text, integer patient codes, datetime64 dates
+            compact_claims(data)
+            data['treatment_duration_days'] = (data['end_date'] - data['start_date']).dt.days.astype('Int32')
+            data['year_month'] = month_labels(data['start_date'])
+            
+            # Clean provider names for better visualization (once per provider type)
+            data['provider_clean'] = map_categories(
+                data['healthcare_provider_type'],
                 lambda x: x[:30] + '...' if len(str(x)) > 30 else str(x)
             )
             
@@ -451,92 +283,192 @@ class HealthcareNetworkDashboard:
             st.code(traceback.format_exc())
             return None
     
-    def create_unique_id(self, text):
-        """Create unique ID from text using hash to avoid duplicates"""
-        return hashlib.md5(str(text).encode()).hexdigest()[:8]
+    def load_csv_data(self, sample_size, files_to_load, progress_bar, status_text):
+        """Read the first rows of the raw CSV files, parse dates and translate them"""
+        data_dir = "data"
+        sample_dfs = []
+        
+        status_text.text(f'Starting data load: {sample_size:,} records from {files_to_load} files...')
+        
+        for i in range(files_to_load):
+            try:
+                status_text.text(f'Loading file {i+1}/{files_to_load}: data_css_challenge_{i}.csv...')
+                file_path = f"{data_dir}/data_css_challenge_{i}.csv"
+                
+                # Load only the used columns, text straight into categoricals
+                df_sample = pd.read_csv(
+                    file_path, 
+                    nrows=sample_size//files_to_load,
+                    usecols=lambda col: col in self.data_columns,
+                    dtype={col: 'category' for col in self.data_columns if col not in ['start_date', 'end_date']},
+                    low_memory=False
+                )
+                df_sample['source_file'] = i
+                sample_dfs.append(df_sample)
+                
+                progress_bar.progress((i + 1) / files_to_load)
+                status_text.text(f'Loaded {len(df_sample):,} records from file {i+1}')
+                
+            except Exception as file_error:
+                st.error(f"Error loading file {i}: {str(file_error)}")
+                continue
+        
+        if not sample_dfs:
+            st.error("No data files could be loaded!")
+            return None
+        
+        status_text.text('Combining and processing data...')
+        data = concat_claims(sample_dfs)
+        
+        status_text.text('Parsing dates and translating German text to English...')
+        return self.prepare_csv_chunk(data)
     
-    def create_network_data(self, data, min_transitions=2):
-        """Create network graph data from patient transitions"""
+    def sample_patients(self, sample_size, files_to_load, source, parquet_filters, stratified, status_text):
+        """
+        Stream the source once and keep a random set of patients, with all of
+        their visits, within sample_size rows. Stratified samples give each
+        age × reason stratum an equal share of the rows.
+        """
+        sampler = PatientSampler(max_rows=sample_size,
+                                 strata=['age', 'reason_for_treatment'] if stratified else None)
+        if source == "parquet":
+            chunks = iter_parquet_batches(DEFAULT_PARQUET_DIR, columns=self.data_columns, equals=parquet_filters)
+        else:
+            paths = [f"data/data_css_challenge_{i}.csv" for i in range(files_to_load)]
+            chunks = read_csv_chunks(
+                [path for path in paths if os.path.exists(path)],
+                columns=self.data_columns,
+                categorical=[col for col in self.data_columns if col not in ['start_date', 'end_date']],
+                prepare=self.prepare_csv_chunk
+            )
+        
+        for chunk in chunks:
+            sampler.add(chunk)
+            status_text.text(f'Sampling patients: {sampler.rows_read:,} records read, '
+                             f'{sampler.rows_kept:,} kept...')
+        return sampler.sample()
+    
+    def prepare_csv_chunk(self, data):
+        """Parse dates and translate a frame freshly read from the CSV files, in place"""
+        data['start_date'] = pd.to_datetime(data['start_date'], errors='coerce')
+        data['end_date'] = pd.to_datetime(data['end_date'], errors='coerce')
+        return self.translate_dataframe(data, copy=False)
+    
+    def load_full_dataset(self):
+        """Aggregate every record out of core, without sampling
+        
+        Streams the Parquet dataset when it exists, else all the CSV files, so
+        the whole population never has to fit in memory. Returns
+        (DatasetAggregates, fingerprint of the source files) or None.
+        """
         try:
-            # Get patient transitions
-            transitions = []
-            
-            st.text("Analyzing patient transitions...")
-            
-            for patient_id, group in data.groupby('patient_id'):
-                if len(group) > 1:  # Only patients with multiple visits
-                    group_sorted = group.sort_values('start_date')
-                    providers = group_sorted['healthcare_provider_type'].tolist()
-                    ages = group_sorted['age'].tolist()
-                    genders = group_sorted['gender'].tolist()
-                    reasons = group_sorted['reason_for_treatment'].tolist()
-                    dates = group_sorted['start_date'].tolist()
-                    
-                    for i in range(len(providers) - 1):
-                        transitions.append({
-                            'from': providers[i],
-                            'to': providers[i + 1],
-                            'patient_id': patient_id,
-                            'age': ages[i],
-                            'gender': genders[i],
-                            'reason': reasons[i],
-                            'from_date': dates[i],
-                            'to_date': dates[i + 1] if i + 1 < len(dates) else None
-                        })
-            
-            if not transitions:
-                st.warning("No patient transitions found (no patients with multiple visits)")
-                return None, None, None
-            
-            st.text(f"Found {len(transitions)} transitions, creating network...")
-            transitions_df = pd.DataFrame(transitions)
-            
-            # Count transitions and filter by minimum threshold
-            edge_counts = transitions_df.groupby(['from', 'to']).agg({
-                'patient_id': 'count',
-                'age': lambda x: x.mode().iloc[0] if not x.mode().empty else 'Unknown',
-                'gender': lambda x: x.mode().iloc[0] if not x.mode().empty else 'Unknown',
-                'reason': lambda x: x.mode().iloc[0] if not x.mode().empty else 'Unknown'
-            }).reset_index()
-            
-            edge_counts.columns = ['from', 'to', 'weight', 'common_age', 'common_gender', 'common_reason']
-            edge_counts = edge_counts[edge_counts['weight'] >= min_transitions]
-            
-            if len(edge_counts) == 0:
-                st.warning(f"No connections with ≥{min_transitions} transitions found")
-                return None, None, None
-            
-            # Get node statistics
-            all_providers = set(edge_counts['from'].unique()) | set(edge_counts['to'].unique())
-            node_stats = []
-            
-            for provider in all_providers:
-                provider_data = data[data['healthcare_provider_type'] == provider]
-                unique_patients = provider_data['patient_id'].nunique()
-                avg_age = provider_data['age'].mode().iloc[0] if not provider_data['age'].mode().empty else 'Unknown'
-                common_reason = provider_data['reason_for_treatment'].mode().iloc[0] if not provider_data['reason_for_treatment'].mode().empty else 'Unknown'
-                provider_group = provider_data['healthcare_provider_main_group'].mode().iloc[0] if not provider_data['healthcare_provider_main_group'].mode().empty else 'Unknown'
-                
-                node_stats.append({
-                    'provider': provider,
-                    'unique_patients': unique_patients,
-                    'total_visits': len(provider_data),
-                    'avg_age': avg_age,
-                    'common_reason': common_reason,
-                    'provider_group': provider_group,
-                    'provider_id': self.create_unique_id(provider)  # Create unique ID
-                })
+            progress_container = st.container()
+            with progress_container:
+                status_text = st.empty()
             
-            node_stats_df = pd.DataFrame(node_stats)
+            if parquet_dataset_exists(DEFAULT_PARQUET_DIR):
+                paths = glob.glob(os.path.join(DEFAULT_PARQUET_DIR, '**', '*.parquet'), recursive=True)
+                chunks = iter_parquet_batches(DEFAULT_PARQUET_DIR, columns=self.data_columns)
+                n_partitions = partitions_for_rows(parquet_row_count(DEFAULT_PARQUET_DIR))
+            else:
+                paths = sorted(glob.glob("data/data_css_challenge_*.csv"))
+                if not paths:
+                    st.error("No data files could be loaded!")
+                    return None
+                chunks = read_csv_chunks(
+                    paths,
+                    columns=self.data_columns,
+                    categorical=[col for col in self.data_columns if col not in ['start_date', 'end_date']],
+                    prepare=self.prepare_csv_chunk
+                )
+                n_partitions = partitions_for_files(paths)
             
-            st.text("Network created successfully!")
+            aggregates = DatasetAggregates.from_chunks(chunks, self.count_groupings, n_partitions,
+                                                       progress=status_text.text)
+            status_text.empty()
+            progress_container.empty()
+            return aggregates, files_fingerprint(paths)
             
-            return edge_counts, node_stats_df, transitions_df
+        except Exception as e:
+            st.error(f"Error loading data: {str(e)}")
+            st.error("Traceback:")
+            st.code(traceback.format_exc())
+            return None
+    
+    def load_sql_database(self):
+        """Aggregate the converter's SQLite database in place
+        
+        Transition counts are read from the converter's patient_transitions
+        table (or derived with one window-function query); node, summary and
+        provider statistics are queried per filter, so only aggregated result
+        sets reach pandas. Returns (SqlAggregates, fingerprint of the
+        database file) or None.
+        """
+        try:
+            aggregates = SqlAggregates(DEFAULT_DB_PATH, self.count_groupings)
+            return aggregates, files_fingerprint([DEFAULT_DB_PATH])
             
         except Exception as e:
-            st.error(f"Error creating network: {str(e)}")
+            st.error(f"Error loading data: {str(e)}")
+            st.error("Traceback:")
             st.code(traceback.format_exc())
-            return None, None, None
+            return None
+    
+    def create_unique_id(self, text):
+        """Create unique ID from text using hash to avoid duplicates"""
+        return hashlib.md5(str(text).encode()).hexdigest()[:8]
+    
+    def get_aggregates(self):
+        """Transition cube and row counts of the loaded data, built once per load"""
+        if st.session_state.get('aggregates') is None:
+            with st.spinner('Precomputing transition counts...'):
+                st.session_state.aggregates = DatasetAggregates.from_frame(self.data, self.count_groupings)
+        return st.session_state.aggregates
+    
+    def get_provider_profiles(self):
+        """Patients, visits and client flows of every provider, built once per load"""
+        if st.session_state.get('provider_profiles') is None:
+            aggregates = self.get_aggregates()
+            with st.spinner('Precomputing provider statistics...'):
+                st.session_state.provider_profiles = ProviderProfiles.from_aggregates(aggregates, 'provider_clients')
+        return st.session_state.provider_profiles
+    
+    def cached(self, name, params, compute):
+        """
+        Memoize compute() in the shared result cache, keyed on the loaded
+        dataset's fingerprint, the result name and the widget values it uses
+        """
+        if st.session_state.get('data_fingerprint') is None:
+            st.session_state.data_fingerprint = dataframe_fingerprint(self.data)
+        key = (name, st.session_state.data_fingerprint, params)
+        return get_result_cache().get_or_compute(key, compute)
+    
+    def create_network_data(self, flow_cube, filters=None, min_transitions=2):
+        """
+        Create network graph data from the precomputed transition cube.
+        Returns (edges, node statistics, number of filtered transitions, warning);
+        when no edge passes the filters the edges and node statistics are None
+        and warning says why. The result is memoized by cached(), so the caller
+        shows the warning, and errors are raised rather than cached.
+        """
+        # Sum the filtered transitions (consecutive visits of the same patient)
+        transition_count = flow_cube.transition_count(filters)
+        
+        if transition_count == 0:
+            return None, None, 0, "No patient transitions found (no patients with multiple visits)"
+        
+        # Count transitions per edge and filter by minimum threshold
+        edge_counts = flow_cube.edges(filters, min_transitions)
+        
+        if len(edge_counts) == 0:
+            return None, None, transition_count, f"No connections with ≥{min_transitions} transitions found"
+        
+        # Get node statistics for all providers in the network
+        all_providers = set(edge_counts['from'].unique()) | set(edge_counts['to'].unique())
+        node_stats_df = flow_cube.node_stats(all_providers, filters)
+        node_stats_df['provider_id'] = node_stats_df['provider'].map(self.create_unique_id)  # Create unique ID
+        
+        return edge_counts, node_stats_df, transition_count, None
     
     def create_network_graph(self, edges_df, nodes_df, layout_type="spring"):
         """Create interactive network graph using streamlit-agraph"""
@@ -631,136 +563,11 @@ class HealthcareNetworkDashboard:
             node_attrs = nodes_df.set_index('provider').to_dict('index')
             nx.set_node_attributes(G, node_attrs)
             
-            # Calculate layout
-            pos = nx.spring_layout(G, k=1.5, iterations=50)
-            
-            # Create edge traces with arrows for directed graph
-            edge_x = []
-            edge_y = []
-            edge_info = []
-            annotations = []  # For arrows
-            
-            for edge in G.edges(data=True):
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-                
-                # Calculate arrow position (75% along the edge)
-                arrow_x = x0 + 0.75 * (x1 - x0)
-                arrow_y = y0 + 0.75 * (y1 - y0)
-                
-                # Calculate arrow direction
-                dx = x1 - x0
-                dy = y1 - y0
-                length = np.sqrt(dx*dx + dy*dy)
-                
-                if length > 0:
-                    # Normalize direction vector
-                    dx_norm = dx / length
-                    dy_norm = dy / length
-                    
-                    # Add arrow annotation
-                    annotations.append(
-                        dict(
-                            x=arrow_x,
-                            y=arrow_y,
-                            ax=arrow_x - 0.02 * dx_norm,
-                            ay=arrow_y - 0.02 * dy_norm,
-                            xref='x', yref='y',
-                            axref='x', ayref='y',
-                            showarrow=True,
-                            arrowhead=2,
-                            arrowsize=1.5,
-                            arrowwidth=min(3, max(1, edge[2]['weight'] / 10)),
-                            arrowcolor='#666666',
-                            standoff=0
-                        )
-                    )
-                
-                edge_x.extend([x0, x1, None])
-                edge_y.extend([y0, y1, None])
-                edge_info.append(f"From: {edge[0]}<br>To: {edge[1]}<br>Transitions: {edge[2]['weight']}")
-            
-            # Create edge trace (lines without arrows, arrows added via annotations)
-            edge_trace = go.Scatter(
-                x=edge_x, y=edge_y,
-                line=dict(width=1, color='#888'),
-                hoverinfo='none',
-                mode='lines',
-                showlegend=False
-            )
-            
-            # Create node traces
-            node_x = []
-            node_y = []
-            node_info = []
-            node_colors = []
-            node_sizes = []
-            
-            color_map = {
-                'Hospitals': '#FF6B6B',
-                'Doctors': '#4ECDC4',
-                'Laboratories': '#45B7D1',
-                'Nursing Homes': '#96CEB4',
-                'Unknown': '#FFEAA7'
-            }
+            # Positions are reused per topology and warm-started from similar graphs
+            pos = get_layout_cache().layout(G)
             
-            for node in G.nodes():
-                x, y = pos[node]
-                node_x.append(x)
-                node_y.append(y)
-                
-                node_data = node_attrs.get(node, {})
-                node_info.append(
-                    f"Provider: {node}<br>"
-                    f"Unique Patients: {node_data.get('unique_patients', 'N/A')}<br>"
-                    f"Total Visits: {node_data.get('total_visits', 'N/A')}<br>"
-                    f"Provider Group: {node_data.get('provider_group', 'Unknown')}"
-                )
-                
-                provider_group = node_data.get('provider_group', 'Unknown')
-                node_colors.append(color_map.get(provider_group, '#DDA0DD'))
-                node_sizes.append(min(30, max(8, node_data.get('unique_patients', 10) / 5)))
-            
-            node_trace = go.Scatter(
-                x=node_x, y=node_y,
-                mode='markers+text',
-                hoverinfo='text',
-                text=[node[:15] + '...' if len(node) > 15 else node for node in G.nodes()],
-                textposition="middle center",
-                textfont=dict(size=8),
-                hovertext=node_info,
-                marker=dict(
-                    size=node_sizes,
-                    color=node_colors,
-                    line=dict(width=2, color='white'),
-                    opacity=0.8
-                ),
-                showlegend=False
-            )
-            
-            # Create the figure with arrows
-            fig = go.Figure(
-                data=[edge_trace, node_trace],
-                layout=go.Layout(
-                    title='Healthcare Provider Network (Directed)',
-                    showlegend=False,
-                    hovermode='closest',
-                    margin=dict(b=20,l=5,r=5,t=40),
-                    annotations=annotations + [dict(
-                        text="Arrows show direction of patient flow between providers",
-                        showarrow=False,
-                        xref="paper", yref="paper",
-                        x=0.005, y=-0.002,
-                        xanchor='left', yanchor='bottom',
-                        font=dict(color="gray", size=10)
-                    )],
-                    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                    plot_bgcolor='white'
-                )
-            )
-            
-            return fig
+            # Edges, arrowheads, edge hovers and nodes are one trace each
+            return network_figure(G, pos, node_attrs)
             
         except Exception as e:
             st.error(f"Error creating Plotly network: {str(e)}")
@@ -782,26 +589,87 @@ class HealthcareNetworkDashboard:
         # Load data section
         with st.sidebar:
             st.subheader("Data Loading")
-            sample_size = st.slider("Sample Size", 10000, 200000, 50000, step=10000)
-            files_to_load = st.slider("Number of Files to Load", 1, 5, 3)
+            source_options = ["CSV files"]
+            if parquet_dataset_exists(DEFAULT_PARQUET_DIR):
+                source_options.append("Parquet dataset")
+            if database_exists(DEFAULT_DB_PATH):
+                source_options.append("SQLite database")
+            source_options.append("Full dataset")
+            data_source = st.radio("Data Source", source_options, horizontal=True)
+            
+            sample_size = None
+            files_to_load = 3
+            parquet_filters = None
+            sampling = "rows"
+            
+            if data_source == "Full dataset":
+                st.caption("Aggregates every record (Parquet dataset if present, else all CSV files) "
+                           "out of core: chunks are streamed and only the aggregates stay in memory.")
+            elif data_source == "SQLite database":
+                st.caption(f"Runs filters and aggregations as SQL against {DEFAULT_DB_PATH}; "
+                           "only aggregated results are loaded.")
+            else:
+                sample_size = st.slider("Sample Size", 10000, 10000000, 50000, step=10000)
+                sampling = SAMPLING_MODES[st.selectbox("Sampling", list(SAMPLING_MODES))]
+                if sampling != "rows":
+                    st.caption("Reads the selected data once and keeps whole patient journeys: "
+                               "memory follows the sample size, time the amount of data read.")
+            
+            if data_source == "Parquet dataset":
+                # Pre-load filters are pushed down to the Parquet files (empty = all)
+                filter_options = get_parquet_filter_options(DEFAULT_PARQUET_DIR)
+                parquet_filters = {
+                    'healthcare_provider_main_group': st.multiselect("Load Provider Groups", filter_options['healthcare_provider_main_group']),
+                    'age': st.multiselect("Load Age Groups", filter_options['age']),
+                    'gender': st.multiselect("Load Genders", filter_options['gender']),
+                    'reason_for_treatment': st.multiselect("Load Treatment Reasons", filter_options['reason_for_treatment']),
+                }
+            elif data_source == "CSV files":
+                files_to_load = st.slider("Number of Files to Load", 1, 10, 3)
             
             if st.button("Load Data", type="primary"):
                 try:
                     # Clear any existing data
                     st.session_state.dashboard_data = None
                     st.session_state.data_loaded = False
+                    st.session_state.aggregates = None
+                    st.session_state.provider_profiles = None
+                    st.session_state.data_fingerprint = None
                     
-                    # Show loading message
-                    with st.spinner(f'Loading {sample_size:,} records from {files_to_load} files...'):
-                        loaded_data = self.load_data(sample_size, files_to_load)
-                    
-                    if loaded_data is not None:
-                        st.session_state.dashboard_data = loaded_data
-                        st.session_state.data_loaded = True
-                        st.success(f"✅ Successfully loaded {len(loaded_data):,} records!")
-                        st.rerun()  # Refresh the page
+                    if data_source in ("Full dataset", "SQLite database"):
+                        # Only the aggregates are kept, there is no in-memory frame
+                        if data_source == "Full dataset":
+                            with st.spinner('Aggregating the full dataset out of core...'):
+                                loaded = self.load_full_dataset()
+                        else:
+                            with st.spinner(f'Querying {DEFAULT_DB_PATH}...'):
+                                loaded = self.load_sql_database()
+                        if loaded is not None:
+                            st.session_state.aggregates, st.session_state.data_fingerprint = loaded
+                            self.get_provider_profiles()
+                            st.session_state.data_loaded = True
+                            st.success(f"✅ Successfully aggregated {st.session_state.aggregates.records:,} records!")
+                            st.rerun()  # Refresh the page
+                        else:
+                            st.error("❌ Failed to load data")
                     else:
-                        st.error("❌ Failed to load data")
+                        # Show loading message
+                        source = "parquet" if data_source == "Parquet dataset" else "csv"
+                        with st.spinner(f'Loading {sample_size:,} records from {data_source.lower()}...'):
+                            loaded_data = self.load_data(sample_size, files_to_load, source, parquet_filters, sampling)
+                        
+                        if loaded_data is not None:
+                            # Precompute transition counts once; filters only slice them
+                            with st.spinner('Precomputing transition counts...'):
+                                st.session_state.aggregates = DatasetAggregates.from_frame(loaded_data, self.count_groupings)
+                                st.session_state.data_fingerprint = dataframe_fingerprint(loaded_data)
+                            self.get_provider_profiles()
+                            st.session_state.dashboard_data = loaded_data
+                            st.session_state.data_loaded = True
+                            st.success(f"✅ Successfully loaded {len(loaded_data):,} records!")
+                            st.rerun()  # Refresh the page
+                        else:
+                            st.error("❌ Failed to load data")
                         
                 except Exception as e:
                     st.error(f"❌ Error during data loading: {str(e)}")
@@ -810,7 +678,7 @@ class HealthcareNetworkDashboard:
         # Use session state data
         self.data = st.session_state.dashboard_data
         
-        if self.data is None or not st.session_state.data_loaded:
+        if not st.session_state.data_loaded:
             st.info("👈 Please load data using the sidebar controls")
             st.markdown("""
             ### Quick Start:
@@ -829,55 +697,66 @@ class HealthcareNetworkDashboard:
             return
         
         # Show data summary
-        st.sidebar.success(f"✅ Data loaded: {len(self.data):,} records")
-        st.sidebar.info(f"📊 Unique patients: {self.data['patient_id'].nunique():,}")
+        aggregates = self.get_aggregates()
+        flow_cube = aggregates.cube
+        st.sidebar.success(f"✅ Data loaded: {aggregates.records:,} records")
+        unique_patients = self.cached('unique_patients', None, lambda: flow_cube.visit_summary()['patients'])
+        st.sidebar.info(f"📊 Unique patients: {unique_patients:,}")
         
-        # Main filters
+        # Main filters (values of every visit)
+        filter_options = self.cached('filter_options', None, lambda: {
+            col: ['All'] + flow_cube.values(col)
+            for col in ['age', 'gender', 'reason_for_treatment', 'healthcare_provider_main_group']
+        })
         with st.sidebar:
             st.subheader("Network Filters")
             
             # Age filter
-            age_options = ['All'] + sorted([age for age in self.data['age'].unique() if pd.notna(age)])
-            selected_age = st.selectbox("Age Group", age_options)
+            selected_age = st.selectbox("Age Group", filter_options['age'])
             
             # Gender filter  
-            gender_options = ['All'] + sorted([gender for gender in self.data['gender'].dropna().unique()])
-            selected_gender = st.selectbox("Gender", gender_options)
+            selected_gender = st.selectbox("Gender", filter_options['gender'])
             
             # Reason filter
-            reason_options = ['All'] + sorted([reason for reason in self.data['reason_for_treatment'].dropna().unique()])
-            selected_reason = st.selectbox("Treatment Reason", reason_options)
+            selected_reason = st.selectbox("Treatment Reason", filter_options['reason_for_treatment'])
             
             # Provider group filter
-            provider_group_options = ['All'] + sorted([group for group in self.data['healthcare_provider_main_group'].dropna().unique()])
-            selected_provider_group = st.selectbox("Provider Group", provider_group_options)
+            selected_provider_group = st.selectbox("Provider Group", filter_options['healthcare_provider_main_group'])
             
             # Network settings
             st.subheader("Network Settings")
             min_transitions = st.slider("Minimum Transitions", 1, 20, 3, help="Filter out weak connections")
             visualization_type = st.radio("Visualization Type", ["Plotly Network (Directed)", "Interactive Network"])
         
-        # Apply filters
-        filtered_data = self.data.copy()
-        
-        if selected_age != 'All':
-            filtered_data = filtered_data[filtered_data['age'] == selected_age]
-        if selected_gender != 'All':
-            filtered_data = filtered_data[filtered_data['gender'] == selected_gender]
-        if selected_reason != 'All':
-            filtered_data = filtered_data[filtered_data['reason_for_treatment'] == selected_reason]
-        if selected_provider_group != 'All':
-            filtered_data = filtered_data[filtered_data['healthcare_provider_main_group'] == selected_provider_group]
+        # Apply filters (slices of the precomputed transition cube)
+        filters = {
+            'age': selected_age,
+            'gender': selected_gender,
+            'reason_for_treatment': selected_reason,
+            'healthcare_provider_main_group': selected_provider_group,
+        }
+        filter_key = tuple(filters.values())
+        filtered_summary = self.cached('visit_summary', filter_key, lambda: flow_cube.visit_summary(filters))
         
         # Show filtered data info
         st.sidebar.markdown("---")
         st.sidebar.markdown("**Filtered Data:**")
-        st.sidebar.markdown(f"Records: {len(filtered_data):,}")
-        st.sidebar.markdown(f"Patients: {filtered_data['patient_id'].nunique():,}")
+        st.sidebar.markdown(f"Records: {filtered_summary['records']:,}")
+        st.sidebar.markdown(f"Patients: {filtered_summary['patients']:,}")
         
         # Create network data
         with st.spinner('Creating network...'):
-            edges_df, nodes_df, transitions_df = self.create_network_data(filtered_data, min_transitions)
+            try:
+                edges_df, nodes_df, transition_count, network_warning = self.cached(
+                    'network', (filter_key, min_transitions),
+                    lambda: self.create_network_data(flow_cube, filters, min_transitions)
+                )
+            except Exception as e:
+                st.error(f"Error creating network: {str(e)}")
+                st.code(traceback.format_exc())
+                edges_df, network_warning = None, None
+        if network_warning:
+            st.warning(network_warning)
         
         if edges_df is None or len(edges_df) == 0:
             st.warning("⚠️ No network connections found with current filters.")
@@ -888,16 +767,15 @@ class HealthcareNetworkDashboard:
             st.markdown("- Load more files")
             
             # Show some basic stats about filtered data
-            if len(filtered_data) > 0:
+            if filtered_summary['records'] > 0:
                 st.subheader("📊 Filtered Data Summary")
                 col1, col2 = st.columns(2)
                 with col1:
-                    st.metric("Total Records", len(filtered_data))
-                    st.metric("Unique Patients", filtered_data['patient_id'].nunique())
+                    st.metric("Total Records", filtered_summary['records'])
+                    st.metric("Unique Patients", filtered_summary['patients'])
                 with col2:
-                    multi_visit = filtered_data.groupby('patient_id').size()
-                    st.metric("Multi-visit Patients", (multi_visit > 1).sum())
-                    st.metric("Avg Visits/Patient", f"{multi_visit.mean():.1f}")
+                    st.metric("Multi-visit Patients", filtered_summary['multi_visit_patients'])
+                    st.metric("Avg Visits/Patient", f"{filtered_summary['avg_visits_per_patient']:.1f}")
             return
         
         # Main dashboard layout
@@ -905,21 +783,34 @@ class HealthcareNetworkDashboard:
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Patients", f"{filtered_data['patient_id'].nunique():,}")
+            st.metric("Total Patients", f"{filtered_summary['patients']:,}")
         with col2:
             st.metric("Provider Types", f"{len(nodes_df):,}")
         with col3:
             st.metric("Transitions", f"{edges_df['weight'].sum():,}")
         with col4:
-            avg_transitions = len(transitions_df) / transitions_df['patient_id'].nunique() if len(transitions_df) > 0 else 0
+            # Patients of the filtered transitions, so both counts use the same definition
+            transition_patients = self.cached('transition_patients', filter_key,
+                                              lambda: flow_cube.transition_patient_count(filters))
+            avg_transitions = transition_count / transition_patients if transition_patients > 0 else 0
             st.metric("Avg Transitions/Patient", f"{avg_transitions:.1f}")
         
         # Network visualization
         st.subheader("🔗 Treatment Flow Network")
         
+        network_key = (filter_key, min_transitions)
+        
+        # Sparse transition matrix of the filter slice, for the graph queries below
+        flow_graph = self.cached('flow_graph', filter_key, lambda: FlowGraph.from_cube(flow_cube, filters))
+        
+        def plotly_network():
+            return self.cached('plotly_network', network_key, lambda: self.create_plotly_network(edges_df, nodes_df))
+        
         if visualization_type == "Interactive Network":
             try:
-                nodes, edges, config = self.create_network_graph(edges_df, nodes_df)
+                nodes, edges, config = self.cached(
+                    'interactive_network', network_key, lambda: self.create_network_graph(edges_df, nodes_df)
+                )
                 
                 if len(nodes) == 0 or len(edges) == 0:
                     st.warning("No nodes or edges to display. Try adjusting your filters.")
@@ -967,11 +858,11 @@ class HealthcareNetworkDashboard:
             except Exception as e:
                 st.error(f"Error creating interactive network: {str(e)}")
                 st.info("Falling back to Plotly visualization...")
-                fig = self.create_plotly_network(edges_df, nodes_df)
+                fig = plotly_network()
                 if fig:
                     st.plotly_chart(fig, use_container_width=True)
         else:
-            fig = self.create_plotly_network(edges_df, nodes_df)
+            fig = plotly_network()
             if fig:
                 st.plotly_chart(fig, use_container_width=True)
         
@@ -995,6 +886,8 @@ class HealthcareNetworkDashboard:
             st.subheader("🏥 Most Active Providers")
             if len(nodes_df) > 0:
                 top_nodes = nodes_df.nlargest(10, 'unique_patients')[['provider', 'unique_patients', 'total_visits']]
+                pagerank = self.cached('pagerank', filter_key, flow_graph.pagerank)
+                top_nodes['pagerank'] = top_nodes['provider'].map(pagerank).round(4)
                 # Truncate long provider names for display
                 top_nodes['provider'] = top_nodes['provider'].apply(lambda x: x[:40] + '...' if len(x) > 40 else x)
                 # Translate column headers
@@ -1006,22 +899,22 @@ class HealthcareNetworkDashboard:
         # Provider group distribution
         if len(nodes_df) > 0:
             st.subheader("📈 Provider Group Distribution")
-            fig_dist = px.pie(
+            fig_dist = self.cached('provider_group_pie', network_key, lambda: px.pie(
                 nodes_df, 
                 names='provider_group', 
                 values='unique_patients',
                 title="Patient Distribution by Provider Group"
-            )
+            ))
             st.plotly_chart(fig_dist, use_container_width=True)
         
             # Edge weight distribution
             st.subheader("🔗 Transition Frequency Distribution")
-            fig_edges = px.histogram(
+            fig_edges = self.cached('edge_weight_histogram', network_key, lambda: px.histogram(
                 edges_df, 
                 x='weight', 
                 nbins=20,
                 title="Distribution of Transition Frequencies"
-            )
+            ))
             st.plotly_chart(fig_edges, use_container_width=True)
         
         # Download options
@@ -1055,7 +948,7 @@ class HealthcareNetworkDashboard:
         st.header("🏥 Provider Paths Analysis")
         
         # Show most active providers first to guide selection
-        provider_counts = self.data.groupby('healthcare_provider_type').size().sort_values(ascending=False)
+        provider_counts = self.cached('provider_counts', None, lambda: flow_cube.visits_by('healthcare_provider_type'))
         st.sidebar.markdown("### Most Active Providers")
         st.sidebar.dataframe(
             provider_counts.head().reset_index().rename(
@@ -1066,7 +959,7 @@ class HealthcareNetworkDashboard:
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            providers = sorted(self.data['healthcare_provider_type'].unique())
+            providers = self.cached('providers', None, lambda: flow_cube.values('healthcare_provider_type'))
             selected_provider = st.selectbox(
                 "Select Provider",
                 providers,
@@ -1081,8 +974,37 @@ class HealthcareNetworkDashboard:
                 key="min_count_slider"
             )
             
+            diagram = st.radio(
+                "Flow diagram",
+                ["Provider → Client Types", "Multi-Step Pathways"],
+                horizontal=True,
+                key="flow_diagram_radio"
+            )
+            
             st.subheader("Flow Diagram")
-            sankey_fig = create_sankey_for_provider(self.data, selected_provider, min_count)
+            if diagram == "Multi-Step Pathways":
+                pathway_length = st.slider(
+                    "Visits per pathway",
+                    min_value=2,
+                    max_value=MAX_STEPS,
+                    value=3,
+                    key="pathway_length_slider"
+                )
+                # Answered from the pathway index built with the aggregates
+                sankey_fig, sankey_warning = create_pathway_sankey(aggregates.pathways, selected_provider,
+                                                                   pathway_length, min_count)
+            else:
+                client_flows = self.get_provider_profiles().client_flows(selected_provider)
+                try:
+                    sankey_fig, sankey_warning = self.cached(
+                        'sankey', (selected_provider, min_count),
+                        lambda: create_sankey_for_provider(client_flows, selected_provider, min_count)
+                    )
+                except Exception as e:
+                    st.error(f"Errore nella creazione del diagramma Sankey: {str(e)}")
+                    sankey_fig, sankey_warning = None, None
+            if sankey_warning:
+                st.warning(sankey_warning)
             if sankey_fig is not None:  # Add this check
                 st.plotly_chart(sankey_fig, use_container_width=True)
             else:
@@ -1092,33 +1014,93 @@ class HealthcareNetworkDashboard:
                 - Select a provider with more patients
                 - Check the data for the selected provider
                 """)
+            
+            if diagram == "Multi-Step Pathways":
+                top_pathways = aggregates.pathways.top_pathways(selected_provider, pathway_length, k=10)
+                if not top_pathways.empty:
+                    st.markdown(f"**Most common {pathway_length}-visit journeys from {selected_provider}**")
+                    st.dataframe(top_pathways.rename(columns=lambda column: column.replace('_', ' ').title()),
+                                 hide_index=True)
 
         # Statistics in the right column
         with col2:
             st.subheader("Provider Statistics")
-            provider_stats = self.data[self.data['healthcare_provider_type'] == selected_provider]
-            
-            total_patients = provider_stats['patient_id'].nunique()
-            avg_visits = provider_stats.groupby('patient_id').size().mean()
+            total_patients, avg_visits, fig = self.cached(
+                'provider_statistics', selected_provider, lambda: self.compute_provider_statistics(selected_provider)
+            )
             
             st.metric("Total Patients", f"{total_patients:,}")
             st.metric("Average Visits per Patient", f"{avg_visits:.2f}")
             
-            st.subheader("Top 5 Client Types")
-            top_clients = (provider_stats.groupby('client_type')
-                                       .size()
-                                       .sort_values(ascending=True)
-                                       .tail(5))
+            # Where this provider's patients go next, over all transitions
+            all_flows = self.cached('flow_graph', None, lambda: FlowGraph.from_cube(flow_cube))
+            if selected_provider in all_flows.nodes:
+                reachable = all_flows.reachable([selected_provider], hops=2)
+                st.metric("Providers Reached in ≤2 Transitions", f"{(reachable > 0).sum():,}")
+                next_providers = all_flows.top_neighbours(selected_provider, k=3)
+                st.caption("Most frequent next providers: " + ", ".join(
+                    f"{provider} ({count:,.0f})" for provider, count in next_providers.items()
+                ))
             
-            fig = px.bar(y=top_clients.index, 
-                         x=top_clients.values,
-                         orientation='h',
-                             title="Most Frequent Clients")
+            st.subheader("Top 5 Client Types")
             st.plotly_chart(fig, use_container_width=True)
         
+        # Result cache usage (shared by all sessions)
+        cache_stats = get_result_cache().stats()
+        st.sidebar.caption(
+            f"Result cache: {cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses, "
+            f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 2**20:.1f} MB)"
+        )
+        layout_stats = get_layout_cache().stats()
+        st.sidebar.caption(
+            f"Layout cache: {layout_stats['hits']:,} reused, {layout_stats['warm_starts']:,} warm-started, "
+            f"{layout_stats['cold_starts']:,} computed"
+        )
+        
         # Render chat assistant at the end
         self.render_chat_assistant()
+    
+    def render_memory_usage(self, stats):
+        """Sidebar report of the memory used by the rerun that just finished"""
+        with st.sidebar.expander("Memory usage", expanded=False):
+            st.checkbox("Trace allocations (tracemalloc)", key='trace_allocations',
+                        help="Track Python and numpy allocations per rerun; slows the dashboard down")
+            if self.data is not None:
+                per_million = self.cached('data_memory', None, lambda: memory_per_million_rows(self.data))
+                st.caption(f"Loaded data: {per_million * len(self.data) / 1e6:,.1f} MB "
+                           f"({per_million:,.0f} MB per million rows)")
+            elif st.session_state.get('aggregates') is not None:
+                aggregates = st.session_state.aggregates
+                cube_mb = self.cached('aggregates_memory', None, lambda: aggregates.cube.memory_bytes() / 2**20)
+                if isinstance(aggregates, SqlAggregates):
+                    st.caption(f"SQLite aggregates: {cube_mb:,.1f} MB (queries run in the database)")
+                else:
+                    st.caption(f"Full dataset aggregates: {cube_mb:,.1f} MB (no rows kept in memory)")
+            if 'rss_change_mb' in stats:
+                st.caption(f"RSS: {stats['rss_mb']:,.1f} MB ({stats['rss_change_mb']:+,.1f} MB this rerun)")
+            if stats.get('peak_rss_mb') is not None:
+                st.caption(f"Lifetime peak RSS: {stats['peak_rss_mb']:,.1f} MB")
+            if 'allocated_peak_mb' in stats:
+                st.caption(f"Allocated this rerun: peak {stats['allocated_peak_mb']:,.1f} MB, "
+                           f"retained {stats['retained_mb']:,.1f} MB")
 
+    def compute_provider_statistics(self, selected_provider):
+        """Patients, visits per patient and top client types chart of one provider"""
+        profiles = self.get_provider_profiles()
+        
+        # Visits of known patients only
+        total_patients, patient_visits = profiles.patients(selected_provider)
+        avg_visits = patient_visits / total_patients if total_patients else np.nan
+        
+        # Client flows are stored most frequent first
+        top_clients = profiles.client_flows(selected_provider).head(5).iloc[::-1]
+        
+        fig = px.bar(y=top_clients.index, 
+                     x=top_clients.values,
+                     orientation='h',
+                         title="Most Frequent Clients")
+        return total_patients, avg_visits, fig
+    
     def render_chat_assistant(self):
         """Render the AI chat assistant as an expandable widget"""
         with st.expander("💬 Chat with Healthcare Data Assistant", expanded=False):
@@ -1160,8 +1142,8 @@ class HealthcareNetworkDashboard:
                     full_prompt += f"Healthcare Data Analysis Context:\n{context_content}\n\n"
                 
                 # Add current data summary if data is loaded
-                if hasattr(self, 'data') and self.data is not None:
-                    data_summary = self.get_data_context_summary()
+                if st.session_state.get('data_loaded'):
+                    data_summary = self.cached('data_context_summary', None, self.get_data_context_summary)
                     full_prompt += f"Current Dashboard Data Summary:\n{data_summary}\n\n"
                 
                 full_prompt += f"User Question: {prompt}"
@@ -1196,30 +1178,34 @@ class HealthcareNetworkDashboard:
 
     def get_data_context_summary(self):
         """Generate a summary of current dashboard data for the AI assistant"""
-        if not hasattr(self, 'data') or self.data is None:
+        if not st.session_state.get('data_loaded'):
             return "No data currently loaded in the dashboard."
         
+        aggregates = self.get_aggregates()
+        
+        def value_counts(column):
+            """Visits per value of a visit column, most frequent first"""
+            return aggregates.cube.visits_by(column)
+        
         summary = []
-        summary.append(f"Healthcare dataset with {len(self.data):,} records")
-        summary.append(f"Unique patients: {self.data['patient_id'].nunique():,}")
+        summary.append(f"Healthcare dataset with {aggregates.records:,} records")
+        summary.append(f"Unique patients: {aggregates.cube.visit_summary()['patients']:,}")
         
         # Age distribution
-        age_counts = self.data['age'].value_counts().head(5)
+        age_counts = value_counts('age').head(5)
         summary.append(f"Top age groups: {', '.join([f'{age} ({count})' for age, count in age_counts.items()])}")
         
         # Treatment reasons
-        reason_counts = self.data['reason_for_treatment'].value_counts().head(5)
+        reason_counts = value_counts('reason_for_treatment').head(5)
         summary.append(f"Top treatment reasons: {', '.join([f'{reason} ({count})' for reason, count in reason_counts.items()])}")
         
         # Provider groups
-        provider_counts = self.data['healthcare_provider_main_group'].value_counts().head(5)
+        provider_counts = value_counts('healthcare_provider_main_group').head(5)
         summary.append(f"Top provider groups: {', '.join([f'{provider} ({count})' for provider, count in provider_counts.items()])}")
         
         # Date range
-        if 'start_date' in self.data.columns:
-            start_date = self.data['start_date'].min()
-            end_date = self.data['start_date'].max()
-            summary.append(f"Date range: {start_date} to {end_date}")
+        start_date, end_date = aggregates.date_range
+        summary.append(f"Date range: {start_date} to {end_date}")
         
         return "; ".join(summary)
 
@@ -1228,61 +1214,98 @@ import plotly.graph_objects as go
 from collections import defaultdict
 
 # Add the provider path analysis functions
-def create_sankey_for_provider(df, selected_provider, min_count=5):
-    """Crea Sankey diagram con controlli di robustezza"""
-    try:
-        # Filtra per provider selezionato
-        provider_df = df[df['healthcare_provider_type'] == selected_provider]
-        
-        if provider_df.empty:
-            st.warning(f"Nessun dato disponibile per il provider {selected_provider}")
-            return None
-            
-        # Calcola e filtra le transizioni
-        transitions = provider_df.groupby(['healthcare_provider_type', 'client_type']).size().reset_index(name='count')
-        transitions = transitions[transitions['count'] >= min_count]
-        
-        if transitions.empty:
-            st.warning(f"Nessuna transizione con almeno {min_count} pazienti trovata. Prova a ridurre il valore minimo.")
-            return None
+def create_sankey_for_provider(client_flows, selected_provider, min_count=5):
+    """Crea Sankey diagram con controlli di robustezza
+    
+    client_flows: conteggi per client_type del provider selezionato (Series in ordine
+    decrescente, da ProviderProfiles.client_flows)
+    
+    Restituisce (figura, avviso): la figura è None, con il motivo nell'avviso, se non
+    ci sono flussi da mostrare. Il risultato viene memorizzato nella cache, quindi
+    l'avviso lo mostra il chiamante.
+    """
+    if client_flows.empty:
+        return None, f"Nessun dato disponibile per il provider {selected_provider}"
         
-        # Crea nodi
-        nodes = pd.unique(
-            list(transitions['healthcare_provider_type']) + 
-            list(transitions['client_type'])
+    # Filtra le transizioni
+    transitions = client_flows[client_flows >= min_count]
+    
+    if transitions.empty:
+        return None, f"Nessuna transizione con almeno {min_count} pazienti trovata. Prova a ridurre il valore minimo."
+    
+    # Crea nodi: il provider (0) e un nodo per client_type, anche se ha lo stesso nome del provider
+    nodes = [selected_provider] + list(transitions.index)
+    
+    # Crea figura Sankey
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=nodes
+        ),
+        link=dict(
+            source=np.zeros(len(transitions), dtype=int),
+            target=np.arange(1, len(nodes)),
+            value=transitions.to_numpy(),
+            hovertemplate="Da: %{source.label}<br>" +
+                         "A: %{target.label}<br>" +
+                         "Pazienti: %{value}<extra></extra>"
         )
-        
-        node_indices = {node: idx for idx, node in enumerate(nodes)}
-        
-        # Crea figura Sankey
-        fig = go.Figure(data=[go.Sankey(
-            node=dict(
-                pad=15,
-                thickness=20,
-                line=dict(color="black", width=0.5),
-                label=nodes
-            ),
-            link=dict(
-                source=[node_indices[s] for s in transitions['healthcare_provider_type']],
-                target=[node_indices[t] for t in transitions['client_type']],
-                value=transitions['count'],
-                hovertemplate="Da: %{source.label}<br>" +
-                             "A: %{target.label}<br>" +
-                             "Pazienti: %{value}<extra></extra>"
-            )
-        )])
-        
-        fig.update_layout(
-            title_text=f"Flussi da {selected_provider} (min. {min_count} pazienti)",
-            font_size=10,
-            height=600
+    )])
+    
+    fig.update_layout(
+        title_text=f"Flussi da {selected_provider} (min. {min_count} pazienti)",
+        font_size=10,
+        height=600
+    )
+    return fig, None
+
+def create_pathway_sankey(pathways, selected_provider, length=3, min_count=5, max_pathways=20):
+    """Sankey a più livelli dei percorsi più frequenti che partono dal provider
+    
+    pathways: PathwayIndex dei percorsi dei pazienti; un nodo per (passo, provider)
+    
+    Restituisce (figura, avviso) come create_sankey_for_provider.
+    """
+    links = pathways.pathway_links(selected_provider, length, k=max_pathways, min_count=min_count)
+    if links.empty:
+        return None, (f"Nessun percorso di {length} visite con almeno {min_count} pazienti trovato "
+                      f"da {selected_provider}. Prova a ridurre il valore minimo.")
+    
+    # Nodi per passo: lo stesso provider a passi diversi è un nodo diverso
+    sources = pd.MultiIndex.from_arrays([links['source_step'], links['source']])
+    targets = pd.MultiIndex.from_arrays([links['source_step'] + 1, links['target']])
+    nodes = sources.append(targets).unique()
+    
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=list(nodes.get_level_values(1)),
+            customdata=list(nodes.get_level_values(0)),
+            hovertemplate="%{label}<br>Passo %{customdata}<extra></extra>"
+        ),
+        link=dict(
+            source=nodes.get_indexer(sources),
+            target=nodes.get_indexer(targets),
+            value=links['count'],
+            hovertemplate="Da: %{source.label}<br>" +
+                         "A: %{target.label}<br>" +
+                         "Percorsi: %{value}<extra></extra>"
         )
-        return fig
-        
-    except Exception as e:
-        st.error(f"Errore nella creazione del diagramma Sankey: {str(e)}")
-        return None
+    )])
+    
+    fig.update_layout(
+        title_text=f"Percorsi di {length} visite da {selected_provider} (min. {min_count} pazienti)",
+        font_size=10,
+        height=600
+    )
+    return fig, None
 # At the bottom of the file, add:
 if __name__ == "__main__":
+    memory_probe = RerunMemoryProbe(st.session_state.get('trace_allocations', False))
     dashboard = HealthcareNetworkDashboard()
-    dashboard.run_dashboard()
\ No newline at end of file
+    dashboard.run_dashboard()
+    dashboard.render_memory_usage(memory_probe.stop())
\ No newline at end of file
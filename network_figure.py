@@ -0,0 +1,179 @@
+"""
+Plotly figure of the directed provider network, with a fixed number of traces.
+
+One annotation per edge arrow makes Plotly slow to draw a few hundred edges
+and grows the figure JSON by a dict per edge. Here the geometry is computed
+with NumPy and every edge element goes into one trace:
+- all edge lines in one Scatter, segments separated by gaps;
+- all arrowheads as filled triangles in one Scatter (fill='toself' fills
+  every gap-separated polygon on its own);
+- hover labels for at most MAX_EDGE_HOVERS edges (the heaviest), on
+  invisible markers at the arrowheads;
+- text labels on at most MAX_NODE_LABELS nodes (the most patients); every
+  node keeps its hover text.
+The figure has four traces whatever the graph size, and coordinates are
+float32 arrays, which Plotly serializes as base64 binary.
+"""
+
+import networkx as nx
+import numpy as np
+import plotly.graph_objects as go
+
+PROVIDER_GROUP_COLORS = {
+    'Hospitals': '#FF6B6B',
+    'Doctors': '#4ECDC4',
+    'Laboratories': '#45B7D1',
+    'Nursing Homes': '#96CEB4',
+    'Unknown': '#FFEAA7'
+}
+OTHER_GROUP_COLOR = '#DDA0DD'
+
+MAX_NODE_LABELS = 50
+MAX_EDGE_HOVERS = 200
+
+# Arrowhead position along the edge, and its size as a share of the layout extent
+ARROW_POSITION = 0.75
+ARROW_LENGTH = 0.025
+ARROW_WIDTH_RATIO = 0.8
+
+
+def gap_separated(*columns: np.ndarray) -> np.ndarray:
+    """Interleave per-edge point columns, with a NaN gap after each edge"""
+    points = np.column_stack(columns + (np.full(len(columns[0]), np.nan),))
+    return points.ravel().astype(np.float32)
+
+
+def truncate_labels(labels, length: int = 15) -> list:
+    return [label[:length] + '...' if len(label) > length else label for label in labels]
+
+
+def arrowheads(x0: np.ndarray, y0: np.ndarray, x1: np.ndarray, y1: np.ndarray, weights: np.ndarray,
+               extent: float) -> tuple:
+    """
+    Triangles pointing from (x0, y0) to (x1, y1), tip at ARROW_POSITION along
+    each edge and larger for heavier edges. Returns the tips and the
+    gap-separated polygon x and y. Zero-length edges get no arrowhead.
+    """
+    dx, dy = x1 - x0, y1 - y0
+    length = np.hypot(dx, dy)
+    drawn = length > 0
+    ux, uy = dx[drawn] / length[drawn], dy[drawn] / length[drawn]
+    tip_x = x0[drawn] + ARROW_POSITION * dx[drawn]
+    tip_y = y0[drawn] + ARROW_POSITION * dy[drawn]
+
+    # Same width scale as the former arrow annotations: 1 to 3, by transitions / 10
+    scale = np.clip(weights[drawn] / 10, 1, 3)
+    head = ARROW_LENGTH * extent * (1 + scale) / 2
+    half_width = head * ARROW_WIDTH_RATIO / 2
+    base_x, base_y = tip_x - head * ux, tip_y - head * uy
+    left_x, left_y = base_x - half_width * uy, base_y + half_width * ux
+    right_x, right_y = base_x + half_width * uy, base_y - half_width * ux
+
+    # fill='toself' closes each triangle back to its tip
+    polygon_x = gap_separated(tip_x, left_x, right_x)
+    polygon_y = gap_separated(tip_y, left_y, right_y)
+    return drawn, tip_x, tip_y, polygon_x, polygon_y
+
+
+def network_figure(G: nx.DiGraph, pos: dict, node_attrs: dict, max_node_labels: int = MAX_NODE_LABELS,
+                   max_edge_hovers: int = MAX_EDGE_HOVERS) -> go.Figure:
+    """
+    Figure of G (edges with a 'weight') at positions `pos`.
+
+    Args:
+        node_attrs: {provider: node statistics} (unique_patients, total_visits, provider_group)
+        max_node_labels: Nodes with a text label, by unique patients
+        max_edge_hovers: Edges with a hover label, by weight
+    """
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    xy = np.array([pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+    edges = list(G.edges(data='weight', default=1))
+    sources = np.array([index[u] for u, _, _ in edges], dtype=np.intp)
+    targets = np.array([index[v] for _, v, _ in edges], dtype=np.intp)
+    weights = np.array([w for _, _, w in edges], dtype=float)
+    x0, y0 = xy[sources, 0], xy[sources, 1]
+    x1, y1 = xy[targets, 0], xy[targets, 1]
+    extent = max(np.ptp(xy, axis=0).max() / 2, 1e-9) if len(xy) else 1.0
+
+    edge_trace = go.Scatter(
+        x=gap_separated(x0, x1), y=gap_separated(y0, y1),
+        line=dict(width=1, color='#888'),
+        hoverinfo='none',
+        mode='lines',
+        showlegend=False
+    )
+
+    drawn, tip_x, tip_y, arrow_x, arrow_y = arrowheads(x0, y0, x1, y1, weights, extent)
+    arrow_trace = go.Scatter(
+        x=arrow_x, y=arrow_y,
+        mode='lines',
+        fill='toself',
+        fillcolor='#666666',
+        line=dict(width=0, color='#666666'),
+        hoverinfo='none',
+        showlegend=False
+    )
+
+    # Hover labels of the heaviest edges only
+    drawn_edges = np.flatnonzero(drawn)
+    hovered = np.argsort(-weights[drawn], kind='stable')[:max_edge_hovers]
+    hover_trace = go.Scatter(
+        x=tip_x[hovered].astype(np.float32), y=tip_y[hovered].astype(np.float32),
+        mode='markers',
+        marker=dict(size=8, opacity=0),
+        hoverinfo='text',
+        hovertext=[
+            f"From: {edges[i][0]}<br>To: {edges[i][1]}<br>Transitions: {edges[i][2]:,.0f}"
+            for i in drawn_edges[hovered]
+        ],
+        showlegend=False
+    )
+
+    node_data = [node_attrs.get(node, {}) for node in nodes]
+    patients = np.array([data.get('unique_patients', 10) for data in node_data], dtype=float)
+    labelled = set(np.argsort(-patients, kind='stable')[:max_node_labels].tolist())
+    node_trace = go.Scatter(
+        x=xy[:, 0].astype(np.float32), y=xy[:, 1].astype(np.float32),
+        mode='markers+text',
+        hoverinfo='text',
+        text=[label if i in labelled else '' for i, label in enumerate(truncate_labels(map(str, nodes)))],
+        textposition="middle center",
+        textfont=dict(size=8),
+        hovertext=[
+            f"Provider: {node}<br>"
+            f"Unique Patients: {data.get('unique_patients', 'N/A')}<br>"
+            f"Total Visits: {data.get('total_visits', 'N/A')}<br>"
+            f"Provider Group: {data.get('provider_group', 'Unknown')}"
+            for node, data in zip(nodes, node_data)
+        ],
+        marker=dict(
+            size=np.clip(patients / 5, 8, 30),
+            color=[PROVIDER_GROUP_COLORS.get(data.get('provider_group', 'Unknown'), OTHER_GROUP_COLOR)
+                   for data in node_data],
+            line=dict(width=2, color='white'),
+            opacity=0.8
+        ),
+        showlegend=False
+    )
+
+    return go.Figure(
+        data=[edge_trace, arrow_trace, hover_trace, node_trace],
+        layout=go.Layout(
+            title='Healthcare Provider Network (Directed)',
+            showlegend=False,
+            hovermode='closest',
+            margin=dict(b=20, l=5, r=5, t=40),
+            annotations=[dict(
+                text="Arrows show direction of patient flow between providers",
+                showarrow=False,
+                xref="paper", yref="paper",
+                x=0.005, y=-0.002,
+                xanchor='left', yanchor='bottom',
+                font=dict(color="gray", size=10)
+            )],
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            plot_bgcolor='white'
+        )
+    )
@@ -0,0 +1,227 @@
+"""
+Dashboard aggregates over the full dataset, computed out of core.
+
+The claims are streamed chunk by chunk and only partial aggregates are kept:
+- CountAccumulator sums row counts per group across chunks, which is all the
+  provider counts, age/reason counts and provider -> client flows need.
+- Transitions pair consecutive visits of a patient, and those visits can
+  sit in any file. partition_by_patient() first spills the chunks to disk,
+  hash-partitioned on patient_id, so each partition holds complete patient
+  histories. Each partition is then loaded on its own and its FlowCube is
+  merged into the total: patients never span partitions, so distinct
+  patient counts simply add up. The pathway windows of the partitions
+  (see pathway_index) add up the same way.
+"""
+
+import os
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from claims_layout import concat_claims
+from flow_analytics import FlowCube
+from pathway_index import PathwayIndex, journey_windows
+
+# Size of a spill partition, whose visits must fit in memory at once
+PARTITION_TARGET_BYTES = 256 * 2**20  # of CSV text
+PARTITION_TARGET_ROWS = 2_000_000
+
+# Rows per streamed chunk: parsing one costs several times its size in temporary strings
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def read_csv_chunks(paths: Iterable[str], chunksize: int = DEFAULT_CHUNKSIZE, columns: Optional[List[str]] = None,
+                    categorical: Optional[List[str]] = None,
+                    prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream CSV files chunk by chunk, in file order.
+
+    Only `columns` are read (all when None), `categorical` columns are parsed
+    straight into categoricals and every chunk is passed through prepare().
+    """
+    for path in paths:
+        reader = pd.read_csv(
+            path,
+            chunksize=chunksize,
+            usecols=(lambda col: col in columns) if columns else None,
+            dtype={col: 'category' for col in categorical or []},
+            low_memory=False
+        )
+        for chunk in reader:
+            yield prepare(chunk) if prepare else chunk
+
+
+def partitions_for_files(paths: Iterable[str], target_bytes: int = PARTITION_TARGET_BYTES) -> int:
+    """Number of spill partitions so each holds about `target_bytes` of the CSV files"""
+    total = sum(os.path.getsize(path) for path in paths)
+    return max(1, -(-total // target_bytes))
+
+
+def partitions_for_rows(rows: int, target_rows: int = PARTITION_TARGET_ROWS) -> int:
+    """Number of spill partitions so each holds about `target_rows` rows"""
+    return max(1, -(-rows // target_rows))
+
+
+class CountAccumulator:
+    """
+    Row counts per group for several groupings, merged chunk by chunk.
+
+    Args:
+        groupings: {name: key columns}
+        count_column: Count the non-missing values of this column instead of rows
+        dropna: Keep groups whose keys are missing
+        merge_every: Partial counts kept per grouping before they are summed together
+    """
+
+    def __init__(self, groupings: Dict[str, List[str]], count_column: str = None, dropna: bool = True,
+                 merge_every: int = 16):
+        self.groupings = groupings
+        self.count_column = count_column
+        self.dropna = dropna
+        self.merge_every = merge_every
+        self._partials = {name: [] for name in groupings}
+
+    def add(self, chunk: pd.DataFrame):
+        for name, keys in self.groupings.items():
+            grouped = chunk.groupby(keys, observed=True, dropna=self.dropna)
+            counts = grouped[self.count_column].count() if self.count_column else grouped.size()
+            partials = self._partials[name]
+            partials.append(counts[counts > 0])
+            if len(partials) >= self.merge_every:
+                self._partials[name] = [self._merge(partials)]
+
+    def _merge(self, partials: List[pd.Series]) -> pd.Series:
+        counts = pd.concat(partials)
+        # Chunks have different categories: merge on the plain values
+        if isinstance(counts.index, pd.MultiIndex):
+            counts.index = pd.MultiIndex.from_arrays(
+                [counts.index.get_level_values(level).astype(object) for level in range(counts.index.nlevels)],
+                names=counts.index.names)
+        else:
+            counts.index = counts.index.astype(object)
+        return counts.groupby(level=list(range(counts.index.nlevels)), dropna=self.dropna).sum()
+
+    def counts(self, name: str) -> pd.DataFrame:
+        """Merged counts of one grouping: its key columns plus 'count'"""
+        keys = self.groupings[name]
+        partials = self._partials[name]
+        if not partials:
+            return pd.DataFrame({**{key: pd.Series(dtype=object) for key in keys}, 'count': pd.Series(dtype='int64')})
+        return self._merge(partials).rename('count').reset_index()
+
+
+# Hash given to rows without a patient id
+MISSING_PATIENT_HASH = np.iinfo(np.uint64).max
+
+
+def patient_hashes(patient_id: pd.Series, seed: int = 0) -> np.ndarray:
+    """
+    64-bit hash of each row's patient id, computed once per distinct id. The
+    hash depends only on the value (and `seed`), so a patient gets the same
+    one from every chunk and every file. Missing ids get MISSING_PATIENT_HASH.
+    """
+    codes, uniques = pd.factorize(patient_id)
+    hashes = pd.util.hash_array(np.asarray(uniques, dtype=object), hash_key=f"{seed:016d}")
+    # Missing values have code -1, which picks the trailing entry
+    return np.append(hashes, MISSING_PATIENT_HASH)[codes]
+
+
+def patient_partitions(patient_id: pd.Series, n_partitions: int) -> np.ndarray:
+    """
+    Partition of each row: patient_hashes() modulo n_partitions, so all the
+    visits of a patient land in the same partition. Missing ids share one.
+    """
+    return (patient_hashes(patient_id) % np.uint64(n_partitions)).astype(np.intp)
+
+
+def partition_by_patient(chunks: Iterable[pd.DataFrame], spill_dir: str, n_partitions: int) -> List[List[str]]:
+    """
+    Write the chunks to Parquet files in `spill_dir`, split by patient_partitions().
+    Returns the files of each partition, in chunk order.
+    """
+    files = [[] for _ in range(n_partitions)]
+    for number, chunk in enumerate(chunks):
+        for partition, part in chunk.groupby(patient_partitions(chunk['patient_id'], n_partitions), sort=False):
+            # Each piece would otherwise store the chunk's whole dictionaries (every patient id)
+            for col in part.columns:
+                if isinstance(part[col].dtype, pd.CategoricalDtype):
+                    part[col] = part[col].cat.remove_unused_categories()
+            path = os.path.join(spill_dir, f"part-{partition:04d}-{number:06d}.parquet")
+            part.to_parquet(path, engine='pyarrow', index=False)
+            files[partition].append(path)
+    return files
+
+
+class DatasetAggregates:
+    """
+    Everything the network dashboard shows about a dataset, without its rows:
+    the FlowCube, the PathwayIndex, row counts per grouping, the number of
+    records and the range of start dates.
+
+    from_frame() aggregates a frame already in memory; from_chunks() streams
+    any number of chunks out of core and gives the same result.
+    """
+
+    def __init__(self, cube: FlowCube, pathways: PathwayIndex, counts: CountAccumulator, records: int,
+                 date_range: tuple):
+        self.cube = cube
+        self.pathways = pathways
+        self.records = records
+        self.date_range = date_range
+        self._counts = counts
+
+    def counts(self, name: str) -> pd.DataFrame:
+        return self._counts.counts(name)
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, groupings: Dict[str, List[str]],
+                   provider_column: str = 'healthcare_provider_type') -> 'DatasetAggregates':
+        counts = CountAccumulator(groupings, dropna=False)
+        counts.add(data)
+        return cls(FlowCube(data, provider_column), PathwayIndex.from_frame(data, provider_column), counts,
+                   len(data), (data['start_date'].min(), data['start_date'].max()))
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], groupings: Dict[str, List[str]], n_partitions: int,
+                    spill_dir: str = None, provider_column: str = 'healthcare_provider_type',
+                    progress: Optional[Callable[[str], None]] = None) -> 'DatasetAggregates':
+        """
+        Aggregate chunks that do not fit in memory together.
+
+        Args:
+            chunks: Prepared claims chunks (e.g. from read_csv_chunks)
+            groupings: Row counts to keep, {name: key columns}
+            n_partitions: Spill partitions; each one is loaded in memory alone
+            spill_dir: Where the temporary partition files go (system temp dir by default)
+            progress: Called with a status message as the work advances
+        """
+        progress = progress or (lambda message: None)
+        counts = CountAccumulator(groupings, dropna=False)
+        totals = {'records': 0, 'first': pd.NaT, 'last': pd.NaT}
+
+        def counted(chunks):
+            for number, chunk in enumerate(chunks, start=1):
+                progress(f"Partitioning chunk {number} ({totals['records']:,} records so far)...")
+                counts.add(chunk)
+                totals['records'] += len(chunk)
+                totals['first'] = min(filter(pd.notna, [totals['first'], chunk['start_date'].min()]), default=pd.NaT)
+                totals['last'] = max(filter(pd.notna, [totals['last'], chunk['start_date'].max()]), default=pd.NaT)
+                yield chunk
+
+        with tempfile.TemporaryDirectory(prefix='claims_spill_', dir=spill_dir) as tmp:
+            files = partition_by_patient(counted(chunks), tmp, n_partitions)
+            cubes, windows = [], []
+            for partition, paths in enumerate(files):
+                if paths:
+                    progress(f"Aggregating partition {partition + 1}/{n_partitions}...")
+                    visits = concat_claims([pd.read_parquet(path, engine='pyarrow') for path in paths])
+                    cubes.append(FlowCube(visits, provider_column))
+                    windows.append(journey_windows(visits, provider_column))
+                    del visits
+
+        if not cubes:
+            raise ValueError("No claims to aggregate")
+        pathways = PathwayIndex.from_windows(concat_claims(windows))
+        return cls(FlowCube.merge(cubes), pathways, counts, totals['records'], (totals['first'], totals['last']))
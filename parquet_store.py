@@ -0,0 +1,143 @@
+"""
+Columnar Parquet storage for the cleaned (English) healthcare claims.
+
+The converter appends each cleaned chunk to a dataset partitioned by provider
+main group, with low-cardinality columns dictionary-encoded and dates stored
+as timestamps. The dashboards read it back with column pruning and push
+equality filters (age, gender, reason, provider group) down to the files, so
+only the needed columns and partitions are ever decoded.
+"""
+
+import glob
+import os
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+DEFAULT_PARQUET_DIR = "data/healthcare_parquet"
+
+# One directory per provider main group, so group filters skip whole partitions
+PARTITION_COLUMN = 'healthcare_provider_main_group'
+
+# Low-cardinality columns stored as Parquet dictionaries
+CATEGORICAL_COLUMNS = [
+    'age',
+    'gender',
+    'reason_for_treatment',
+    'healthcare_provider_type',
+    'healthcare_provider_main_group',
+    'client_type',
+    'client_main_group',
+    'tariff',
+    'source_file',
+]
+
+
+def parquet_dataset_exists(root: str = DEFAULT_PARQUET_DIR) -> bool:
+    """Whether a Parquet dataset has been written to `root`"""
+    return os.path.isdir(root) and any(name.startswith(f"{PARTITION_COLUMN}=") for name in os.listdir(root))
+
+
+def write_parquet_chunk(df: pd.DataFrame, root: str = DEFAULT_PARQUET_DIR):
+    """
+    Append a cleaned chunk to the partitioned dataset.
+
+    Every call writes new files (one per partition and source file touched),
+    so chunks from the streaming and parallel converters can be appended one
+    at a time. File names start with the source CSV name, which lets
+    delete_parquet_source() drop a re-ingested file without rewriting the rest.
+
+    Rows without a provider main group keep it missing, as in the database:
+    pyarrow writes them to the healthcare_provider_main_group=__HIVE_DEFAULT_PARTITION__
+    directory, which reads back as null.
+    """
+    df_out = df.copy()
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df_out.columns:
+            df_out[col] = df_out[col].astype('category')
+    for col in ['start_date', 'end_date']:
+        if col in df_out.columns:
+            df_out[col] = pd.to_datetime(df_out[col])
+
+    for source_file, part in df_out.groupby('source_file', observed=True, sort=False):
+        part.to_parquet(root, engine='pyarrow', partition_cols=[PARTITION_COLUMN], index=False,
+                        basename_template=f"{source_file}.{uuid.uuid4().hex}-{{i}}.parquet")
+
+
+def delete_parquet_source(root: str, source_file: str):
+    """Remove every file written for `source_file`, and partitions left empty"""
+    pattern = os.path.join(glob.escape(root), f"{PARTITION_COLUMN}=*", f"{glob.escape(source_file)}.*.parquet")
+    for path in glob.glob(pattern):
+        os.remove(path)
+
+    for partition in glob.glob(os.path.join(glob.escape(root), f"{PARTITION_COLUMN}=*")):
+        if not os.listdir(partition):
+            os.rmdir(partition)
+
+
+def build_filters(equals: Optional[Dict[str, Iterable]] = None) -> Optional[List[tuple]]:
+    """
+    Turn {column: allowed values} into pyarrow filters, skipping empty selections.
+    A single value or a list of values can be given per column.
+    """
+    filters = []
+    for col, values in (equals or {}).items():
+        if values is None:
+            continue
+        if isinstance(values, str):
+            values = [values]
+        values = list(values)
+        if values:
+            filters.append((col, 'in', values))
+    return filters or None
+
+
+def read_parquet_dataset(root: str = DEFAULT_PARQUET_DIR, columns: Optional[List[str]] = None,
+                         equals: Optional[Dict[str, Iterable]] = None) -> pd.DataFrame:
+    """
+    Read the dataset, decoding only `columns` and only rows matching `equals`.
+
+    Filters on the partition column prune whole directories; the others are
+    evaluated by pyarrow while scanning, before anything reaches pandas.
+    """
+    import pyarrow.dataset as ds
+
+    # pyarrow cannot turn a null partition into a dictionary value: read the
+    # partition column as strings and make it categorical here
+    df = pd.read_parquet(root, engine='pyarrow', columns=columns, filters=build_filters(equals),
+                         partitioning=ds.HivePartitioning.discover(infer_dictionary=False))
+    if PARTITION_COLUMN in df.columns:
+        df[PARTITION_COLUMN] = df[PARTITION_COLUMN].astype('category')
+    return df
+
+
+def iter_parquet_batches(root: str = DEFAULT_PARQUET_DIR, columns: Optional[List[str]] = None,
+                         batch_size: int = 500_000,
+                         equals: Optional[Dict[str, Iterable]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream the dataset as DataFrames of at most `batch_size` rows, decoding
+    only `columns` and pushing the `equals` filters down like read_parquet_dataset()
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    filters = build_filters(equals)
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size,
+                                    filter=pq.filters_to_expression(filters) if filters else None):
+        yield batch.to_pandas()
+
+
+def parquet_row_count(root: str = DEFAULT_PARQUET_DIR) -> int:
+    """Number of rows in the dataset, read from the file footers only"""
+    import pyarrow.dataset as ds
+
+    return ds.dataset(root, format='parquet', partitioning='hive').count_rows()
+
+
+def column_values(root: str = DEFAULT_PARQUET_DIR, column: str = PARTITION_COLUMN) -> List[str]:
+    """Sorted distinct values of one column (reads that column only)"""
+    values = read_parquet_dataset(root, columns=[column])[column]
+    return sorted(values.dropna().unique().tolist())
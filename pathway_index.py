@@ -0,0 +1,231 @@
+"""
+Index of the multi-step provider pathways of every patient journey.
+
+A pathway of length n is n consecutive visits of one patient (ordered as
+the transitions, see flow_analytics.pair_consecutive_visits) read as their
+provider types, e.g. Radiology -> General practice -> Hospital for n = 3.
+The index counts every pathway of 2 to MAX_STEPS visits once, when the
+data is loaded:
+1. journey_windows() turns each visit into a window: its provider and the
+   providers of the patient's next MAX_STEPS - 1 visits, with one shifted
+   comparison per step instead of a loop over patients. Windows are counted
+   per distinct value, so partitions (or SQL, see pathway_windows_sql) give
+   tables that simply add up.
+2. PathwayIndex packs the provider codes of each pathway into one int64
+   key (code + 1 per step, in base n_providers + 1: a collision-free hash)
+   and keeps, per length, the distinct keys with their counts, grouped by
+   first provider and sorted by count within each group.
+Queries never touch the visits again: the pathways starting at a provider
+are one contiguous slice found through an offsets array, so the top
+pathways of a provider cost O(k) and the count of one pathway a binary
+search, whatever the number of visits.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from flow_analytics import pair_consecutive_visits
+
+# Longest pathway indexed, in visits
+MAX_STEPS = 4
+
+STEP_COLUMNS = [f'step_{step + 1}' for step in range(MAX_STEPS)]
+
+
+def check_key_size(n_providers: int):
+    if (n_providers + 1) ** MAX_STEPS >= 2 ** 63:
+        raise ValueError(f"Too many providers ({n_providers:,}) to pack {MAX_STEPS} steps in an int64 key")
+
+
+def pack_codes(codes: np.ndarray, base: int) -> np.ndarray:
+    """One int64 key per row of provider codes (-1 = none): code + 1 per step, in `base`"""
+    keys = np.zeros(len(codes), dtype=np.int64)
+    for step in range(codes.shape[1]):
+        keys = keys * base + codes[:, step] + 1
+    return keys
+
+
+def unpack_keys(keys: np.ndarray, base: int, length: int) -> np.ndarray:
+    """The provider codes (one row per key, one column per step) of pack_codes() keys"""
+    codes = np.empty((len(keys), length), dtype=np.int64)
+    for step in range(length - 1, -1, -1):
+        keys, codes[:, step] = np.divmod(keys, base)
+    return codes - 1
+
+
+def journey_windows(data: pd.DataFrame, provider_column: str = 'healthcare_provider_type') -> pd.DataFrame:
+    """
+    Count of every window of up to MAX_STEPS consecutive visits of a patient.
+
+    Returns:
+        One row per distinct window: STEP_COLUMNS (the provider of the
+        visit, then of the following ones; missing past the end of the
+        journey or after a visit without provider) and 'count'
+    """
+    visits, _, _ = pair_consecutive_visits(data, [provider_column])
+    codes, providers = pd.factorize(visits[provider_column])
+    patients = pd.factorize(visits['patient_id'])[0]
+    check_key_size(len(providers))
+
+    # steps[i, s]: provider code of the s-th visit after visit i, -1 when there is none
+    steps = np.full((len(codes), MAX_STEPS), -1, dtype=np.int64)
+    steps[:, 0] = codes
+    for step in range(1, MAX_STEPS):
+        same_patient = patients[step:] == patients[:-step]
+        steps[:-step, step] = np.where(same_patient & (steps[:-step, step - 1] >= 0), codes[step:], -1)
+
+    # Counted on packed keys: far faster than np.unique over rows
+    base = len(providers) + 1
+    keys, counts = np.unique(pack_codes(steps[codes >= 0], base), return_counts=True)
+    windows = unpack_keys(keys, base, MAX_STEPS)
+    categories = np.asarray(providers, dtype=object)
+    frame = pd.DataFrame({
+        column: pd.Categorical.from_codes(windows[:, step], categories=categories)
+        for step, column in enumerate(STEP_COLUMNS)
+    })
+    frame['count'] = counts
+    return frame
+
+
+def pathway_windows_sql(provider_column: str, table: str, order: str) -> str:
+    """
+    The journey_windows() counts of a converted database, as one
+    window-function query over each patient's visits sorted by `order`
+    """
+    following = ',\n           '.join(
+        f"LEAD({provider_column}, {step}) OVER patient_visits AS {column}"
+        for step, column in enumerate(STEP_COLUMNS[1:], start=1)
+    )
+    columns = ', '.join(STEP_COLUMNS)
+    return f"""
+SELECT {columns}, COUNT(*) AS count
+FROM (
+    SELECT {provider_column} AS {STEP_COLUMNS[0]},
+           {following}
+    FROM {table}
+    WHERE +patient_id IS NOT NULL
+    WINDOW patient_visits AS (PARTITION BY +patient_id ORDER BY {order})
+)
+WHERE {STEP_COLUMNS[0]} IS NOT NULL
+GROUP BY {', '.join(str(step + 1) for step in range(MAX_STEPS))}
+"""
+
+
+class PathwayIndex:
+    """
+    Counts of the provider pathways of 2 to MAX_STEPS visits (see module docstring).
+
+    Args:
+        providers: Provider labels, in code order
+        tables: {length: (keys, counts, offsets)}, keys grouped by first
+            provider and by descending count within a group, offsets[c] the
+            position of the first pathway starting at provider c
+    """
+
+    def __init__(self, providers: pd.Index, tables: dict):
+        self.providers = providers
+        self.tables = tables
+        self.base = len(providers) + 1
+        # Keys in key order, for exact lookups
+        self._sorted = {}
+        for length, (keys, counts, _) in tables.items():
+            order = np.argsort(keys)
+            self._sorted[length] = (keys[order], counts[order])
+
+    @classmethod
+    def from_windows(cls, windows: pd.DataFrame) -> 'PathwayIndex':
+        """Index of journey_windows() counts; repeated windows (e.g. of several partitions) are summed"""
+        step_values = [windows[column].astype(object).to_numpy() for column in STEP_COLUMNS]
+        codes, providers = pd.factorize(np.concatenate(step_values))
+        codes = codes.reshape(MAX_STEPS, len(windows)).T.astype(np.int64)
+        check_key_size(len(providers))
+        base = len(providers) + 1
+
+        # A step after a missing one does not extend the pathway
+        codes = np.where(np.minimum.accumulate(codes, axis=1) >= 0, codes, -1)
+        weights = windows['count'].to_numpy(dtype=np.int64)
+        tables = {}
+        for length in range(2, MAX_STEPS + 1):
+            valid = codes[:, length - 1] >= 0
+            keys, inverse = np.unique(pack_codes(codes[valid, :length], base), return_inverse=True)
+            counts = np.bincount(inverse, weights=weights[valid], minlength=len(keys)).astype(np.int64)
+            first = keys // base ** (length - 1) - 1
+            order = np.lexsort((-counts, first))
+            offsets = np.searchsorted(first[order], np.arange(len(providers) + 1))
+            tables[length] = (keys[order], counts[order], offsets)
+        return cls(pd.Index(providers), tables)
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, provider_column: str = 'healthcare_provider_type') -> 'PathwayIndex':
+        return cls.from_windows(journey_windows(data, provider_column))
+
+    def _check_length(self, length: int):
+        if length not in self.tables:
+            raise ValueError(f"length must be between 2 and {MAX_STEPS}")
+
+    def decode(self, keys: np.ndarray, length: int) -> np.ndarray:
+        """Provider codes of packed keys of pathways of `length` visits"""
+        return unpack_keys(keys, self.base, length)
+
+    def encode(self, pathway: Iterable) -> Optional[int]:
+        """Packed key of a pathway of provider labels (None if a provider is unknown)"""
+        codes = self.providers.get_indexer(list(pathway))
+        if (codes < 0).any():
+            return None
+        return int(pack_codes(codes.reshape(1, -1).astype(np.int64), self.base)[0])
+
+    def count(self, pathway: Iterable) -> int:
+        """Times the pathway (a sequence of 2 to MAX_STEPS providers) occurs in the journeys"""
+        pathway = list(pathway)
+        self._check_length(len(pathway))
+        key = self.encode(pathway)
+        if key is None:
+            return 0
+        keys, counts = self._sorted[len(pathway)]
+        position = np.searchsorted(keys, key)
+        return int(counts[position]) if position < len(keys) and keys[position] == key else 0
+
+    def top_pathways(self, start, length: int = 3, k: int = 10, min_count: int = 1) -> pd.DataFrame:
+        """
+        The `k` most frequent pathways of `length` visits starting at provider
+        `start`, with at least `min_count` occurrences: STEP_COLUMNS[:length]
+        and 'count', most frequent first (empty if `start` is unknown)
+        """
+        self._check_length(length)
+        keys, counts, offsets = self.tables[length]
+        code = self.providers.get_indexer([start])[0]
+        begin, end = (offsets[code], offsets[code + 1]) if code >= 0 else (0, 0)
+        end = min(end, begin + k)
+        # Counts decrease within the slice: the ones >= min_count are its head
+        end = begin + np.searchsorted(-counts[begin:end], -min_count, side='right')
+
+        codes = self.decode(keys[begin:end], length)
+        frame = pd.DataFrame({column: self.providers[codes[:, step]]
+                              for step, column in enumerate(STEP_COLUMNS[:length])})
+        frame['count'] = counts[begin:end]
+        return frame
+
+    def pathway_links(self, start, length: int = 3, k: int = 20, min_count: int = 1) -> pd.DataFrame:
+        """
+        Links of a multi-level Sankey of the top_pathways() from `start`:
+        source_step, source, target, count (a provider appears once per step)
+        """
+        pathways = self.top_pathways(start, length, k, min_count)
+        links = [
+            pathways.groupby([STEP_COLUMNS[step], STEP_COLUMNS[step + 1]], sort=False)['count'].sum()
+            .rename_axis(['source', 'target']).reset_index().assign(source_step=step + 1)
+            for step in range(length - 1)
+        ]
+        columns = ['source_step', 'source', 'target', 'count']
+        return pd.concat(links, ignore_index=True)[columns] if len(pathways) else pd.DataFrame(columns=columns)
+
+    def n_pathways(self) -> dict:
+        """Distinct pathways per length"""
+        return {length: len(keys) for length, (keys, _, _) in self.tables.items()}
+
+    def memory_bytes(self) -> int:
+        arrays = [array for table in self.tables.values() for array in table]
+        arrays += [array for table in self._sorted.values() for array in table]
+        return sum(array.nbytes for array in arrays)
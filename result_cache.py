@@ -0,0 +1,120 @@
+"""
+Bounded in-memory cache for expensive dashboard results.
+
+Results (network tables, Plotly figures, provider statistics, ...) are keyed
+on a fingerprint of the loaded dataset plus the widget values they depend
+on, so a Streamlit rerun triggered by an unrelated widget reuses them. The
+least recently used entries are evicted once the estimated size of all
+entries exceeds a memory budget.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, column names and dtypes, not the index)"""
+    digest = hashlib.sha256()
+    digest.update(repr([(col, str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def files_fingerprint(paths) -> str:
+    """Hash of file names, sizes and modification times (changes when any file does)"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        stat = os.stat(path)
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory held by a cached value, in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'memory_bytes'):  # FlowCube, FlowGraph
+        return value.memory_bytes()
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a memory budget.
+
+    Args:
+        max_bytes: Evict least recently used entries above this estimated size
+        max_entries: Optional cap on the number of entries
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, max_entries: int = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing and storing it on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        size = estimate_size(value)
+
+        with self._lock:
+            # Values larger than the whole budget are returned but not kept
+            if size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (value, size)
+                self.current_bytes += size
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (self.current_bytes > self.max_bytes or
+                                 (self.max_entries and len(self._entries) > self.max_entries)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+            }
@@ -0,0 +1,200 @@
+"""
+Patient-level samples of the claims, drawn in one streaming pass.
+
+A sample of rows cuts patient journeys apart, and transitions need every
+visit of a patient. PatientSampler samples patients instead, keeping all of
+their visits or none. Each patient is ranked by patient_hashes(), a
+pseudo-random number that depends only on its id, and is in the sample when
+that hash is below a threshold:
+- with `fraction`, the threshold is fixed at that share of the hash range
+  (hash inclusion: about that share of the patients, whatever the input);
+- with `max_rows`, the threshold is lowered whenever the kept visits exceed
+  the budget, evicting the patients with the largest hashes. This is a
+  bottom-k reservoir over patients: a uniform random set of patients whose
+  visits fit in the budget;
+- with `strata` columns, every stratum has its own threshold and an equal
+  share of `max_rows`, so rare combinations (e.g. age x reason) are not
+  crowded out by common ones. A patient belongs to the stratum of its first
+  visit read.
+
+Thresholds only ever go down, so a patient that is in the final sample was
+kept from its first visit on: journeys are complete. Memory is bounded by
+`max_rows` plus one chunk, and the time is one pass over the input whatever
+the sample size.
+"""
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from claims_layout import concat_claims
+from out_of_core import MISSING_PATIENT_HASH, patient_hashes
+
+HASH_RANGE = 2**64
+
+# Kept chunks are concatenated once there are this many
+MAX_PIECES = 32
+
+
+class PatientSampler:
+    """
+    Streaming sampler of complete patient journeys.
+
+    Args:
+        max_rows: Row budget; the sample is the largest set of lowest-hash patients that fits
+        fraction: Share of patients to keep (a fixed threshold, also the starting one with max_rows)
+        strata: Columns whose values on a patient's first visit define its stratum
+        seed: Changes the hash, and so which patients are drawn
+        slack: Share of a stratum's budget freed by each eviction, so evictions stay rare
+    """
+
+    def __init__(self, max_rows: int = None, fraction: float = None, strata: Optional[List[str]] = None,
+                 seed: int = 0, slack: float = 0.1):
+        if max_rows is None and fraction is None:
+            raise ValueError("Give max_rows, fraction or both")
+        self.max_rows = max_rows
+        self.strata = list(strata or [])
+        self.seed = seed
+        self.slack = slack
+        self.rows_read = 0
+        self._initial = MISSING_PATIENT_HASH if fraction is None else np.uint64(
+            min(int(fraction * HASH_RANGE), HASH_RANGE - 1))
+        # Per stratum code: its key values and its current threshold
+        self._stratum_codes = {}
+        self._stratum_keys = []
+        self._thresholds = np.empty(0, dtype=np.uint64)
+        # Stratum of every patient still below some threshold (sorted by hash)
+        self._seen_hashes = np.empty(0, dtype=np.uint64)
+        self._seen_strata = np.empty(0, dtype=np.int32)
+        # Kept rows, with the hash and stratum of each
+        self._template = None
+        self._frames = []
+        self._hashes = []
+        self._row_strata = []
+
+    @property
+    def rows_kept(self) -> int:
+        return sum(len(frame) for frame in self._frames)
+
+    def add(self, chunk: pd.DataFrame):
+        """Sample one chunk of visits"""
+        if self._template is None:
+            self._template = chunk.iloc[:0]
+        self.rows_read += len(chunk)
+        hashes = patient_hashes(chunk['patient_id'], self.seed)
+        strata = self._patient_strata(chunk, hashes) if self.strata else np.zeros(len(chunk), dtype=np.int32)
+        if not len(self._thresholds):
+            self._thresholds = np.array([self._initial], dtype=np.uint64)
+
+        keep = hashes < self._thresholds[strata]
+        if keep.any():
+            kept = chunk[keep]
+            # Each piece would otherwise hold the chunk's whole dictionaries (every patient id)
+            for col in kept.columns:
+                if isinstance(kept[col].dtype, pd.CategoricalDtype):
+                    kept[col] = kept[col].cat.remove_unused_categories()
+            self._frames.append(kept)
+            self._hashes.append(hashes[keep])
+            self._row_strata.append(strata[keep])
+
+        if self.max_rows is not None:
+            self._evict()
+        if len(self._frames) > MAX_PIECES:
+            self._consolidate(None)
+
+    def _patient_strata(self, chunk: pd.DataFrame, hashes: np.ndarray) -> np.ndarray:
+        """Stratum code of each row's patient: known ones keep theirs, new ones take this visit's"""
+        codes, keys = pd.factorize(pd.MultiIndex.from_arrays([chunk[col] for col in self.strata]))
+        lookup = np.empty(len(keys), dtype=np.int32)
+        for position, key in enumerate(keys):
+            key = tuple(None if pd.isna(value) else value for value in key)
+            if key not in self._stratum_codes:
+                self._stratum_codes[key] = len(self._stratum_keys)
+                self._stratum_keys.append(key)
+                # A stratum seen late starts at the loosest threshold in use: patients above it
+                # were already dropped and forgotten, and must not come back with partial journeys
+                start = self._thresholds.max() if len(self._thresholds) else self._initial
+                self._thresholds = np.append(self._thresholds, start)
+            lookup[position] = self._stratum_codes[key]
+        row_strata = lookup[codes]
+
+        patients, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        patient_strata = row_strata[first]
+        seen = self._seen_hashes
+        if len(seen):
+            position = np.minimum(np.searchsorted(seen, patients), len(seen) - 1)
+            known = seen[position] == patients
+            patient_strata[known] = self._seen_strata[position[known]]
+        else:
+            known = np.zeros(len(patients), dtype=bool)
+
+        # Patients above every threshold (and missing ids) are out whatever their stratum
+        new = ~known & (patients < self._thresholds.max())
+        hashes_all = np.concatenate([seen, patients[new]])
+        order = np.argsort(hashes_all, kind='stable')
+        self._seen_hashes = hashes_all[order]
+        self._seen_strata = np.concatenate([self._seen_strata, patient_strata[new]])[order]
+        return patient_strata[inverse]
+
+    def _evict(self):
+        """Lower the thresholds of the strata over their share of the budget"""
+        n_strata = len(self._thresholds)
+        budget = self.max_rows // n_strata
+        if not self._frames or self.rows_kept <= budget:
+            return
+        hashes = np.concatenate(self._hashes)
+        strata = np.concatenate(self._row_strata)
+        rows = np.bincount(strata, minlength=n_strata)
+        over = np.flatnonzero(rows > budget)
+        if not len(over):
+            return
+        for stratum in over:
+            patients, visits = np.unique(hashes[strata == stratum], return_counts=True)
+            fits = np.searchsorted(np.cumsum(visits), int(budget * (1 - self.slack)), side='right')
+            # The first patient that does not fit, and every one above it, is out
+            self._thresholds[stratum] = patients[fits]
+        self._consolidate(hashes < self._thresholds[strata], hashes, strata)
+
+        if self.strata:
+            below = self._seen_hashes < self._thresholds.max()
+            self._seen_hashes = self._seen_hashes[below]
+            self._seen_strata = self._seen_strata[below]
+
+    def _consolidate(self, keep: Optional[np.ndarray], hashes: np.ndarray = None, strata: np.ndarray = None):
+        """Concatenate the kept pieces into one, dropping the rows where `keep` is False"""
+        data = concat_claims(self._frames)
+        hashes = np.concatenate(self._hashes) if hashes is None else hashes
+        strata = np.concatenate(self._row_strata) if strata is None else strata
+        if keep is not None:
+            data, hashes, strata = data[keep], hashes[keep], strata[keep]
+        self._frames, self._hashes, self._row_strata = [data], [hashes], [strata]
+
+    def sample(self) -> pd.DataFrame:
+        """The sampled visits, in the order they were read"""
+        if not self._frames:
+            return self._template.reset_index(drop=True) if self._template is not None else pd.DataFrame()
+        return concat_claims(self._frames)
+
+    def patients_kept(self) -> int:
+        return len(np.unique(np.concatenate(self._hashes))) if self._hashes else 0
+
+    def inclusion_rates(self) -> pd.DataFrame:
+        """Per stratum: its key values, the share of its patients kept and the rows kept"""
+        rows = np.bincount(np.concatenate(self._row_strata), minlength=len(self._thresholds)) \
+            if self._row_strata else np.zeros(len(self._thresholds), dtype=np.int64)
+        keys = self._stratum_keys or [()]
+        return pd.DataFrame({
+            **{col: [key[i] for key in keys] for i, col in enumerate(self.strata)},
+            'inclusion_rate': self._thresholds.astype(float) / HASH_RANGE,
+            'rows': rows,
+        })
+
+
+def sample_patients(chunks: Iterable[pd.DataFrame], max_rows: int = None, fraction: float = None,
+                    strata: Optional[List[str]] = None, seed: int = 0) -> pd.DataFrame:
+    """Stream `chunks` through a PatientSampler and return the sampled visits"""
+    sampler = PatientSampler(max_rows=max_rows, fraction=fraction, strata=strata, seed=seed)
+    for chunk in chunks:
+        sampler.add(chunk)
+    return sampler.sample()
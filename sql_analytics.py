@@ -0,0 +1,292 @@
+"""
+Dashboard aggregates computed by SQLite over the converter's database.
+
+The converter writes every cleaned visit to healthcare_records (a table, or
+a view over the normalized schema). Instead of loading those rows, the
+network dashboard can send its filters and aggregations to SQLite and pull
+only small result sets into pandas:
+- transitions are paired with LAG() over each patient's visits ordered by
+  start date and counted per (age, gender, reason, provider group, from, to),
+  the same table a FlowCube builds, so edges roll up from it as usual. The
+  converter materializes the pairs in patient_transitions at ingest time;
+  when that table is there they are only counted, not re-derived;
+- node statistics, visit summaries and provider statistics are queried per
+  filter, as COUNT(DISTINCT patient_id) needs the visits themselves;
+- the pathway index counts the windows of up to four consecutive visits
+  with LEAD() over the same ordering, once, on first use.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, List
+
+import pandas as pd
+
+from flow_analytics import FILTER_COLUMNS, MIXED_GROUP, FlowCube, group_mode
+from pathway_index import PathwayIndex, pathway_windows_sql
+
+# Database written by csv_to_sql_converter.py
+DEFAULT_DB_PATH = "healthcare_data_english.db"
+
+VISITS_TABLE = "healthcare_records"
+
+# Consecutive visit pairs written by the converter (by provider type)
+TRANSITIONS_TABLE = "patient_transitions"
+
+# Visits of a patient by start date, missing dates last as in pandas. Ties keep the
+# order of the source files (file name, then position in the file), which does not
+# change when the converter re-ingests a file, unlike the autoincrement id.
+VISIT_ORDER = "start_date IS NULL, start_date, source_file, source_row"
+
+# Databases converted before source_row existed only have the load order
+LEGACY_VISIT_ORDER = "start_date IS NULL, start_date, id"
+
+# One row per transition (consecutive visits of a patient): the patient, age, gender
+# and reason of the visit moved from, the provider group shared by both visits or
+# MIXED_GROUP (the parameter), and the providers.
+# A unary + on a column keeps SQLite from walking one of its indexes and looking up
+# every row, which the planner prefers without ANALYZE statistics but is far slower
+# than scanning the table when most rows are read anyway.
+PAIRS_SQL = f"""
+SELECT patient_id, age, gender, reason_for_treatment,
+       CASE WHEN from_group = to_group THEN from_group ELSE ? END AS healthcare_provider_main_group,
+       "from", "to"
+FROM (
+    SELECT ROW_NUMBER() OVER patient_visits > 1 AS has_previous,
+           patient_id,
+           LAG(age) OVER patient_visits AS age,
+           LAG(gender) OVER patient_visits AS gender,
+           LAG(reason_for_treatment) OVER patient_visits AS reason_for_treatment,
+           LAG(healthcare_provider_main_group) OVER patient_visits AS from_group,
+           healthcare_provider_main_group AS to_group,
+           LAG({{provider}}) OVER patient_visits AS "from",
+           {{provider}} AS "to"
+    FROM {VISITS_TABLE}
+    WHERE +patient_id IS NOT NULL
+    WINDOW patient_visits AS (PARTITION BY +patient_id ORDER BY {{order}})
+)
+WHERE has_previous
+"""
+
+# The same pairs read from the materialized ones
+STORED_PAIRS_SQL = f"""
+SELECT patient_id, age, gender, reason AS reason_for_treatment,
+       CASE WHEN from_group = to_group THEN from_group ELSE ? END AS healthcare_provider_main_group,
+       from_type AS "from", to_type AS "to"
+FROM {TRANSITIONS_TABLE}
+"""
+
+# FlowCube.transitions, from one of the pairs queries
+TRANSITIONS_SQL = """
+SELECT age, gender, reason_for_treatment, healthcare_provider_main_group, "from", "to", COUNT(*) AS count
+FROM ({pairs})
+GROUP BY 1, 2, 3, 4, 5, 6
+"""
+
+
+def database_exists(db_path: str = DEFAULT_DB_PATH) -> bool:
+    """True if `db_path` is a converted database (has the visits table or view)"""
+    if not os.path.isfile(db_path):
+        return False
+    with closing(connect(db_path)) as conn:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (VISITS_TABLE,)
+        ).fetchone() is not None
+
+
+def visit_order(db_path: str) -> str:
+    """ORDER BY of a patient's visits in this database (VISIT_ORDER, or the legacy one)"""
+    with closing(connect(db_path)) as conn:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({VISITS_TABLE})")}
+    return VISIT_ORDER if 'source_row' in columns else LEGACY_VISIT_ORDER
+
+
+def has_table(db_path: str, table: str) -> bool:
+    """True if the database has `table`"""
+    with closing(connect(db_path)) as conn:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+
+
+def transition_links(db_path: str = DEFAULT_DB_PATH) -> tuple:
+    """
+    (links, sources) of the provider type transition network, counted over
+    patient_transitions: links has from, to and 'counts', sources the
+    transitions leaving each provider type
+    """
+    with closing(connect(db_path)) as conn:
+        links = pd.read_sql_query(
+            f'SELECT from_type AS "from", to_type AS "to", COUNT(*) AS counts '
+            f'FROM {TRANSITIONS_TABLE} GROUP BY 1, 2', conn
+        )
+    sources = links.groupby('from')['counts'].sum()
+    return links, sources
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Read-only connection (one per query, so Streamlit threads never share one)"""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+
+def where_clause(filters: dict = None, extra: List[str] = None) -> tuple:
+    """
+    (WHERE clause, parameters) for the dashboard filters ({column: value},
+    'All' or None = no filter) plus `extra` conditions
+    """
+    conditions, params = list(extra or []), []
+    for column in FILTER_COLUMNS:
+        value = (filters or {}).get(column)
+        if value is not None and value != 'All':
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+class SqlFlowCube(FlowCube):
+    """
+    FlowCube answered by SQLite: the transitions table is counted from
+    patient_transitions (or derived by one window-function query when the
+    database has none, or for another provider column), everything that
+    needs distinct patients is a query per call. There is no nodes table.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, provider_column: str = 'healthcare_provider_type'):
+        self.db_path = db_path
+        self.provider_column = provider_column
+        self.nodes = None
+        self.transition_patients = None
+        self._rollups = {}
+        keys = FILTER_COLUMNS + ['from', 'to']
+        if provider_column == 'healthcare_provider_type' and has_table(db_path, TRANSITIONS_TABLE):
+            self.pairs_sql = STORED_PAIRS_SQL
+        else:
+            self.pairs_sql = PAIRS_SQL.format(provider=provider_column, order=visit_order(db_path))
+        transitions = self.query(TRANSITIONS_SQL.format(pairs=self.pairs_sql), [MIXED_GROUP])
+        self.transitions = transitions.astype({key: 'category' for key in keys})
+
+    def query(self, sql: str, params: list = ()) -> pd.DataFrame:
+        with closing(connect(self.db_path)) as conn:
+            return pd.read_sql_query(sql, conn, params=list(params))
+
+    def transition_patient_count(self, filters: dict = None) -> int:
+        """Number of distinct patients of the filtered transitions (the ones transition_count() counts)"""
+        where, params = where_clause(filters)
+        return int(self.query(
+            f"SELECT COUNT(DISTINCT patient_id) FROM ({self.pairs_sql}) {where}", [MIXED_GROUP] + params
+        ).iloc[0, 0])
+
+    def node_stats(self, providers, filters: dict = None) -> pd.DataFrame:
+        """Same columns as node_statistics(), for the filtered visits"""
+        where, params = where_clause(filters, [f"+{self.provider_column} IS NOT NULL"])
+        stats = self.query(
+            f"SELECT {self.provider_column} AS provider, COUNT(DISTINCT patient_id) AS unique_patients, "
+            f"COUNT(*) AS total_visits FROM {VISITS_TABLE} {where} GROUP BY 1", params
+        )
+        stats = stats[stats['provider'].isin(list(providers))].set_index('provider')
+
+        # Visits per provider and mode column values, for the weighted modes
+        mode_columns = {'age': 'avg_age', 'reason_for_treatment': 'common_reason',
+                        'healthcare_provider_main_group': 'provider_group'}
+        counts = self.query(
+            f"SELECT {self.provider_column} AS provider, {', '.join(mode_columns)}, COUNT(*) AS visits "
+            f"FROM {VISITS_TABLE} {where} GROUP BY {', '.join(['1'] + list(mode_columns))}", params
+        )
+        for column, name in mode_columns.items():
+            stats[name] = group_mode(counts, ['provider'], column, stats.index, weights='visits')
+        stats = stats.sort_index().reset_index()
+        stats['provider'] = stats['provider'].astype(object)
+        return stats
+
+    def visit_summary(self, filters: dict = None) -> dict:
+        """Records, unique patients and visits per patient of the filtered visits"""
+        where, params = where_clause(filters)
+        row = self.query(
+            f"""
+            SELECT SUM(visits) AS records,
+                   COUNT(patient_id) AS patients,
+                   COALESCE(SUM(patient_id IS NOT NULL AND visits > 1), 0) AS multi_visit_patients,
+                   COALESCE(AVG(CASE WHEN patient_id IS NOT NULL THEN visits END), 0.0) AS avg_visits_per_patient
+            FROM (SELECT patient_id, COUNT(*) AS visits FROM {VISITS_TABLE} {where} GROUP BY +patient_id)
+            """, params
+        ).iloc[0]
+        if pd.isna(row['records']):
+            return {'records': 0, 'patients': 0, 'multi_visit_patients': 0, 'avg_visits_per_patient': 0.0}
+        return {
+            'records': int(row['records']),
+            'patients': int(row['patients']),
+            'multi_visit_patients': int(row['multi_visit_patients']),
+            'avg_visits_per_patient': float(row['avg_visits_per_patient']),
+        }
+
+    def values(self, column: str) -> list:
+        """Sorted distinct values of a visit column"""
+        return self.query(
+            f"SELECT DISTINCT {column} AS value FROM {VISITS_TABLE} WHERE {column} IS NOT NULL ORDER BY 1"
+        )['value'].tolist()
+
+    def visits_by(self, column: str) -> pd.Series:
+        """Visits per value of a visit column, most frequent first"""
+        visits = self.query(
+            f"SELECT {column}, COUNT(*) AS visits FROM {VISITS_TABLE} WHERE {column} IS NOT NULL GROUP BY 1"
+        ).set_index(column)['visits']
+        return visits.sort_values(ascending=False, kind='stable')
+
+    def provider_patients(self, provider) -> tuple:
+        """(unique patients, their visits) of one provider; visits without a patient_id are left out"""
+        patients, visits = self.query(
+            f"SELECT COUNT(DISTINCT patient_id), COUNT(patient_id) FROM {VISITS_TABLE} "
+            f"WHERE {self.provider_column} = ?", [provider]
+        ).iloc[0]
+        return int(patients), int(visits)
+
+    def patients_by_provider(self) -> pd.DataFrame:
+        """provider_patients() of every provider in one GROUP BY: unique_patients and patient_visits, by provider"""
+        return self.query(
+            f"SELECT {self.provider_column}, COUNT(DISTINCT patient_id) AS unique_patients, "
+            f"COUNT(patient_id) AS patient_visits FROM {VISITS_TABLE} "
+            f"WHERE {self.provider_column} IS NOT NULL GROUP BY 1"
+        ).set_index(self.provider_column)
+
+    def memory_bytes(self) -> int:
+        return int(self.transitions.memory_usage(deep=True).sum())
+
+
+class SqlAggregates:
+    """
+    The DatasetAggregates of a converted database: a SqlFlowCube, row counts
+    per grouping (one GROUP BY each, on first use), the PathwayIndex (one
+    window-function query, on first use), the number of records and the
+    range of start dates.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, groupings: Dict[str, List[str]] = None,
+                 provider_column: str = 'healthcare_provider_type'):
+        self.db_path = db_path
+        self.groupings = groupings or {}
+        self.cube = SqlFlowCube(db_path, provider_column)
+        records, first, last = self.cube.query(
+            f"SELECT COUNT(*), MIN(start_date), MAX(start_date) FROM {VISITS_TABLE}"
+        ).iloc[0]
+        self.records = int(records)
+        self.date_range = (pd.to_datetime(first), pd.to_datetime(last))
+        self._counts = {}
+        self._pathways = None
+
+    def counts(self, name: str) -> pd.DataFrame:
+        """Row counts of one grouping: its key columns plus 'count' (missing keys kept)"""
+        if name not in self._counts:
+            keys = ', '.join(self.groupings[name])
+            self._counts[name] = self.cube.query(
+                f"SELECT {keys}, COUNT(*) AS count FROM {VISITS_TABLE} GROUP BY {keys}"
+            )
+        return self._counts[name]
+
+    @property
+    def pathways(self) -> PathwayIndex:
+        if self._pathways is None:
+            sql = pathway_windows_sql(self.cube.provider_column, VISITS_TABLE, visit_order(self.db_path))
+            windows = self.cube.query(sql)
+            self._pathways = PathwayIndex.from_windows(windows)
+        return self._pathways
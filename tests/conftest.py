@@ -0,0 +1,102 @@
+"""Synthetic claims shaped like the challenge CSVs, small enough for unit tests"""
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from csv_to_sql_converter import HealthcareDataConverter
+from translation import GERMAN_TO_ENGLISH
+
+AGES = ['0-10 Jahre', '20-30 Jahre', '40-50 Jahre', '60-70 Jahre', '90+ Jahre']
+GENDERS = ['M', 'F']
+REASONS = ['Krankheit', 'Unfall', 'Mutterschaft']
+PROVIDER_TYPES = {
+    'Radiologie': 'Ärzte und Ärztinnen',
+    'Allgemeine Innere Medizin': 'Ärzte und Ärztinnen',
+    'Zentrumsversorgung, Niveau 1': 'Spitäler',
+    'Privatlaboratorien': 'Laboratorien',
+    'Apotheken, Spezialfälle': 'Apotheken',
+}
+TARIFFS = ['312.0', '99', '1', '5.0', 'abc', None]
+
+
+def make_raw_claims(rows: int, patients: int, seed: int = 0, days: int = 10) -> pd.DataFrame:
+    """
+    Raw (German) claims. Few days and patients, so most patients have
+    several visits on the same day and visits repeat exactly now and then.
+    """
+    rng = np.random.default_rng(seed)
+    types = np.array(list(PROVIDER_TYPES), dtype=object)
+    provider_type = types[rng.integers(0, len(types), rows)]
+    start = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, days, rows), 'D')
+    claims = pd.DataFrame({
+        'patient_id': np.where(rng.random(rows) < 0.03, None,
+                               np.array([f'{p:012d}' for p in rng.integers(0, patients, rows)], dtype=object)),
+        'age': rng.choice(AGES, rows),
+        'gender': rng.choice(GENDERS, rows),
+        'reason_for_treatment': np.where(rng.random(rows) < 0.05, None, rng.choice(REASONS, rows)),
+        'healthcare_provider_id': [f'P{p:04d}' for p in rng.integers(0, 40, rows)],
+        'healthcare_provider_type': provider_type,
+        'healthcare_provider_main_group': [PROVIDER_TYPES[t] for t in provider_type],
+        'client_id': [f'C{c:04d}' for c in rng.integers(0, 40, rows)],
+        'client_type': np.where(rng.random(rows) < 0.1, None, types[rng.integers(0, len(types), rows)]),
+        'client_main_group': rng.choice(sorted(set(PROVIDER_TYPES.values())), rows),
+        'start_date': start.strftime('%Y-%m-%d'),
+        'end_date': (start + pd.to_timedelta(rng.integers(0, 3, rows), 'D')).strftime('%Y-%m-%d'),
+        'tariff': rng.choice(np.array(TARIFFS, dtype=object), rows),
+        'tariff_position': [f'{t:05d}' for t in rng.integers(0, 20, rows)],
+        'quantity': rng.integers(1, 3, rows).astype(float),
+    })
+    # A few exact duplicate rows, which the converter drops
+    return pd.concat([claims, claims.iloc[:rows // 50]], ignore_index=True)
+
+
+def legacy_words_translation(text):
+    """The converter's translate_text() before Translator: exact match, else word by word"""
+    if pd.isna(text) or text is None:
+        return text
+    text_str = str(text).strip()
+    if text_str in GERMAN_TO_ENGLISH:
+        return GERMAN_TO_ENGLISH[text_str]
+    translated_parts = [GERMAN_TO_ENGLISH.get(part, part) for part in text_str.split()]
+    return ' '.join(translated_parts) if translated_parts else text_str
+
+
+def write_claims_files(directory: Path, n_files: int = 3, rows: int = 400, patients: int = 60,
+                       seed: int = 0) -> list:
+    """data_css_challenge_<n>.csv files whose patients span several files"""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for number in range(n_files):
+        path = directory / f"data_css_challenge_{number}.csv"
+        make_raw_claims(rows, patients, seed + number).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def claims_dir(tmp_path) -> Path:
+    directory = tmp_path / "data"
+    write_claims_files(directory)
+    return directory
+
+
+@pytest.fixture
+def claims_db(tmp_path, claims_dir):
+    db_path = tmp_path / 'claims.db'
+    HealthcareDataConverter(str(db_path)).convert_csv_to_sql(data_dir=str(claims_dir))
+    return db_path
+
+
+@pytest.fixture
+def visits(claims_db):
+    """The converted visits in the order the converter pairs them"""
+    with closing(sqlite3.connect(claims_db)) as conn:
+        visits = pd.read_sql_query(
+            "SELECT * FROM healthcare_records ORDER BY source_file, source_row", conn, parse_dates=['start_date']
+        )
+    return visits
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import legacy_clean_tariff_codes
+from conftest import legacy_words_translation, make_raw_claims
+from csv_to_sql_converter import HealthcareDataConverter
+
+
+def legacy_clean_data(converter, df):
+    """clean_data() as it was before vectorization: row-wise steps and df.drop_duplicates()"""
+    df = df.copy()
+    df['tariff'] = legacy_clean_tariff_codes(df['tariff'])
+    for column in converter.columns_to_translate:
+        df[column] = df[column].map(legacy_words_translation, na_action='ignore')
+    df['start_date'] = pd.to_datetime(df['start_date'], errors='coerce')
+    df['end_date'] = pd.to_datetime(df['end_date'], errors='coerce')
+    mask = df['end_date'].isna()
+    df.loc[mask, 'end_date'] = df.loc[mask, 'start_date']
+    for col in ['client_id', 'client_type', 'client_main_group', 'tariff_position']:
+        df[col] = df[col].fillna('Unknown')
+    df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce')
+    return df.drop_duplicates()
+
+
+@pytest.fixture
+def raw_claims(tmp_path):
+    """Raw claims read as the converter reads them, with missing and malformed dates"""
+    claims = make_raw_claims(2000, 100)
+    rng = np.random.default_rng(1)
+    claims.loc[rng.random(len(claims)) < 0.05, 'end_date'] = None
+    claims.loc[rng.random(len(claims)) < 0.01, 'start_date'] = 'not a date'
+    path = tmp_path / 'claims.csv'
+    claims.to_csv(path, index=False)
+    return pd.read_csv(path, dtype=HealthcareDataConverter(str(tmp_path / 'unused.db')).pandas_dtypes)
+
+
+def as_objects(df):
+    """Non-date columns as objects with None for every missing value (<NA> or nan, both NULL in SQL)"""
+    columns = [column for column in df.columns if not pd.api.types.is_datetime64_dtype(df[column])]
+    df = df.copy()
+    df[columns] = df[columns].astype(object).where(df[columns].notna(), None)
+    return df
+
+
+def test_clean_data_matches_the_row_wise_pipeline(tmp_path, raw_claims):
+    converter = HealthcareDataConverter(str(tmp_path / 'claims.db'))
+    cleaned = converter.clean_data(raw_claims, verbose=False)
+    expected = legacy_clean_data(converter, raw_claims)
+    assert len(cleaned) < len(raw_claims)
+    pd.testing.assert_frame_equal(as_objects(cleaned), as_objects(expected), check_dtype=False)
+
+
+def test_drop_duplicate_rows_matches_drop_duplicates(tmp_path, raw_claims):
+    converter = HealthcareDataConverter(str(tmp_path / 'claims.db'))
+    pd.testing.assert_frame_equal(converter.drop_duplicate_rows(raw_claims), raw_claims.drop_duplicates())
+
+
+def test_streaming_with_workers_is_rejected(tmp_path, claims_dir):
+    db_path = tmp_path / 'claims.db'
+    with pytest.raises(ValueError, match='streaming'):
+        HealthcareDataConverter(str(db_path)).convert_csv_to_sql(data_dir=str(claims_dir), streaming=True, workers=2)
+    assert not db_path.exists()
@@ -0,0 +1,85 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from flow_analytics import (FILTER_COLUMNS, MIXED_GROUP, FlowCube, aggregate_edges, build_transitions,
+                            node_statistics, pair_consecutive_visits)
+from sql_analytics import SqlFlowCube
+
+
+def brute_force_pairs(visits):
+    """One row per transition with the cube's filter columns and the patient"""
+    sorted_visits, from_rows, to_rows = pair_consecutive_visits(visits, FILTER_COLUMNS)
+    pairs = sorted_visits.iloc[from_rows].reset_index(drop=True)
+    to_group = sorted_visits['healthcare_provider_main_group'].iloc[to_rows].reset_index(drop=True)
+    pairs['healthcare_provider_main_group'] = pairs['healthcare_provider_main_group'].where(
+        pairs['healthcare_provider_main_group'] == to_group, MIXED_GROUP)
+    return pairs
+
+
+def filter_grid(visits):
+    """'All' and the most frequent value of each filter column, in every combination"""
+    choices = [['All', visits[column].mode().iloc[0]] for column in FILTER_COLUMNS[:3]]
+    choices.append(['All', MIXED_GROUP, visits['healthcare_provider_main_group'].mode().iloc[0]])
+    for values in itertools.product(*choices):
+        yield dict(zip(FILTER_COLUMNS, values))
+
+
+def filter_mask(frame, filters, columns=None):
+    """Rows of `frame` matching the active filters, with `columns` renaming the filter columns"""
+    mask = pd.Series(True, index=frame.index)
+    for column, value in filters.items():
+        if value != 'All':
+            mask &= frame[(columns or {}).get(column, column)] == value
+    return mask
+
+
+def sorted_frame(frame, keys):
+    return frame.sort_values(keys).reset_index(drop=True).astype({key: object for key in keys})
+
+
+def make_cube(source, claims_db, visits):
+    return FlowCube(visits) if source == 'memory' else SqlFlowCube(str(claims_db))
+
+
+@pytest.mark.parametrize('source', ['memory', 'sqlite'])
+def test_edges_match_aggregate_edges(claims_db, visits, source):
+    cube = make_cube(source, claims_db, visits)
+    transitions = build_transitions(visits)
+    # build_transitions() pairs the visits in the same order as brute_force_pairs()
+    transitions['healthcare_provider_main_group'] = brute_force_pairs(visits)['healthcare_provider_main_group']
+    for filters in filter_grid(visits):
+        mask = filter_mask(transitions, filters, {'reason_for_treatment': 'reason'})
+        expected = aggregate_edges(transitions[mask])
+        pd.testing.assert_frame_equal(sorted_frame(cube.edges(filters), ['from', 'to']),
+                                      sorted_frame(expected, ['from', 'to']), check_dtype=False, obj=str(filters))
+
+
+@pytest.mark.parametrize('source', ['memory', 'sqlite'])
+def test_node_stats_and_summary_match_the_filtered_visits(claims_db, visits, source):
+    cube = make_cube(source, claims_db, visits)
+    providers = visits['healthcare_provider_type'].unique()
+    for filters in filter_grid(visits):
+        filtered = visits[filter_mask(visits, filters)]
+        expected = node_statistics(filtered, providers)
+        pd.testing.assert_frame_equal(sorted_frame(cube.node_stats(providers, filters), ['provider']),
+                                      sorted_frame(expected, ['provider']), check_dtype=False, obj=str(filters))
+
+        visits_per_patient = filtered['patient_id'].value_counts()
+        summary = cube.visit_summary(filters)
+        assert summary['records'] == len(filtered)
+        assert summary['patients'] == len(visits_per_patient)
+        assert summary['multi_visit_patients'] == (visits_per_patient > 1).sum()
+        assert summary['avg_visits_per_patient'] == pytest.approx(
+            visits_per_patient.mean() if len(visits_per_patient) else 0.0)
+
+
+@pytest.mark.parametrize('source', ['memory', 'sqlite'])
+def test_transition_patients_match_the_filtered_transitions(claims_db, visits, source):
+    cube = make_cube(source, claims_db, visits)
+    pairs = brute_force_pairs(visits)
+    for filters in filter_grid(visits):
+        mask = filter_mask(pairs, filters)
+        assert cube.transition_count(filters) == mask.sum(), filters
+        assert cube.transition_patient_count(filters) == pairs.loc[mask, 'patient_id'].nunique(), filters
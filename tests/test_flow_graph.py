@@ -0,0 +1,54 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from flow_graph import FlowGraph
+
+
+@pytest.fixture
+def edges():
+    """Heavy-tailed provider flows with repeated pairs, self-loops and nodes without outgoing flows"""
+    rng = np.random.default_rng(0)
+    sources = rng.integers(0, 150, 3000)
+    targets = rng.zipf(1.5, 3000) % 200
+    return pd.DataFrame({'from': [f'P{node}' for node in sources], 'to': [f'P{node}' for node in targets],
+                         'weight': rng.zipf(2.0, 3000).astype(float)})
+
+
+@pytest.fixture
+def digraph(edges):
+    summed = edges.groupby(['from', 'to'], as_index=False)['weight'].sum()
+    return nx.from_pandas_edgelist(summed, source='from', target='to', edge_attr='weight', create_using=nx.DiGraph())
+
+
+def test_pagerank_matches_networkx(edges, digraph):
+    graph = FlowGraph.from_frame(edges)
+    assert (graph.out_degree() == 0).any()
+    expected = pd.Series(nx.pagerank(digraph, weight='weight', tol=1e-12, max_iter=1000))
+    rank = graph.pagerank()
+    assert rank.sum() == pytest.approx(1.0)
+    pd.testing.assert_series_equal(rank.sort_index(), expected.sort_index(), check_exact=False, rtol=1e-6)
+
+    expected = pd.Series(nx.pagerank(digraph, alpha=0.5, weight='weight', tol=1e-12, max_iter=1000))
+    pd.testing.assert_series_equal(graph.pagerank(alpha=0.5).sort_index(), expected.sort_index(),
+                                   check_exact=False, rtol=1e-6)
+
+
+def test_degrees_neighbours_and_reach_match_networkx(edges, digraph):
+    graph = FlowGraph.from_frame(edges)
+    for values, expected in [(graph.out_degree(), digraph.out_degree(weight='weight')),
+                             (graph.in_degree(), digraph.in_degree(weight='weight')),
+                             (graph.out_degree(weighted=False), digraph.out_degree())]:
+        pd.testing.assert_series_equal(values.sort_index(), pd.Series(dict(expected), dtype=float).sort_index(),
+                                       check_dtype=False)
+
+    node = graph.out_degree().idxmax()
+    top = graph.top_neighbours(node, 5)
+    # Ties at the cut may go either way: compare the weights, then each neighbour's own weight
+    assert top.tolist() == sorted((attrs['weight'] for attrs in digraph[node].values()), reverse=True)[:5]
+    assert all(digraph[node][target]['weight'] == weight for target, weight in top.items())
+
+    for direction, G in [('out', digraph), ('in', digraph.reverse())]:
+        expected = nx.single_source_shortest_path_length(G, node, cutoff=2)
+        assert graph.reachable([node], 2, direction).to_dict() == expected
@@ -0,0 +1,109 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from graph_summary import disparity_scores, summarize_network, top_k_edges, undirected_graph
+
+
+def test_undirected_graph_adds_up_both_directions_in_first_seen_order():
+    links = pd.DataFrame({'source': ['a', 'b', 'c', 'a', 'd'], 'target': ['b', 'a', 'a', 'c', 'd'],
+                          'counts': [1, 2, 3, 4, 5]})
+    expected = nx.Graph()
+    for u, v, w in zip(links['source'], links['target'], links['counts']):
+        if expected.has_edge(u, v):
+            expected[u][v]['weight'] += w
+        else:
+            expected.add_edge(u, v, weight=w)
+
+    graph = undirected_graph(links, 'source', 'target', 'counts')
+    assert list(graph.nodes) == list(expected.nodes)
+    assert list(graph.edges(data='weight')) == list(expected.edges(data='weight'))
+    assert graph['a']['b']['weight'] == 3 and graph['d']['d']['weight'] == 5
+
+
+def random_links(n_nodes, n_edges, seed=0):
+    """Heavy-tailed flows between provider IDs, without self-loops, and the visits of each ID"""
+    rng = np.random.default_rng(seed)
+    sources = rng.zipf(1.5, n_edges) % n_nodes
+    targets = (sources + rng.integers(-30, 30, n_edges)) % n_nodes
+    links = pd.DataFrame({'source': [f'P{node}' for node in sources], 'target': [f'P{node}' for node in targets],
+                          'counts': rng.zipf(2.0, n_edges)})
+    links = links[links['source'] != links['target']].groupby(['source', 'target'], as_index=False)['counts'].sum()
+    nodes = pd.unique(links[['source', 'target']].to_numpy().ravel())
+    return links, pd.Series(rng.integers(1, 100, len(nodes)), index=nodes)
+
+
+def is_super_node(label):
+    return label.startswith(('Community ', 'Other communities '))
+
+
+@pytest.mark.parametrize('max_nodes, max_edges, fill', [(150, None, True), (60, 100, True), (150, 300, False)])
+def test_summary_stays_within_budget(max_nodes, max_edges, fill):
+    links, node_counts = random_links(3000, 30_000)
+    assert len(node_counts) > 10 * max_nodes
+
+    summary, counts = summarize_network(links, node_counts, 'source', 'target', max_nodes=max_nodes,
+                                        max_edges=max_edges, fill=fill)
+    super_nodes = [label for label in counts.index if is_super_node(label)]
+    assert super_nodes
+    nodes = set(summary['source']) | set(summary['target']) | set(super_nodes)
+    assert len(nodes) <= max_nodes
+    assert 0 < len(summary) <= (3 * max_nodes if max_edges is None else max_edges)
+    assert (summary['counts'] > 0).all()
+
+
+def test_super_nodes_replace_their_members():
+    links, node_counts = random_links(3000, 30_000)
+    summary, counts = summarize_network(links, node_counts, 'source', 'target', max_nodes=100)
+
+    super_nodes = counts.index.map(is_super_node).to_numpy(dtype=bool)
+    kept = counts.index[~super_nodes]
+    pd.testing.assert_series_equal(counts[kept], node_counts[kept], check_names=False)
+    # The super-nodes add up the counts (and number) of every node they replace
+    replaced = node_counts.drop(kept)
+    assert counts[super_nodes].sum() == replaced.sum()
+    sizes = counts.index[super_nodes].str.extract(r'\(([\d,]+) nodes\)')[0].str.replace(',', '').astype(int)
+    assert sizes.sum() == len(replaced)
+    assert (summary['source'] != summary['target']).all()
+    assert not summary.duplicated(['source', 'target']).any()
+
+
+def test_disparity_scores_by_hand():
+    links = pd.DataFrame({'source': ['a', 'a', 'a', 'b'], 'target': ['b', 'c', 'd', 'c'], 'counts': [6, 3, 1, 1]})
+    # a sends 10 over 3 edges: (1 - w / 10) ** 2 = 0.16, 0.49, 0.81; c receives 4 over 2 edges:
+    # 1 - w / 4 = 0.25, 0.75; b's only outgoing and b's and d's only incoming edges score 1
+    expected = [0.16, 0.25, 0.81, 0.75]
+    np.testing.assert_allclose(disparity_scores(links, 'source', 'target', 'counts'), expected)
+
+    summary, _ = summarize_network(links, pd.Series(1, index=list('abcd')), 'source', 'target',
+                                   top_k=1, alpha=0.3, fill=False)
+    assert list(zip(summary['source'], summary['target'])) == [('a', 'b'), ('a', 'c')]
+
+
+def test_without_fill_only_the_top_k_backbone_is_kept():
+    links, node_counts = random_links(100, 3000)
+    top_k, alpha = 2, 0.1
+    scores = disparity_scores(links, 'source', 'target', 'counts')
+    candidates = np.zeros(len(links), dtype=bool)
+    candidates[top_k_edges(links, 'source', 'counts', top_k).index] = True
+    candidates[top_k_edges(links, 'target', 'counts', top_k).index] = True
+    # Both conditions matter on this graph
+    assert ((scores < alpha) & ~candidates).any() and (candidates & (scores >= alpha)).any()
+
+    summary, _ = summarize_network(links, node_counts, 'source', 'target', max_nodes=len(node_counts),
+                                   max_edges=len(links), top_k=top_k, alpha=alpha, fill=False)
+    expected = links[candidates & (scores < alpha)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(summary, expected.astype({'source': object, 'target': object}))
+
+
+def test_input_within_budget_passes_through():
+    links = pd.DataFrame({'source': ['a', 'b', 'c', 'c', 'a', 'd'], 'target': ['b', 'c', 'a', 'c', 'd', 'a'],
+                          'counts': [5, 2, 7, 9, 0, 1]})
+    node_counts = pd.Series([10, 20, 30, 40], index=list('abcd'))
+    summary, counts = summarize_network(links, node_counts, 'source', 'target', max_nodes=10, max_edges=10,
+                                        top_k=10)
+    # Only the self-loop c -> c and the zero-weight a -> d are dropped
+    expected = links.drop(index=[3, 4]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(summary, expected.astype({'source': object, 'target': object}))
+    pd.testing.assert_series_equal(counts, node_counts.set_axis(node_counts.index.astype(object)))
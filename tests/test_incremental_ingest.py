@@ -0,0 +1,127 @@
+import os
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+import csv_to_sql_converter
+from conftest import make_raw_claims
+from csv_to_sql_converter import HealthcareDataConverter
+from sql_analytics import SqlAggregates
+
+
+def read_table(db_path, sql):
+    with closing(sqlite3.connect(db_path)) as conn:
+        table = pd.read_sql_query(sql, conn)
+    return table.sort_values(list(table.columns), na_position='first').reset_index(drop=True)
+
+
+def convert(db_path, data_dir, schema, **kwargs):
+    HealthcareDataConverter(str(db_path), schema=schema).convert_csv_to_sql(data_dir=str(data_dir), **kwargs)
+
+
+def assert_same_database(incremental_db, full_db):
+    visits = "SELECT patient_id, start_date, healthcare_provider_type, source_file, source_row FROM healthcare_records"
+    pd.testing.assert_frame_equal(read_table(incremental_db, visits), read_table(full_db, visits))
+    transitions = "SELECT * FROM patient_transitions"
+    pd.testing.assert_frame_equal(read_table(incremental_db, transitions), read_table(full_db, transitions))
+
+    incremental, full = SqlAggregates(str(incremental_db)), SqlAggregates(str(full_db))
+    keys = ['age', 'gender', 'reason_for_treatment', 'healthcare_provider_main_group', 'from', 'to']
+    for cube in (incremental.cube, full.cube):
+        cube.transitions = cube.transitions.astype(object).sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(incremental.cube.transitions, full.cube.transitions)
+    for length in (2, 3, 4):
+        pd.testing.assert_frame_equal(
+            incremental.pathways.top_pathways('Radiology', length, k=1000).sort_values(
+                [f'step_{step + 1}' for step in range(length)]).reset_index(drop=True),
+            full.pathways.top_pathways('Radiology', length, k=1000).sort_values(
+                [f'step_{step + 1}' for step in range(length)]).reset_index(drop=True),
+        )
+
+
+@pytest.mark.parametrize('schema', ['wide', 'normalized'])
+@pytest.mark.parametrize('streaming', [False, True])
+def test_incremental_ingest_equals_full_rebuild(tmp_path, claims_dir, schema, streaming):
+    incremental_db, full_db = tmp_path / 'incremental.db', tmp_path / 'full.db'
+    convert(incremental_db, claims_dir, schema, streaming=streaming, chunksize=150)
+
+    # One file changes (new rows for existing patients), one is removed, one is added
+    make_raw_claims(450, 60, seed=10).to_csv(claims_dir / 'data_css_challenge_0.csv', index=False)
+    (claims_dir / 'data_css_challenge_2.csv').unlink()
+    make_raw_claims(300, 60, seed=20).to_csv(claims_dir / 'data_css_challenge_3.csv', index=False)
+
+    convert(incremental_db, claims_dir, schema, streaming=streaming, chunksize=150, incremental=True)
+    convert(full_db, claims_dir, schema, streaming=streaming, chunksize=150)
+    assert_same_database(incremental_db, full_db)
+
+
+def test_unchanged_files_are_not_reloaded(tmp_path, claims_dir):
+    db_path = tmp_path / 'claims.db'
+    convert(db_path, claims_dir, 'wide')
+    manifest = read_table(db_path, "SELECT source_file, first_id, last_id, row_count FROM ingest_manifest")
+
+    convert(db_path, claims_dir, 'wide', incremental=True)
+    pd.testing.assert_frame_equal(
+        read_table(db_path, "SELECT source_file, first_id, last_id, row_count FROM ingest_manifest"), manifest
+    )
+
+
+def test_incremental_ingest_prunes_unused_lookup_values(tmp_path, claims_dir):
+    incremental_db, full_db = tmp_path / 'incremental.db', tmp_path / 'full.db'
+    convert(incremental_db, claims_dir, 'normalized')
+
+    # Only one provider type is left in the data
+    claims = make_raw_claims(400, 60, seed=30)
+    claims[claims['healthcare_provider_type'] == 'Radiologie'].to_csv(claims_dir / 'data_css_challenge_0.csv',
+                                                                      index=False)
+    (claims_dir / 'data_css_challenge_1.csv').unlink()
+    (claims_dir / 'data_css_challenge_2.csv').unlink()
+    convert(incremental_db, claims_dir, 'normalized', incremental=True)
+    convert(full_db, claims_dir, 'normalized')
+    provider_types = "SELECT value FROM dim_healthcare_provider_type"
+    assert read_table(incremental_db, provider_types)['value'].tolist() == ['Radiology']
+    pd.testing.assert_frame_equal(read_table(incremental_db, provider_types), read_table(full_db, provider_types))
+
+    # Values added back get new ids after the pruned ones
+    make_raw_claims(400, 60, seed=31).to_csv(claims_dir / 'data_css_challenge_1.csv', index=False)
+    convert(incremental_db, claims_dir, 'normalized', incremental=True)
+    convert(full_db, claims_dir, 'normalized')
+    assert_same_database(incremental_db, full_db)
+
+
+def test_files_are_hashed_once(tmp_path, claims_dir, monkeypatch):
+    db_path = tmp_path / 'claims.db'
+    hashed = []
+    compute_file_hash = HealthcareDataConverter.compute_file_hash
+    monkeypatch.setattr(HealthcareDataConverter, 'compute_file_hash',
+                        lambda self, csv_file: hashed.append(csv_file.name) or compute_file_hash(self, csv_file))
+    convert(db_path, claims_dir, 'wide')
+    assert sorted(hashed) == [f'data_css_challenge_{number}.csv' for number in range(3)]
+
+    # A touched file is hashed to find it unchanged, a rewritten one of the same size is hashed once
+    hashed.clear()
+    os.utime(claims_dir / 'data_css_challenge_0.csv')
+    path = claims_dir / 'data_css_challenge_1.csv'
+    content = path.read_bytes()
+    path.write_bytes(content.replace(b'Krankheit', b'Krankhiet', 1))
+    convert(db_path, claims_dir, 'wide', incremental=True)
+    assert sorted(hashed) == ['data_css_challenge_0.csv', 'data_css_challenge_1.csv']
+
+
+def test_stale_parquet_dataset_is_reported(tmp_path, claims_dir, monkeypatch, caplog):
+    db_path, parquet_dir = tmp_path / 'claims.db', tmp_path / 'parquet'
+    convert(db_path, claims_dir, 'wide', parquet_dir=str(parquet_dir))
+    monkeypatch.setattr(csv_to_sql_converter, 'DEFAULT_PARQUET_DIR', str(parquet_dir))
+
+    make_raw_claims(300, 60, seed=20).to_csv(claims_dir / 'data_css_challenge_3.csv', index=False)
+    convert(db_path, claims_dir, 'wide', incremental=True)
+    assert 'non viene aggiornato' in caplog.text
+
+
+def test_streaming_matches_in_memory_conversion(tmp_path, claims_dir):
+    streamed, in_memory = tmp_path / 'streamed.db', tmp_path / 'in_memory.db'
+    convert(streamed, claims_dir, 'wide', streaming=True, chunksize=100)
+    convert(in_memory, claims_dir, 'wide')
+    assert_same_database(streamed, in_memory)
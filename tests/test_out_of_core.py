@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from claims_layout import concat_claims
+from flow_analytics import FlowCube
+from out_of_core import DatasetAggregates, patient_partitions, read_csv_chunks
+
+COLUMNS = ['patient_id', 'age', 'gender', 'reason_for_treatment', 'healthcare_provider_type',
+           'healthcare_provider_main_group', 'client_type', 'start_date']
+GROUPINGS = {'provider_clients': ['healthcare_provider_type', 'client_type'], 'ages': ['age']}
+
+
+def claims_chunks(claims_dir, chunksize):
+    """The claims files streamed as the dashboard reads them, in chunks that do not line up with files"""
+    def prepare(chunk):
+        chunk['start_date'] = pd.to_datetime(chunk['start_date'])
+        return chunk
+
+    paths = sorted(str(path) for path in claims_dir.glob('*.csv'))
+    return read_csv_chunks(paths, chunksize=chunksize, columns=COLUMNS,
+                           categorical=[col for col in COLUMNS if col != 'start_date'], prepare=prepare)
+
+
+def sorted_frame(frame, keys):
+    frame = frame.astype({key: object for key in keys})
+    return frame.sort_values(keys, na_position='first').reset_index(drop=True)
+
+
+def assert_same_cube(cube, expected):
+    providers = expected.values('healthcare_provider_type')
+    for filters in [{}, {'age': expected.values('age')[0]}, {'gender': 'M', 'reason_for_treatment': 'Unfall'}]:
+        pd.testing.assert_frame_equal(sorted_frame(cube.edges(filters), ['from', 'to']),
+                                      sorted_frame(expected.edges(filters), ['from', 'to']), check_dtype=False)
+        pd.testing.assert_frame_equal(cube.node_stats(providers, filters), expected.node_stats(providers, filters),
+                                      check_dtype=False)
+        assert cube.visit_summary(filters) == expected.visit_summary(filters)
+        assert cube.transition_count(filters) == expected.transition_count(filters)
+        assert cube.transition_patient_count(filters) == expected.transition_patient_count(filters)
+    pd.testing.assert_frame_equal(cube.patients_by_provider().rename(index=str).sort_index(),
+                                  expected.patients_by_provider().rename(index=str).sort_index(), check_dtype=False)
+
+
+@pytest.mark.parametrize('n_partitions', [1, 4])
+def test_merged_partition_cubes_match_the_whole_cube(claims_dir, n_partitions):
+    data = concat_claims(list(claims_chunks(claims_dir, 10_000)))
+    partitions = patient_partitions(data['patient_id'], n_partitions)
+    cubes = [FlowCube(part.reset_index(drop=True)) for _, part in data.groupby(partitions)]
+    assert len(cubes) == n_partitions
+    assert_same_cube(FlowCube.merge(cubes), FlowCube(data))
+
+
+def test_out_of_core_aggregates_match_in_memory(tmp_path, claims_dir):
+    loaded = DatasetAggregates.from_frame(concat_claims(list(claims_chunks(claims_dir, 10_000))), GROUPINGS)
+    streamed = DatasetAggregates.from_chunks(claims_chunks(claims_dir, 150), GROUPINGS, n_partitions=3,
+                                             spill_dir=str(tmp_path))
+
+    assert streamed.records == loaded.records
+    assert streamed.date_range == loaded.date_range
+    for name, keys in GROUPINGS.items():
+        pd.testing.assert_frame_equal(sorted_frame(streamed.counts(name), keys),
+                                      sorted_frame(loaded.counts(name), keys), check_dtype=False)
+    assert_same_cube(streamed.cube, loaded.cube)
+
+    assert streamed.pathways.n_pathways() == loaded.pathways.n_pathways()
+    for provider in loaded.cube.values('healthcare_provider_type'):
+        for length in [2, 3]:
+            steps = [f'step_{step + 1}' for step in range(length)]
+            top = [sorted_frame(index.top_pathways(provider, length, k=1000), steps)
+                   for index in (streamed.pathways, loaded.pathways)]
+            pd.testing.assert_frame_equal(*top, check_dtype=False)
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from parquet_store import (PARTITION_COLUMN, column_values, delete_parquet_source, iter_parquet_batches,
+                           read_parquet_dataset, write_parquet_chunk)
+
+
+def make_chunk(source_file):
+    return pd.DataFrame({
+        'patient_id': ['a', 'b', 'c'],
+        'age': ['20-30 years', '40-50 years', '20-30 years'],
+        PARTITION_COLUMN: ['Doctors', None, 'Hospitals'],
+        'start_date': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-03']),
+        'source_file': source_file,
+    })
+
+
+def test_missing_partition_values_stay_missing(tmp_path):
+    root = str(tmp_path / 'parquet')
+    write_parquet_chunk(make_chunk('data_css_challenge_0.csv'), root)
+
+    data = read_parquet_dataset(root).sort_values('patient_id', ignore_index=True)
+    assert data[PARTITION_COLUMN].isna().tolist() == [False, True, False]
+    assert isinstance(data[PARTITION_COLUMN].dtype, pd.CategoricalDtype)
+    batches = pd.concat(iter_parquet_batches(root)).sort_values('patient_id', ignore_index=True)
+    assert batches[PARTITION_COLUMN].isna().tolist() == [False, True, False]
+    assert column_values(root) == ['Doctors', 'Hospitals']
+    assert read_parquet_dataset(root, equals={PARTITION_COLUMN: ['Doctors']})['patient_id'].tolist() == ['a']
+
+
+def test_delete_parquet_source_removes_only_its_files(tmp_path):
+    root = str(tmp_path / 'parquet')
+    write_parquet_chunk(make_chunk('data_css_challenge_0.csv'), root)
+    write_parquet_chunk(make_chunk('data_css_challenge_1.csv'), root)
+
+    delete_parquet_source(root, 'data_css_challenge_0.csv')
+    data = read_parquet_dataset(root)
+    assert data['source_file'].astype(str).unique().tolist() == ['data_css_challenge_1.csv']
+    assert data[PARTITION_COLUMN].isna().sum() == 1
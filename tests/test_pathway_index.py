@@ -0,0 +1,76 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_raw_claims
+from flow_analytics import pair_consecutive_visits
+from out_of_core import patient_partitions
+from pathway_index import MAX_STEPS, PathwayIndex, journey_windows
+from sql_analytics import SqlAggregates
+
+
+@pytest.fixture
+def claims():
+    """Raw claims with a few visits without provider, which end a pathway"""
+    claims = make_raw_claims(3000, 200, days=30)
+    claims['start_date'] = pd.to_datetime(claims['start_date'])
+    missing = np.random.default_rng(1).random(len(claims)) < 0.03
+    claims.loc[missing, 'healthcare_provider_type'] = None
+    return claims
+
+
+def brute_force_pathways(data, provider_column='healthcare_provider_type'):
+    """Counter of every run of 2 to MAX_STEPS consecutive visits with a provider, patient by patient"""
+    visits, _, _ = pair_consecutive_visits(data, [provider_column])
+    pathways = Counter()
+    for _, journey in visits.groupby('patient_id', sort=False, observed=True):
+        providers = journey[provider_column].astype(object).tolist()
+        for start in range(len(providers)):
+            for end in range(start + 2, min(start + MAX_STEPS, len(providers)) + 1):
+                pathway = providers[start:end]
+                if any(pd.isna(provider) for provider in pathway):
+                    break
+                pathways[tuple(pathway)] += 1
+    return pathways
+
+
+def assert_same_index(index, pathways):
+    assert index.n_pathways() == {length: sum(len(key) == length for key in pathways)
+                                  for length in range(2, MAX_STEPS + 1)}
+    for pathway, count in pathways.items():
+        assert index.count(pathway) == count, pathway
+
+    for start in {pathway[0] for pathway in pathways}:
+        for length in range(2, MAX_STEPS + 1):
+            expected = sorted((count for pathway, count in pathways.items()
+                               if len(pathway) == length and pathway[0] == start), reverse=True)
+            for k, min_count in [(1000, 1), (5, 1), (1000, 3)]:
+                top = index.top_pathways(start, length, k, min_count)
+                counts = [count for count in expected if count >= min_count][:k]
+                assert top['count'].tolist() == counts, (start, length, k, min_count)
+                for row in top.itertuples(index=False):
+                    assert pathways[tuple(row[:length])] == row.count
+
+
+def test_index_matches_a_brute_force_count(claims):
+    pathways = brute_force_pathways(claims)
+    index = PathwayIndex.from_frame(claims)
+    assert_same_index(index, pathways)
+
+    assert index.count(['Radiologie', 'Unknown provider']) == 0
+    assert index.top_pathways('Unknown provider').empty
+    with pytest.raises(ValueError):
+        index.count(['Radiologie'] * (MAX_STEPS + 1))
+
+
+def test_partition_windows_add_up(claims):
+    partitions = patient_partitions(claims['patient_id'], 4)
+    windows = [journey_windows(part) for _, part in claims.groupby(partitions)]
+    merged = PathwayIndex.from_windows(pd.concat(windows, ignore_index=True))
+    assert_same_index(merged, brute_force_pathways(claims))
+
+
+def test_sql_windows_match_the_visits(claims_db, visits):
+    assert_same_index(SqlAggregates(str(claims_db)).pathways, brute_force_pathways(visits))
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_raw_claims
+from out_of_core import patient_hashes
+from sampling import HASH_RANGE, PatientSampler
+
+STRATA = ['age', 'reason_for_treatment']
+
+
+@pytest.fixture
+def claims():
+    claims = make_raw_claims(6000, 800, days=60)
+    return claims.astype({col: 'category' for col in ['patient_id', 'age', 'reason_for_treatment']})
+
+
+def sample_chunks(claims, sampler, chunksize=500):
+    for start in range(0, len(claims), chunksize):
+        sampler.add(claims.iloc[start:start + chunksize])
+    return sampler.sample()
+
+
+def assert_complete_journeys(sample, claims):
+    """Every sampled patient comes with all of its visits, in the order they were read"""
+    assert sample['patient_id'].notna().all()
+    patients = set(sample['patient_id'].astype(object))
+    expected = claims[claims['patient_id'].astype(object).isin(patients)]
+    pd.testing.assert_frame_equal(sample.astype(object).reset_index(drop=True),
+                                  expected.astype(object).reset_index(drop=True))
+
+
+def test_fraction_keeps_the_patients_below_the_hash_threshold(claims):
+    sample = sample_chunks(claims, PatientSampler(fraction=0.2))
+    assert_complete_journeys(sample, claims)
+
+    known = claims[claims['patient_id'].notna()]
+    hashes = pd.Series(patient_hashes(known['patient_id']), index=known['patient_id'].astype(object))
+    expected = set(hashes[hashes < int(0.2 * HASH_RANGE)].index)
+    assert set(sample['patient_id'].astype(object)) == expected
+
+
+@pytest.mark.parametrize('max_rows', [300, 2000])
+def test_max_rows_keeps_the_lowest_hash_patients_that_fit(claims, max_rows):
+    sampler = PatientSampler(max_rows=max_rows)
+    sample = sample_chunks(claims, sampler)
+    assert 0 < len(sample) <= max_rows
+    assert sampler.patients_kept() == sample['patient_id'].nunique()
+    assert_complete_journeys(sample, claims)
+
+    # Bottom-k: the sampled patients are a prefix of all the patients in hash order
+    known = claims['patient_id'].dropna().astype(object)
+    ranked = pd.Series(patient_hashes(known), index=known.to_numpy()).groupby(level=0).first().sort_values()
+    assert set(sample['patient_id'].astype(object)) == set(ranked.index[:sample['patient_id'].nunique()])
+
+
+def test_strata_share_the_row_budget(claims):
+    max_rows = 2000
+    sampler = PatientSampler(max_rows=max_rows, strata=STRATA)
+    sample = sample_chunks(claims, sampler)
+    assert_complete_journeys(sample, claims)
+
+    # A patient's stratum is the one of its first visit read
+    first_visits = claims.dropna(subset=['patient_id']).drop_duplicates('patient_id').set_index('patient_id')
+    strata = first_visits.loc[sample['patient_id'], STRATA].astype(object).fillna('missing')
+    rows = strata.value_counts()
+    n_strata = len(first_visits[STRATA].astype(object).fillna('missing').drop_duplicates())
+    assert len(rows) == n_strata
+    assert rows.max() <= max_rows // n_strata
+
+    rates = sampler.inclusion_rates()
+    assert rates['rows'].sum() == len(sample)
+    assert np.all((rates['inclusion_rate'] > 0) & (rates['inclusion_rate'] <= 1))
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import legacy_words_translation, make_raw_claims
+from translation import GERMAN_TO_ENGLISH, Translator
+
+
+def sample_values():
+    rng = np.random.default_rng(0)
+    words = [term for term in GERMAN_TO_ENGLISH if ' ' not in term]
+    composites = [' '.join(rng.choice(words + ['Praxis', '14', 'Zentrum'], 3)) for _ in range(200)]
+    padded = [f"  {term} " for term in list(GERMAN_TO_ENGLISH)[:20]]
+    return list(GERMAN_TO_ENGLISH) + composites + padded + ['Unbekannt', 'Praxis  14', '   ', '']
+
+
+def test_words_mode_matches_the_legacy_translation():
+    translator = Translator(partial_match='words')
+    for value in sample_values():
+        assert translator.translate_text(value) == legacy_words_translation(value), value
+    assert translator.translate_text(None) is None
+    assert pd.isna(translator.translate_text(np.nan))
+
+
+def test_substring_mode_translates_every_term():
+    translator = Translator(partial_match='substring')
+    for german, english in GERMAN_TO_ENGLISH.items():
+        assert translator.translate_text(german) == english
+
+
+@pytest.mark.parametrize('dtype', [object, 'category'])
+def test_translate_series_matches_value_by_value(dtype):
+    claims = make_raw_claims(500, 50)
+    translator = Translator(partial_match='words')
+    for column in ['age', 'reason_for_treatment', 'healthcare_provider_type', 'client_type']:
+        series = claims[column].astype(dtype)
+        translated = translator.translate_series(series)
+        expected = claims[column].map(legacy_words_translation, na_action='ignore')
+        pd.testing.assert_series_equal(translated.astype(object), expected.astype(object), check_names=False)
+        if dtype == 'category':
+            assert isinstance(translated.dtype, pd.CategoricalDtype)
@@ -0,0 +1,353 @@
+"""
+Shared German to English translation engine for the healthcare claims data.
+
+Both the CSV -> SQL converter and the network dashboard translate the same
+categorical columns. Instead of calling a Python function on every row, the
+Translator translates each distinct value once and maps the results back to
+the rows, and handles partial matches with a single compiled regex.
+"""
+
+import re
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# German to English translation mappings
+GERMAN_TO_ENGLISH = {
+    # Age groups
+    '0-10 Jahre': '0-10 Years',
+    '10-20 Jahre': '10-20 Years', 
+    '20-30 Jahre': '20-30 Years',
+    '30-40 Jahre': '30-40 Years',
+    '40-50 Jahre': '40-50 Years',
+    '50-60 Jahre': '50-60 Years',
+    '60-70 Jahre': '60-70 Years',
+    '70-80 Jahre': '70-80 Years',
+    '80-90 Jahre': '80-90 Years',
+    '90+ Jahre': '90+ Years',
+    
+    # Reasons for treatment
+    'Krankheit': 'Illness',
+    'Unfall': 'Accident',
+    'Mutterschaft': 'Maternity',
+    'Prävention': 'Prevention',
+    'Vorsorge': 'Preventive Care',
+    'Nachsorge': 'Follow-up Care',
+    
+    # Healthcare provider main groups
+    'Spitäler': 'Hospitals',
+    'SpitÃ¤ler': 'Hospitals',  # Handle encoding issues
+    'Ärzte und Ärztinnen': 'Doctors',
+    'Ã„rzte und Ã„rztinnen': 'Doctors',  # Handle encoding issues
+    'Laboratorien': 'Laboratories',
+    'Pflegeheime': 'Nursing Homes',
+    'Apotheken': 'Pharmacies',
+    'Physiotherapie': 'Physiotherapy',
+    'Ergotherapie': 'Occupational Therapy',
+    'Psychologie': 'Psychology',
+    'Zahnärzte': 'Dentists',
+    'Optiker': 'Opticians',
+    'Abgabestellen Mittel und Gegenstände': 'Medical Device Dispensing Points',
+    'Chiropraktoren und Chiropraktorinnen': 'Chiropractors',
+    'Ergotherapeuten und Ergotherapeutinnen': 'Occupational Therapists',
+    'Ernährungsberater und Ernährungsberaterinnen': 'Nutritional Counselors',
+    'Fitness': 'Fitness',
+    'Hebammen': 'Midwives',
+    'Komplementärtherapeuten und -therapeutinnen': 'Complementary Therapists',
+    'Logopäden und Logopädinnen': 'Speech Therapists',
+    'Neuropsychologen und Neuropsychologinnen': 'Neuropsychologists',
+    'Organisationen der Krankenpflege & Hilfe zu Hause': 'Nursing & Home Care Organizations',
+    'Pflegefachmänner und Pflegefachfrauen': 'Professional Nurses',
+    'Physiotherapeuten und Physiotherapeutinnen': 'Physiotherapists',
+    'Podologen und Podologinnen': 'Podologists',
+    'Psych. Psychotherapeuten und Psychotherapeutinnen': 'Psychological Psychotherapists',
+    'Transport-/Rettungsunternehmen': 'Transport/Rescue Companies',
+    'Übrige Rechnungssteller': 'Other Billing Entities',
+    
+    # Healthcare provider types (extended)
+    'Zentrumsversorgung, Niveau 1': 'Central Care, Level 1',
+    'Zentrumsversorgung, Niveau 2': 'Central Care, Level 2',
+    'Zentrumsversorgung, Niveau 3': 'Central Care, Level 3',
+    'Zentrumsversorgung, Niveau 4': 'Central Care, Level 4',
+    'Zentrumsversorgung, Niveau 5': 'Central Care, Level 5',
+    'Zentrumsversorgung': 'Central Care',
+    'Grundversorgung': 'Basic Care',
+    'Spezialisierte Psychiatrie': 'Specialized Psychiatry',
+    'Psychiatrische Kliniken': 'Psychiatric Clinics',
+    'Rehabilitation': 'Rehabilitation',
+    'Gruppenpraxen': 'Group Practices',
+    'Einzelpraxen': 'Individual Practices',
+    'Gemeinschaftspraxen': 'Community Practices',
+    'Polikliniken': 'Polyclinics',
+    'Tageskliniken': 'Day Clinics',
+    'Ambulatorien': 'Outpatient Clinics',
+    'Notfallzentren': 'Emergency Centers',
+    'Universitätsspitäler': 'University Hospitals',
+    'Regionalspitäler': 'Regional Hospitals',
+    'Kantonsspitäler': 'Cantonal Hospitals',
+    'Privatspitäler': 'Private Hospitals',
+    'Spezialkliniken': 'Specialty Clinics',
+    'Spezialkliniken Chirurgie': 'Surgical Specialty Clinics',
+    'Pflegeheime': 'Nursing Homes',
+    'Privatlaboratorien': 'Private Laboratories',
+    'Mikrobiologie/Genetik-Laboratorien': 'Microbiology/Genetics Laboratories',
+    'Mikrobiologie-Laboratorien': 'Microbiology Laboratories',
+    'Organisationen der Apotheker und Apothekerinnen': 'Pharmacy Organizations',
+    'Organisationen der Krankenpflege & Hilfe zu Hause': 'Nursing & Home Care Organizations',
+    'Physiotherapeuten und Physiotherapeutinnen': 'Physiotherapists',
+    'Chiropraktoren und Chiropraktorinnen': 'Chiropractors',
+    'Psych. Psychotherapeuten und Psychotherapeutinnen': 'Psychological Psychotherapists',
+    'praktischer Arzt / Ärztin': 'General Practitioner',
+    'Ärzte, Spezialfälle': 'Doctors, Special Cases',
+    'Übrige Rechnungssteller': 'Other Billing Entities',
+    'Übrige Rechnungssteller, Spezialfälle': 'Other Billing Entities, Special Cases',
+    'Abgabestellen Mittel und Gegenstände': 'Medical Device Dispensing Points',
+    'Akut- und Übergangspflege': 'Acute and Transitional Care',
+    'Alters- und Pflegeheime': 'Elderly and Nursing Homes',
+    'Apotheken, Spezialfälle': 'Pharmacies, Special Cases',
+    'Blutspendezentren': 'Blood Donation Centers',
+    'Diverse Spezialkliniken': 'Various Specialty Clinics',
+    'Ergotherapeuten und Ergotherapeutinnen': 'Occupational Therapists',
+    'Ergotherapiezentren': 'Occupational Therapy Centers',
+    'Ernährungsberater und Ernährungsberaterinnen': 'Nutritional Counselors',
+    'Ernährungsberatung, Organisation': 'Nutritional Counseling, Organization',
+    'Fitness': 'Fitness',
+    'Geburtshäuser': 'Birth Centers',
+    'Gemeinsame Einrichtung KVG': 'Joint Health Insurance Institution',
+    'Genetik-Laboratorien': 'Genetics Laboratories',
+    'Grundversorgung, Niveau 3': 'Basic Care, Level 3',
+    'Grundversorgung, Niveau 4': 'Basic Care, Level 4',
+    'Grundversorgung, Niveau 5': 'Basic Care, Level 5',
+    'Hebammen': 'Midwives',
+    'Heime für Behinderte': 'Homes for Disabled',
+    'Komplementärtherapeuten und -therapeutinnen': 'Complementary Therapists',
+    'Logopäden und Logopädinnen': 'Speech Therapists',
+    'Neuropsychologen und Neuropsychologinnen': 'Neuropsychologists',
+    'Organisationen der Chiropraktik': 'Chiropractic Organizations',
+    'Organisationen der Hebammen': 'Midwife Organizations',
+    'Organisationen der Krankenpflege & Hilfe zu Hause AÜP': 'Nursing & Home Care Organizations AÜP',
+    'Organisationen der Krankenpflege & Hilfe zu Hause TON': 'Nursing & Home Care Organizations TON',
+    'Organisationen der Logopädie': 'Speech Therapy Organizations',
+    'Organisationen der Neuropsychologie': 'Neuropsychology Organizations',
+    'Organisationen der Physiotherapie': 'Physiotherapy Organizations',
+    'Organisationen der Podologie': 'Podology Organizations',
+    'Organisationen der psychologischen Psychotherapie': 'Psychological Psychotherapy Organizations',
+    'Pflegefachmänner und Pflegefachfrauen': 'Professional Nurses',
+    'Pflegeheime, Spezialfälle (ohne BUR-Zurodnung)': 'Nursing Homes, Special Cases (without BUR assignment)',
+    'Podologen und Podologinnen': 'Podologists',
+    'Prävention und Gesundheitswesen': 'Prevention and Public Health',
+    'Psychiatrische Kliniken, Niveau 1': 'Psychiatric Clinics, Level 1',
+    'Psychiatrische Kliniken, Niveau 2': 'Psychiatric Clinics, Level 2',
+    'Rehabilitationskliniken': 'Rehabilitation Clinics',
+    'Spezialkliniken Geriatrie': 'Geriatric Specialty Clinics',
+    'Spezialkliniken Pädiatrie': 'Pediatric Specialty Clinics',
+    'Spitäler, Spezialfälle (ohne BUR-Zuordnung)': 'Hospitals, Special Cases (without BUR assignment)',
+    'Tages- oder Nachtstrukturen TON': 'Day or Night Structures TON',
+    'Transport-/Rettungsunternehmen, Spezialfälle': 'Transport/Rescue Companies, Special Cases',
+    'Zentrumsversorgung, Niveau 1 (Universitätsspitäler)': 'Central Care, Level 1 (University Hospitals)',
+    'Diabetesgesellschaften': 'Diabetes Societies',
+    
+    # Medical specialties (extended)
+    'Kinder- und Jugendmedizin': 'Pediatrics',
+    'Kinder- und Jugendpsychiatrie und -psychotherapie': 'Child and Adolescent Psychiatry and Psychotherapy',
+    'Gynäkologie und Geburtshilfe': 'Gynecology and Obstetrics',
+    'GynÃ¤kologie und Geburtshilfe': 'Gynecology and Obstetrics',  # Handle encoding issues
+    'Psychiatrie und Psychotherapie': 'Psychiatry and Psychotherapy',
+    'Chirurgie': 'Surgery',
+    'Innere Medizin': 'Internal Medicine',
+    'Allgemeine Innere Medizin': 'General Internal Medicine',
+    'Radiologie': 'Radiology',
+    'Anästhesiologie': 'Anesthesiology',
+    'Dermatologie': 'Dermatology',
+    'Dermatologie und Venerologie': 'Dermatology and Venereology',
+    'Ophthalmologie': 'Ophthalmology',
+    'Orthopädie': 'Orthopedics',
+    'Neurologie': 'Neurology',
+    'Urologie': 'Urology',
+    'HNO': 'ENT (Ear, Nose, Throat)',
+    'Oto-Rhino-Laryngologie': 'Otorhinolaryngology (ENT)',
+    'Kardiologie': 'Cardiology',
+    'Onkologie': 'Oncology',
+    'Endokrinologie': 'Endocrinology',
+    'Rheumatologie': 'Rheumatology',
+    'Nephrologie': 'Nephrology',
+    'Pneumologie': 'Pneumology',
+    'Gastroenterologie': 'Gastroenterology',
+    'Hämatologie': 'Hematology',
+    'Infektiologie': 'Infectious Diseases',
+    'Notfallmedizin': 'Emergency Medicine',
+    'Allgemeinmedizin': 'General Medicine',
+    'Hausarztmedizin': 'Family Medicine',
+    'Tropenmedizin': 'Tropical Medicine',
+    'Arbeitsmedizin': 'Occupational Medicine',
+    'Sportmedizin': 'Sports Medicine',
+    'Geriatrie': 'Geriatrics',
+    'Palliativmedizin': 'Palliative Medicine',
+    'Intensivmedizin': 'Intensive Care Medicine',
+    'Nuklearmedizin': 'Nuclear Medicine',
+    'Pathologie': 'Pathology',
+    'Rechtsmedizin': 'Forensic Medicine',
+    'Labormedizin': 'Laboratory Medicine',
+    'Mikrobiologie': 'Microbiology',
+    'Immunologie': 'Immunology',
+    'Genetik': 'Genetics',
+    'Toxikologie': 'Toxicology',
+    'Pharmakologie': 'Pharmacology',
+    'Hygiene': 'Hygiene',
+    'Epidemiologie': 'Epidemiology',
+    'Biostatistik': 'Biostatistics',
+    'Physikalische Medizin und Rehabilitation': 'Physical Medicine and Rehabilitation',
+    'Allergologie und klinische Immunologie': 'Allergology and Clinical Immunology',
+    'Angiologie': 'Angiology',
+    'Arbeitsmedizin': 'Occupational Medicine',
+    'Gefässchirurgie': 'Vascular Surgery',
+    'Handchirurgie': 'Hand Surgery',
+    'Herz- und thorakale Gefässchirurgie': 'Cardiac and Thoracic Vascular Surgery',
+    'Infektiologie': 'Infectious Diseases',
+    'Intensivmedizin': 'Intensive Care Medicine',
+    'Kiefer- und Gesichtschirurgie': 'Oral and Maxillofacial Surgery',
+    'Kinderchirurgie': 'Pediatric Surgery',
+    'Klinische Pharmakologie und Toxikologie': 'Clinical Pharmacology and Toxicology',
+    'Medizinische Genetik': 'Medical Genetics',
+    'Medizinische Onkologie': 'Medical Oncology',
+    'Neurochirurgie': 'Neurosurgery',
+    'Orthopädische Chirurgie und Traumatologie des Bewegungsapparates': 'Orthopedic Surgery and Traumatology of the Locomotor System',
+    'Plastische, Rekonstruktive und Ästhetische Chirurgie': 'Plastic, Reconstructive and Aesthetic Surgery',
+    'Radio-Onkologie und Strahlentherapie': 'Radio-Oncology and Radiation Therapy',
+    'Tropen- und Reisemedizin': 'Tropical and Travel Medicine',
+    
+    # Other healthcare services
+    'Spitex': 'Home Care',
+    'Ambulante Pflege': 'Outpatient Care',
+    'Stationäre Pflege': 'Inpatient Care',
+    'Langzeitpflege': 'Long-term Care',
+    'Kurzzeitpflege': 'Short-term Care',
+    'Tagespflege': 'Day Care',
+    'Nachtpflege': 'Night Care',
+    'Palliativpflege': 'Palliative Care',
+    'Hospiz': 'Hospice',
+    'Diabetesberatung': 'Diabetes Counseling',
+    'Ernährungsberatung': 'Nutritional Counseling',
+    'Sozialberatung': 'Social Counseling',
+    'Psychologische Beratung': 'Psychological Counseling',
+    'Seelsorge': 'Pastoral Care',
+    'Logopädie': 'Speech Therapy',
+    'Podologie': 'Podology',
+    'Osteopathie': 'Osteopathy',
+    'Chiropraktik': 'Chiropractic',
+    'Homöopathie': 'Homeopathy',
+    'Naturheilkunde': 'Naturopathy',
+    'Akupunktur': 'Acupuncture',
+    'Massage': 'Massage',
+    'Fitness': 'Fitness',
+    'Wellness': 'Wellness',
+    
+    # Gender terms
+    'M': 'Male',
+    'F': 'Female',
+    'W': 'Female',
+    'männlich': 'Male',
+    'weiblich': 'Female',
+    
+    # Common German words that might appear
+    'und': 'and',
+    'oder': 'or',
+    'mit': 'with',
+    'ohne': 'without',
+    'für': 'for',
+    'von': 'from',
+    'zu': 'to',
+    'in': 'in',
+    'an': 'at',
+    'auf': 'on',
+    'bei': 'at',
+    'nach': 'after',
+    'vor': 'before',
+    'über': 'about',
+    'unter': 'under',
+    'durch': 'through',
+    'um': 'around',
+    'gegen': 'against',
+    'zwischen': 'between',
+}
+
+
+class Translator:
+    """
+    Translates German categorical values to English.
+
+    Args:
+        translations: Mapping of German terms to English terms
+        partial_match: How values without an exact match are translated:
+            'words' replaces whole whitespace-separated words (converter),
+            'substring' replaces any occurrence of a known term (dashboard)
+    """
+
+    def __init__(self, translations: Dict[str, str] = GERMAN_TO_ENGLISH, partial_match: str = 'words'):
+        if partial_match not in ('words', 'substring'):
+            raise ValueError(f"Unknown partial_match mode: {partial_match}")
+
+        self.translations = translations
+        self.partial_match = partial_match
+
+        # Longest terms first, so that "Spezialkliniken Chirurgie" wins over "Spezialkliniken"
+        terms = sorted(translations, key=len, reverse=True)
+        if partial_match == 'words':
+            terms = [term for term in terms if not any(ch.isspace() for ch in term)]
+            pattern = r'(?<!\S)(?:' + '|'.join(map(re.escape, terms)) + r')(?!\S)'
+        else:
+            pattern = '|'.join(map(re.escape, terms))
+        self._matcher = re.compile(pattern)
+
+    def _replace(self, match):
+        return self.translations[match.group(0)]
+
+    def translate_text(self, text):
+        """Translate a single value, returning missing values unchanged"""
+        if text is None or pd.isna(text) or text == '':
+            return text
+
+        text_str = str(text)
+        if self.partial_match == 'words':
+            text_str = text_str.strip()
+
+        # Handle exact matches first
+        if text_str in self.translations:
+            return self.translations[text_str]
+
+        # Handle partial matches for composite values in a single pass
+        if self.partial_match == 'words':
+            text_str = ' '.join(text_str.split())
+        return self._matcher.sub(self._replace, text_str)
+
+    def translate_values(self, values) -> Dict:
+        """Translate a collection of distinct values, returning {original: translated}"""
+        return {value: self.translate_text(value) for value in values}
+
+    def translate_series(self, series: pd.Series) -> pd.Series:
+        """
+        Translate a pandas Series, translating each distinct value only once.
+
+        Categorical series stay categorical (categories that translate to the
+        same English term are merged); other series keep their dtype.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            translated = [self.translate_text(value) for value in series.cat.categories]
+            new_codes_by_category, new_categories = pd.factorize(pd.Index(translated, dtype=object))
+            codes = series.cat.codes.to_numpy()
+            new_codes = np.where(codes >= 0, new_codes_by_category[codes], -1)
+            return pd.Series(
+                pd.Categorical.from_codes(new_codes, categories=new_categories),
+                index=series.index,
+                name=series.name
+            )
+
+        codes, uniques = pd.factorize(series)
+        translated = np.array([self.translate_text(value) for value in uniques] + [None], dtype=object)
+        # Missing values have code -1, which picks the trailing None
+        result = pd.Series(translated.take(codes), index=series.index, name=series.name)
+
+        if series.dtype != object:
+            result = result.astype(series.dtype)
+        return result